@@ -1,7 +1,17 @@
 import os
+import time
 from flask import Flask
 from .extensions import ma, limiter, cache
 from .models import db  # Import the SQLAlchemy instance from models
+from .utils.serialization import init_json_provider
+from .utils.pool import TimedQueuePool, get_pool_stats
+from .utils.health import init_health, get_health_monitor
+from .utils.replicas import init_replicas
+from .utils.ratelimit import batched_storage_uri  # registers batched+redis://
+from .utils.startup import LazyCommand, init_startup, record_phase
+from .utils.query_tracker import init_query_tracking
+from .utils.metrics import CONTENT_TYPE, init_metrics, render_metrics
+from .utils.util import internal_token_required
 from .blueprints.customers import customers_bp  # Import the customers blueprint
 from .blueprints.mechanics import mechanics_bp  # Import the mechanics blueprint
 from .blueprints.service_tickets import (
@@ -10,17 +20,14 @@ from .blueprints.service_tickets import (
 from .blueprints.inventory import (
     inventory_items_bp,
 )  # Import the inventory items blueprint
-from flask_swagger_ui import get_swaggerui_blueprint  # Import swagger ui blueprint
+from .blueprints.search import search_bp  # Import the search blueprint
 
 SWAGGER_URL = "/api/docs"  # URL for exposing Swagger UI (without trailing '/')
 API_URL = "/static/swagger.yaml"  # Our API URL (can of course be a local resource)
 
-swaggerui_blueprint = get_swaggerui_blueprint(
-    SWAGGER_URL, API_URL, config={"app_name": "Mechanic Shop API"}
-)
-
 
 def create_app(config_name):
+    started = time.perf_counter()
 
     # Load app configuration
     app = Flask(__name__)
@@ -38,17 +45,43 @@ def create_app(config_name):
     else:
         raise ValueError("Invalid config name")
 
+    # Share the response cache across workers when Redis is available
+    if config_name == "ProductionConfig" and os.environ.get("REDIS_URL"):
+        app.config["CACHE_TYPE"] = "app.utils.two_tier_cache.TwoTierCache"
+        app.config["CACHE_REDIS_URL"] = os.environ.get("REDIS_URL")
+
     # Override rate limiter storage for production if Redis URL is available
+    # (Flask-Limiter reads RATELIMIT_STORAGE_URI; other configs use memory://)
     if config_name == "ProductionConfig" and os.environ.get("REDIS_URL"):
-        app.config["RATELIMIT_STORAGE_URL"] = os.environ.get("REDIS_URL")
-    elif config_name != "ProductionConfig":
-        app.config["RATELIMIT_STORAGE_URL"] = "memory://"
+        storage_uri = os.environ.get("REDIS_URL")
+        if app.config.get("RATELIMIT_BATCHED"):
+            storage_uri = batched_storage_uri(
+                storage_uri,
+                batch_size=app.config.get("RATELIMIT_BATCH_SIZE"),
+                batch_fraction=app.config.get("RATELIMIT_BATCH_FRACTION"),
+                sync_interval=app.config.get("RATELIMIT_SYNC_INTERVAL"),
+            )
+        app.config["RATELIMIT_STORAGE_URI"] = storage_uri
+
+    # Pooled engines report checkout wait times (see /pool/stats)
+    engine_options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    if "pool_size" in engine_options:
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            "poolclass": TimedQueuePool,
+            **engine_options,
+        }
 
     # Initialize extensions
+    init_startup(app)  # first-request timing (registered first, so it spans all hooks)
     ma.init_app(app)  # Initialize Marshmallow
     db.init_app(app)  # Initialize SQLAlchemy
+    init_replicas(app)  # read replicas for GET requests, if configured
     limiter.init_app(app)
     cache.init_app(app)  # Initialize Flask-Caching
+    init_json_provider(app)  # orjson responses when JSON_FAST_ENCODER is set
+    init_health(app)  # background readiness probes (see /readyz)
+    init_query_tracking(app)  # per-request query counts, N+1 warnings
+    init_metrics(app)  # per-route request metrics (see /metrics)
 
     # Add a root route
     @app.route("/")
@@ -62,27 +95,89 @@ def create_app(config_name):
                 "mechanics": "/mechanics",
                 "service_tickets": "/service_tickets",
                 "inventory": "/inventory",
+                "search": "/search",
             },
         }
 
-    # Add health check endpoint for Render
+    # Liveness: the process is up and serving requests; no I/O
+    @app.route("/livez")
+    def livez():
+        return {"status": "alive"}, 200
+
+    # Readiness: last results of the background database/cache/limiter probes
+    @app.route("/readyz")
+    def readyz():
+        ready, checks = get_health_monitor().snapshot()
+        return {"status": "ready" if ready else "not ready", "checks": checks}, (
+            200 if ready else 503
+        )
+
+    # Kept for Render's health check; served from the same cached probes
     @app.route("/health")
     def health_check():
-        try:
-            # Test database connection
-            with app.app_context():
-                from sqlalchemy import text
-
-                db.session.execute(text("SELECT 1"))
+        monitor = get_health_monitor()
+        if not monitor.interval:
+            monitor.run_checks()  # no probe threads to refresh the results
+        ready, checks = monitor.snapshot()
+        if ready:
             return {"status": "healthy", "database": "connected"}, 200
-        except Exception as e:
-            return {"status": "unhealthy", "error": str(e)}, 500
+        errors = [f"{name}: {c['error']}" for name, c in checks.items() if not c["ok"]]
+        return {"status": "unhealthy", "error": "; ".join(errors)}, 500
+
+    # Internal stats: off in production unless INTERNAL_ENDPOINTS_ENABLED, and
+    # behind INTERNAL_ENDPOINTS_TOKEN when that is set
+    if app.config.get("INTERNAL_ENDPOINTS_ENABLED", True):
+        # Response cache hit/miss counters (per process)
+        @app.route("/cache/stats")
+        @internal_token_required
+        def cache_stats():
+            from .utils.caching import get_cache_stats
+
+            return get_cache_stats(), 200
+
+        # Connection pool occupancy and checkout waits (per process)
+        @app.route("/pool/stats")
+        @internal_token_required
+        def pool_stats():
+            stats = get_pool_stats(db.engine)
+            replicas = app.extensions.get("db_replicas")
+            if replicas:
+                stats["replicas"] = [
+                    {**status, **get_pool_stats(engine)}
+                    for status, engine in zip(replicas.status(), replicas.engines)
+                ]
+            return stats, 200
+
+        # Prometheus scrape target (all workers when PROMETHEUS_MULTIPROC_DIR is set)
+        @app.route("/metrics")
+        @internal_token_required
+        def metrics():
+            return render_metrics(), 200, {"Content-Type": CONTENT_TYPE}
 
     # Register blueprints
     app.register_blueprint(customers_bp, url_prefix="/customers")
     app.register_blueprint(mechanics_bp, url_prefix="/mechanics")
     app.register_blueprint(service_tickets_bp, url_prefix="/service_tickets")
     app.register_blueprint(inventory_items_bp, url_prefix="/inventory")
-    app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
+    app.register_blueprint(search_bp, url_prefix="/search")
+
+    # Swagger UI can be switched off (SWAGGER_UI_ENABLED); imported only when used
+    if app.config.get("SWAGGER_UI_ENABLED", True):
+        from flask_swagger_ui import get_swaggerui_blueprint
+
+        swaggerui_blueprint = get_swaggerui_blueprint(
+            SWAGGER_URL, API_URL, config={"app_name": "Mechanic Shop API"}
+        )
+        app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
+
+    # flask seed (synthetic data); its module loads only when the command runs
+    app.cli.add_command(
+        LazyCommand(
+            "seed",
+            "app.utils.seed:seed_command",
+            help="Append synthetic customers, mechanics, parts and linked tickets.",
+        )
+    )
 
+    record_phase(app, "create_app", time.perf_counter() - started)
     return app
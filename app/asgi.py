@@ -0,0 +1,120 @@
+"""ASGI front end that serves the read-heavy routes on SQLAlchemy's async engine.
+
+GET/HEAD requests for ``ASYNC_READ_ENDPOINTS`` run the regular Flask view
+(same models, schemas, response cache, ETags and request hooks) inside
+``AsyncSession.run_sync``: the view's ``db.session`` is the async session's
+sync facade, so each statement awaits the async driver (aiosqlite, asyncpg,
+aiomysql) and the event loop serves other requests while it waits instead of
+holding a worker thread. Every other request goes to the Flask app through a
+thread-pool WSGI adapter and the normal sync engine.
+
+Cache and rate limiter lookups stay synchronous; with Redis behind them they
+briefly block the event loop.
+"""
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from werkzeug.exceptions import HTTPException
+from werkzeug.wrappers import Response
+from app.models import db
+import warnings
+
+with warnings.catch_warnings():
+    # Deprecated in favour of a2wsgi, but it ships with the pinned Starlette
+    warnings.simplefilter("ignore", DeprecationWarning)
+    from starlette.middleware.wsgi import WSGIMiddleware, build_environ
+
+ASYNC_READ_ENDPOINTS = (
+    "service_tickets_bp.get_all_service_tickets",
+    "service_tickets_bp.get_my_tickets",
+    "inventory_items_bp.get_all_inventory_items",
+    "search_bp.search",
+)
+
+# Sync backend -> async driver
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def async_database_uri(uri):
+    """``uri`` with its driver swapped for the backend's async driver."""
+    url = make_url(uri)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(app):
+    """Async engine for ``app``'s database (or ``ASYNC_DATABASE_URI``) with the
+    same pool settings as the sync engine."""
+    uri = app.config.get("ASYNC_DATABASE_URI")
+    if not uri:
+        with app.app_context():
+            # The resolved URL: relative SQLite paths point into the instance folder
+            uri = async_database_uri(db.engine.url)
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    options.pop("poolclass", None)  # TimedQueuePool only wraps sync connections
+    return create_async_engine(uri, **options)
+
+
+class AsyncReadApp:
+    """ASGI application wrapping ``flask_app``; see the module docstring."""
+
+    def __init__(self, flask_app, engine=None, endpoints=ASYNC_READ_ENDPOINTS):
+        self.flask_app = flask_app
+        self.engine = engine or create_async_db_engine(flask_app)
+        self.endpoints = frozenset(endpoints)
+        self.wsgi = WSGIMiddleware(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+            environ = build_environ(scope, b"")
+            if self._is_async_read(environ):
+                await self._serve_read(environ, send)
+            else:
+                await self.wsgi(scope, receive, send)
+        else:
+            await self.wsgi(scope, receive, send)
+
+    def _is_async_read(self, environ):
+        try:
+            endpoint, _ = self.flask_app.url_map.bind_to_environ(environ).match()
+        except HTTPException:  # 404, 405 and slash redirects stay on Flask
+            return False
+        return endpoint in self.endpoints
+
+    async def _serve_read(self, environ, send):
+        async with AsyncSession(self.engine) as session:
+            response = await session.run_sync(self._dispatch, environ)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [
+                    (name.lower().encode("latin1"), value.encode("latin1"))
+                    for name, value in response.headers.items()
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": response.get_data()})
+
+    def _dispatch(self, session, environ):
+        # Runs in a greenlet; the request reuses this app context, so
+        # db.session is the async session's sync facade until teardown
+        with self.flask_app.app_context():
+            db.session.registry.set(session)
+            return Response.from_app(self.flask_app.wsgi_app, environ, buffered=True)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
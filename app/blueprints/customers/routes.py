@@ -5,7 +5,17 @@ from sqlalchemy import select
 from app.models import db, Customer
 from app.extensions import limiter, cache
 from . import customers_bp
-from app.utils.util import encode_token, token_required
+from app.utils.util import (
+    encode_token,
+    token_required,
+    get_current_customer,
+    keyset_paginate,
+    paginated_response,
+    sparse_fieldset,
+    bulk_create,
+    find_duplicates,
+)
+from app.utils.caching import cached_response, invalidate
 
 
 # CUSTOMER LOGIN
@@ -54,22 +64,38 @@ def create_customer():
     new_customer = Customer(**customer_data)
     db.session.add(new_customer)
     db.session.commit()
+    invalidate("customers")
     return customer_schema.jsonify(new_customer), 201
 
 
+# BULK ADD CUSTOMERS
+@customers_bp.route("/bulk", methods=["POST"])
+def bulk_create_customers():
+    response = bulk_create(
+        customer_schema,
+        lambda data: Customer(**data),
+        lambda items: find_duplicates(
+            Customer.email,
+            [(index, data["email"]) for index, data in items],
+            "Email already exists",
+        ),
+    )
+    invalidate("customers")
+    return response
+
+
 # GET ALL CUSTOMERS
 @customers_bp.route("/", methods=["GET"])
+@cached_response("customers")
 def get_all_customers():
     try:
-        page = int(request.args.get("page", 1))
-        per_page = int(request.args.get("per_page", 5))
-        query = select(Customer)
-        customers = db.paginate(query, page=page, per_page=per_page)
-        return customers_schema.jsonify(customers), 200
-    except:
-        query = select(Customer)
-        customers = db.session.execute(query).scalars().all()
-        return customers_schema.jsonify(customers), 200
+        schema, options = sparse_fieldset(customers_schema, [Customer.id])
+        customers, next_cursor = keyset_paginate(
+            select(Customer).options(*options), [Customer.id]
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return paginated_response(schema, customers, next_cursor)
 
 
 # UPDATE CUSTOMER
@@ -79,7 +105,7 @@ def get_all_customers():
     "10 per day"
 )  # Limit to avoid abuse from excessive changes made to customer records
 def update_customer(customer_id):
-    customer = db.session.get(Customer, customer_id)
+    customer = get_current_customer()
 
     if not customer:
         return jsonify({"error": "Customer not found"}), 404
@@ -100,6 +126,7 @@ def update_customer(customer_id):
         setattr(customer, key, value)
 
     db.session.commit()
+    invalidate("customers")
     return customer_schema.jsonify(customer), 200
 
 
@@ -108,14 +135,16 @@ def update_customer(customer_id):
 @token_required  # Ensure the user is authenticated before allowing deletion
 @limiter.limit("5 per day")  # Limit to avoid abuse from excessive deletions
 def delete_customer(customer_id):
-    query = select(Customer).where(Customer.id == customer_id)
-    customer = db.session.execute(query).scalars().first()
+    customer = get_current_customer()
 
     if not customer:
         return jsonify({"error": "Customer not found"}), 404
 
+    # Tickets are removed with the customer (cascade), so drop their entries too
+    ticket_tags = [f"service_ticket:{ticket.id}" for ticket in customer.service_tickets]
     db.session.delete(customer)
     db.session.commit()
+    invalidate("customers", "service_tickets", *ticket_tags)
     return (
         jsonify({"message": f"Customer id: {customer_id} deleted successfully"}),
         200,
@@ -6,6 +6,7 @@ from marshmallow import fields
 class CustomerSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Customer
+        exclude = ("version",)  # exposed through the ETag header instead
 
     # Explicitly define required fields for better validation
     name = fields.String(required=True)
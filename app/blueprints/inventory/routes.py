@@ -5,6 +5,16 @@ from sqlalchemy import select
 from app.models import db, InventoryItem
 from app.extensions import limiter
 from . import inventory_items_bp
+from app.utils.util import (
+    keyset_paginate,
+    paginated_response,
+    sparse_fieldset,
+    bulk_create,
+    find_duplicates,
+    row_etag,
+    conditional_response,
+)
+from app.utils.caching import cached_response, invalidate
 
 
 # ADD INVENTORY ITEM
@@ -25,31 +35,51 @@ def create_inventory_item():
     new_item = InventoryItem(**inventory_data)
     db.session.add(new_item)
     db.session.commit()
+    invalidate("inventory")
     return inventory_item_schema.jsonify(new_item), 201
 
 
+# BULK ADD INVENTORY ITEMS
+@inventory_items_bp.route("/bulk", methods=["POST"])
+def bulk_create_inventory_items():
+    response = bulk_create(
+        inventory_item_schema,
+        lambda data: InventoryItem(**data),
+        lambda items: find_duplicates(
+            InventoryItem.name,
+            [(index, data["name"]) for index, data in items],
+            "Item already exists in Inventory",
+        ),
+    )
+    invalidate("inventory")
+    return response
+
+
 # GET ALL INVENTORY ITEMS
 @inventory_items_bp.route("/", methods=["GET"])
+@cached_response("inventory")
 def get_all_inventory_items():
     try:
-        page = int(request.args.get("page", 1))
-        per_page = int(request.args.get("per_page", 5))
-        query = select(InventoryItem)
-        inventory_items = db.paginate(query, page=page, per_page=per_page)
-        return inventory_items_schema.jsonify(inventory_items), 200
-    except:
-        query = select(InventoryItem)
-        inventory_items = db.session.execute(query).scalars().all()
-        return inventory_items_schema.jsonify(inventory_items), 200
+        schema, options = sparse_fieldset(inventory_items_schema, [InventoryItem.id])
+        inventory_items, next_cursor = keyset_paginate(
+            select(InventoryItem).options(*options), [InventoryItem.id]
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return paginated_response(schema, inventory_items, next_cursor)
 
 
 # GET SPECIFIC INVENTORY ITEM
 @inventory_items_bp.route("/<int:item_id>", methods=["GET"])
+@cached_response("inventory:{item_id}")
 def get_inventory_item(item_id):
     inventory_item = db.session.get(InventoryItem, item_id)
 
     if inventory_item:
-        return inventory_item_schema.jsonify(inventory_item), 200
+        return conditional_response(
+            row_etag([inventory_item]),
+            lambda: inventory_item_schema.jsonify(inventory_item),
+        )
     return jsonify({"error": "Inventory item not found"}), 404
 
 
@@ -85,6 +115,7 @@ def update_inventory_item(item_id):
         setattr(inventory_item, key, value)
 
     db.session.commit()
+    invalidate("inventory", f"inventory:{item_id}")
     return inventory_item_schema.jsonify(inventory_item), 200
 
 
@@ -100,6 +131,7 @@ def delete_inventory_item(item_id):
 
     db.session.delete(inventory_item)
     db.session.commit()
+    invalidate("inventory", f"inventory:{item_id}")
     return (
         jsonify(
             {
@@ -6,6 +6,7 @@ from marshmallow import fields
 class InventoryItemSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = InventoryItem
+        exclude = ("version",)  # exposed through the ETag header instead
 
     # Explicitly define required fields for better validation
     name = fields.String(required=True)
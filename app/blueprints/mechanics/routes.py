@@ -1,10 +1,25 @@
 from .schemas import mechanic_schema, mechanics_schema
 from flask import request, jsonify
 from marshmallow import ValidationError
-from sqlalchemy import select
-from app.models import db, Mechanic
+from sqlalchemy import select, func, and_, or_
+from datetime import date
+from app.models import db, Mechanic, ServiceTicket, service_mechanics
 from app.extensions import limiter, cache
 from . import mechanics_bp
+from app.utils.util import (
+    keyset_paginate,
+    paginated_response,
+    sparse_fieldset,
+    bulk_create,
+    find_duplicates,
+    get_page_limit,
+    encode_cursor,
+    decode_cursor,
+    row_etag,
+    conditional_response,
+)
+from app.utils.caching import cached_response, invalidate
+from app.utils.search import matching_ids
 
 
 # ADD MECHANIC
@@ -28,40 +43,70 @@ def create_mechanic():
 
     db.session.add(new_mechanic)
     db.session.commit()
+    invalidate("mechanics")
     return mechanic_schema.jsonify(new_mechanic), 201
 
 
+# BULK ADD MECHANICS
+@mechanics_bp.route("/bulk", methods=["POST"])
+def bulk_create_mechanics():
+    response = bulk_create(
+        mechanic_schema,
+        lambda mechanic: mechanic,  # schema loads Mechanic instances
+        lambda items: find_duplicates(
+            Mechanic.email,
+            [(index, mechanic.email) for index, mechanic in items],
+            "Email already exists",
+        ),
+    )
+    invalidate("mechanics")
+    return response
+
+
 # GET ALL MECHANICS
 @mechanics_bp.route("/", methods=["GET"])
 @limiter.limit("5 per minute")  # Limit to avoid abuse from excessive requests
+@cached_response("mechanics")
 def get_all_mechanics():
-    query = select(Mechanic)
-    mechanics = db.session.execute(query).scalars().all()
-
-    return mechanics_schema.jsonify(mechanics), 200
+    try:
+        schema, options = sparse_fieldset(mechanics_schema, [Mechanic.id])
+        mechanics, next_cursor = keyset_paginate(
+            select(Mechanic).options(*options), [Mechanic.id]
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return paginated_response(schema, mechanics, next_cursor)
 
 
 # GET SPECIFIC MECHANIC
 @mechanics_bp.route("/<int:mechanic_id>", methods=["GET"])
+@cached_response("mechanic:{mechanic_id}")
 def get_mechanic(mechanic_id):
     mechanic = db.session.get(Mechanic, mechanic_id)
 
     if mechanic:
-        return mechanic_schema.jsonify(mechanic), 200
+        return conditional_response(
+            row_etag([mechanic]), lambda: mechanic_schema.jsonify(mechanic)
+        )
     return jsonify({"error": "Mechanic not found."}), 404
 
 
 # SEARCH MECHANICS BY NAME
 @mechanics_bp.route("/search", methods=["GET"])
+@cached_response("mechanics")
 def search_mechanics():
     name = request.args.get("name")
 
-    query = select(Mechanic).where(Mechanic.name.like(f"%{name}%"))
-    mechanics = db.session.execute(query).scalars().all()
+    try:
+        # Word-prefix match served by the search index instead of LIKE '%name%'
+        query = select(Mechanic).where(Mechanic.id.in_(matching_ids("mechanic", name)))
+        mechanics, next_cursor = keyset_paginate(query, [Mechanic.id])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    if not mechanics:
+    if not mechanics and not request.args.get("cursor"):
         return jsonify({"error": "No mechanics found with that name."}), 404
-    return mechanics_schema.jsonify(mechanics)
+    return paginated_response(mechanics_schema, mechanics, next_cursor)
 
 
 # UPDATE MECHANIC
@@ -91,6 +136,7 @@ def update_mechanic(mechanic_id):
     mechanic.salary = updated_mechanic.salary
 
     db.session.commit()
+    invalidate("mechanics", f"mechanic:{mechanic_id}")
     return mechanic_schema.jsonify(mechanic), 200
 
 
@@ -105,6 +151,7 @@ def delete_mechanic(mechanic_id):
 
     db.session.delete(mechanic)
     db.session.commit()
+    invalidate("mechanics", f"mechanic:{mechanic_id}")
     return (
         jsonify({"message": f"Mechanic id: {mechanic_id} deleted successfully."}),
         200,
@@ -113,22 +160,81 @@ def delete_mechanic(mechanic_id):
 
 # MECHANIC USAGE
 @mechanics_bp.route("/usage", methods=["GET"])
+@cached_response("mechanics", "service_tickets")
 def mechanic_usage():
-    query = select(Mechanic)
-    mechanics = db.session.execute(query).scalars().all()
+    try:
+        limit = get_page_limit()
+        min_count = int(request.args.get("min_count", 0))
+        start_date = request.args.get("start_date")
+        end_date = request.args.get("end_date")
+        start_date = date.fromisoformat(start_date) if start_date else None
+        end_date = date.fromisoformat(end_date) if end_date else None
+    except ValueError:
+        return (
+            jsonify(
+                {
+                    "error": "limit and min_count must be integers, dates must be YYYY-MM-DD"
+                }
+            ),
+            400,
+        )
 
-    mechanics.sort(key=lambda mechanic: len(mechanic.service_tickets), reverse=True)
+    # Count tickets per mechanic in the database; mechanics with no tickets count 0
+    query = select(Mechanic.id, Mechanic.name).outerjoin(
+        service_mechanics, service_mechanics.c.mechanic_id == Mechanic.id
+    )
+    if start_date or end_date:
+        ticket_filter = [ServiceTicket.id == service_mechanics.c.service_id]
+        if start_date:
+            ticket_filter.append(ServiceTicket.service_date >= start_date)
+        if end_date:
+            ticket_filter.append(ServiceTicket.service_date <= end_date)
+        query = query.outerjoin(ServiceTicket, and_(*ticket_filter))
+        ticket_count = func.count(ServiceTicket.id)
+    else:
+        ticket_count = func.count(service_mechanics.c.service_id)
+
+    query = query.add_columns(ticket_count.label("ticket_count")).group_by(
+        Mechanic.id, Mechanic.name
+    )
+    if min_count:
+        query = query.having(ticket_count >= min_count)
+
+    # Keyset pagination on (ticket_count DESC, id ASC)
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            last_count, last_id = decode_cursor(cursor, [ticket_count, Mechanic.id])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        query = query.having(
+            or_(
+                ticket_count < last_count,
+                and_(ticket_count == last_count, Mechanic.id > last_id),
+            )
+        )
+
+    query = query.order_by(ticket_count.desc(), Mechanic.id).limit(limit + 1)
+    rows = db.session.execute(query).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].ticket_count, rows[-1].id])
 
     return (
         jsonify(
-            [
-                {
-                    "id": mechanic.id,
-                    "name": mechanic.name,
-                    "ticket_count": len(mechanic.service_tickets),
-                }
-                for mechanic in mechanics
-            ]
+            {
+                "items": [
+                    {
+                        "id": row.id,
+                        "name": row.name,
+                        "ticket_count": row.ticket_count,
+                    }
+                    for row in rows
+                ],
+                "next_cursor": next_cursor,
+            }
         ),
         200,
     )
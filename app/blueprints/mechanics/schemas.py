@@ -6,6 +6,7 @@ from marshmallow import fields
 class MechanicSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Mechanic
+        exclude = ("version",)  # exposed through the ETag header instead
         load_instance = True  # This helps with validation
 
     # Explicitly define required fields
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+search_bp = Blueprint("search_bp", __name__, cli_group="search")
+
+from . import routes  # Import routes to register them with the blueprint
@@ -0,0 +1,64 @@
+from .schemas import result_schemas
+from flask import request, jsonify
+from sqlalchemy import select
+from app.models import db
+from . import search_bp
+from app.utils.util import row_etag, conditional_response
+from app.utils.caching import cached_response, invalidate
+from app.utils.serialization import dump
+from app.utils.search import KINDS, search_page, rebuild_search_index
+
+
+# SEARCH MECHANICS, CUSTOMERS AND TICKET VINS
+@search_bp.route("/", methods=["GET"])
+@cached_response("search", "mechanics", "customers", "service_tickets")
+def search():
+    kinds = [kind for kind in request.args.get("type", "").split(",") if kind]
+    unknown = [kind for kind in kinds if kind not in KINDS]
+    if unknown:
+        return (
+            jsonify({"error": f"type must be one of: {', '.join(KINDS)}"}),
+            400,
+        )
+
+    try:
+        hits, next_cursor = search_page(request.args.get("q"), kinds)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # One IN query per kind present on the page
+    rows = {}
+    for kind, (model, _) in KINDS.items():
+        ids = [hit.ref_id for hit in hits if hit.kind == kind]
+        if ids:
+            found = db.session.execute(select(model).where(model.id.in_(ids)))
+            rows.update({(kind, row.id): row for row in found.scalars()})
+    results = [
+        (hit, rows[(hit.kind, hit.ref_id)])
+        for hit in hits
+        if (hit.kind, hit.ref_id) in rows
+    ]
+
+    def build():
+        items = [
+            {
+                "type": hit.kind,
+                "id": hit.ref_id,
+                "rank": hit.rank,
+                "data": dump(result_schemas[hit.kind], row),
+            }
+            for hit, row in results
+        ]
+        return jsonify({"items": items, "next_cursor": next_cursor})
+
+    etag = row_etag([row for _, row in results], extra=next_cursor)
+    return conditional_response(etag, build, weak=True)
+
+
+# REBUILD THE SEARCH INDEX (flask search reindex)
+@search_bp.cli.command("reindex")
+def reindex():
+    """Rebuild the search index from the customers, mechanics and tickets."""
+    total = rebuild_search_index()
+    invalidate("search")
+    print(f"Indexed {total} documents")
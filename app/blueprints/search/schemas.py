@@ -0,0 +1,12 @@
+from app.blueprints.customers.schemas import CustomerSchema
+from app.blueprints.mechanics.schemas import MechanicSchema
+from app.blueprints.service_tickets.schemas import ServiceTicketSchema
+
+# Compact payloads for typeahead results (no salaries, passwords or nested rows)
+result_schemas = {
+    "mechanic": MechanicSchema(only=("id", "name", "email", "phone")),
+    "customer": CustomerSchema(only=("id", "name", "email", "phone")),
+    "ticket": ServiceTicketSchema(
+        only=("id", "VIN", "service_date", "service_desc", "customer_id")
+    ),
+}
@@ -1,18 +1,65 @@
-from xml.parsers.expat import errors
 from .schemas import (
     service_ticket_schema,
     service_tickets_schema,
     edit_service_ticket_schema,
+    bulk_edit_service_tickets_schema,
 )
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context
+from datetime import date
+import csv
+import io
+import json
 from marshmallow import ValidationError
-from sqlalchemy import select
-from app.models import db, ServiceTicket, Customer, Mechanic, InventoryItem
-from app.utils.util import token_required
+from sqlalchemy import select, insert, update, delete, tuple_
+from sqlalchemy.orm import selectinload
+from app.models import (
+    db,
+    ServiceTicket,
+    Customer,
+    Mechanic,
+    InventoryItem,
+    service_mechanics,
+    service_inventory,
+)
+from app.utils.util import (
+    token_required,
+    get_current_customer,
+    keyset_paginate,
+    paginated_response,
+    sparse_fieldset,
+    bulk_create,
+    row_etag,
+    conditional_response,
+)
+from app.utils.caching import cached_response, invalidate
+from app.utils.serialization import dump
 
 # from app.extensions import limiter, cache
 from . import service_tickets_bp
 
+# Load nested mechanics/inventory in one extra query each instead of per ticket
+ticket_load_options = (
+    selectinload(ServiceTicket.mechanics),
+    selectinload(ServiceTicket.inventory_items),
+)
+
+# Tickets are paged in service date order, with id as the tie-breaker
+ticket_page_key = [ServiceTicket.service_date, ServiceTicket.id]
+
+# Nested relationships serialized with each ticket
+ticket_links_fields = ("mechanics", "inventory_items")
+
+
+def ticket_etag_rows(tickets, schema=service_tickets_schema):
+    # Nested mechanics/items are serialized with the ticket, so they count too
+    # (only when the schema, possibly narrowed by ?fields=, includes them)
+    nested = [name for name in ticket_links_fields if name in schema.dump_fields]
+    return [
+        row
+        for ticket in tickets
+        for row in (ticket, *(r for name in nested for r in getattr(ticket, name)))
+    ]
+
 
 # ADD SERVICE TICKET
 @service_tickets_bp.route("/", methods=["POST"])
@@ -45,43 +92,362 @@ def create_service_ticket():
     )
     db.session.add(new_ticket)
     db.session.commit()
+    invalidate("service_tickets")
 
     return service_ticket_schema.jsonify(new_ticket), 201
 
 
+# BULK ADD SERVICE TICKETS
+def find_missing_customers(items):
+    customer_ids = {ticket.customer_id for _, ticket in items}
+    found = set(
+        db.session.execute(
+            select(Customer.id).where(Customer.id.in_(customer_ids))
+        ).scalars()
+    )
+    return {
+        index: (404, "Customer not found")
+        for index, ticket in items
+        if ticket.customer_id not in found
+    }
+
+
+@service_tickets_bp.route("/bulk", methods=["POST"])
+def bulk_create_service_tickets():
+    response = bulk_create(
+        service_ticket_schema,
+        lambda ticket: ticket,  # schema loads ServiceTicket instances
+        find_missing_customers,
+    )
+    invalidate("service_tickets")
+    return response
+
+
 # GET ALL SERVICE TICKETS
 @service_tickets_bp.route("/", methods=["GET"])
+@cached_response("service_tickets", "mechanics", "inventory")
 def get_all_service_tickets():
-    query = select(ServiceTicket)
-    result = db.session.execute(query).scalars().all()
-    return service_tickets_schema.jsonify(result), 200
+    try:
+        schema, options = sparse_fieldset(
+            service_tickets_schema, ticket_page_key, ticket_load_options
+        )
+        result, next_cursor = keyset_paginate(
+            select(ServiceTicket).options(*options), ticket_page_key
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return paginated_response(
+        schema, result, next_cursor, ticket_etag_rows(result, schema)
+    )
 
 
 # GET SPECIFIC SERVICE TICKET
 @service_tickets_bp.route("/<int:service_ticket_id>", methods=["GET"])
+@cached_response("service_ticket:{service_ticket_id}", "mechanics", "inventory")
 def get_service_ticket(service_ticket_id):
-    service_ticket = db.session.get(ServiceTicket, service_ticket_id)
+    service_ticket = db.session.get(
+        ServiceTicket, service_ticket_id, options=ticket_load_options
+    )
 
     if service_ticket:
-        return service_ticket_schema.jsonify(service_ticket), 200
+        return conditional_response(
+            row_etag(ticket_etag_rows([service_ticket])),
+            lambda: service_ticket_schema.jsonify(service_ticket),
+        )
     return jsonify({"error": "Service Ticket not found."}), 404
 
 
 # GET SERVICE TICKETS BY CUSTOMER
 @service_tickets_bp.route("/my-tickets", methods=["GET"])
 @token_required
+@cached_response("service_tickets", "mechanics", "inventory", per_customer=True)
 def get_my_tickets(current_customer_id):
-    query = select(ServiceTicket).where(
-        ServiceTicket.customer_id == current_customer_id
-    )
+    customer = get_current_customer()
+    if not customer:
+        return jsonify({"error": "Customer not found"}), 404
 
-    result = db.session.execute(query).scalars().all()
-    if not result:
+    query = (
+        select(ServiceTicket)
+        .where(ServiceTicket.customer_id == customer.id)
+        .options(*ticket_load_options)
+    )
+    try:
+        result, next_cursor = keyset_paginate(query, ticket_page_key)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not result and not request.args.get("cursor"):
         return (
             jsonify({"message": "No open service tickets found for this customer."}),
             200,
         )
-    return service_tickets_schema.jsonify(result), 200
+    return paginated_response(
+        service_tickets_schema, result, next_cursor, ticket_etag_rows(result)
+    )
+
+
+# EXPORT SERVICE TICKETS (STREAMING NDJSON/CSV)
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CSV_COLUMNS = [
+    "id",
+    "VIN",
+    "service_date",
+    "service_desc",
+    "customer_id",
+    "mechanic_ids",
+    "mechanic_names",
+    "item_ids",
+    "item_names",
+    "parts_total",
+]
+
+
+def iter_export_batches(filters):
+    """Yield lists of ticket dicts, EXPORT_BATCH_SIZE tickets at a time.
+
+    Uses plain Core rows and keyset paging on (service_date, id) so neither the
+    session identity map nor the query cost grows with the size of the export.
+    """
+    ticket_columns = (
+        ServiceTicket.id,
+        ServiceTicket.VIN,
+        ServiceTicket.service_date,
+        ServiceTicket.service_desc,
+        ServiceTicket.customer_id,
+    )
+    last_key = None
+    while True:
+        query = select(*ticket_columns).where(*filters)
+        if last_key:
+            query = query.where(tuple_(*ticket_page_key) > tuple_(*last_key))
+        query = query.order_by(*ticket_page_key).limit(EXPORT_BATCH_SIZE)
+        rows = db.session.execute(query).all()
+        if not rows:
+            return
+        last_key = (rows[-1].service_date, rows[-1].id)
+
+        tickets = {
+            row.id: {
+                "id": row.id,
+                "VIN": row.VIN,
+                "service_date": row.service_date.isoformat(),
+                "service_desc": row.service_desc,
+                "customer_id": row.customer_id,
+                "mechanics": [],
+                "inventory_items": [],
+            }
+            for row in rows
+        }
+        mechanics_query = (
+            select(service_mechanics.c.service_id, Mechanic.id, Mechanic.name)
+            .join(Mechanic, Mechanic.id == service_mechanics.c.mechanic_id)
+            .where(service_mechanics.c.service_id.in_(tickets))
+            .order_by(service_mechanics.c.service_id, Mechanic.id)
+        )
+        for service_id, mechanic_id, name in db.session.execute(mechanics_query):
+            tickets[service_id]["mechanics"].append({"id": mechanic_id, "name": name})
+        items_query = (
+            select(
+                service_inventory.c.service_id,
+                InventoryItem.id,
+                InventoryItem.name,
+                InventoryItem.price,
+            )
+            .join(InventoryItem, InventoryItem.id == service_inventory.c.item_id)
+            .where(service_inventory.c.service_id.in_(tickets))
+            .order_by(service_inventory.c.service_id, InventoryItem.id)
+        )
+        for service_id, item_id, name, price in db.session.execute(items_query):
+            tickets[service_id]["inventory_items"].append(
+                {"id": item_id, "name": name, "price": price}
+            )
+
+        yield list(tickets.values())
+        # Release the batch's connection state between batches
+        db.session.rollback()
+
+
+def iter_ndjson(batches):
+    for batch in batches:
+        yield "".join(json.dumps(ticket) + "\n" for ticket in batch)
+
+
+def iter_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    for batch in batches:
+        for ticket in batch:
+            writer.writerow(
+                [
+                    ticket["id"],
+                    ticket["VIN"],
+                    ticket["service_date"],
+                    ticket["service_desc"],
+                    ticket["customer_id"],
+                    ";".join(str(m["id"]) for m in ticket["mechanics"]),
+                    ";".join(m["name"] for m in ticket["mechanics"]),
+                    ";".join(str(i["id"]) for i in ticket["inventory_items"]),
+                    ";".join(i["name"] for i in ticket["inventory_items"]),
+                    f"{sum(i['price'] for i in ticket['inventory_items']):.2f}",
+                ]
+            )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header-only export when there are no tickets
+    if buffer.getvalue():
+        yield buffer.getvalue()
+
+
+@service_tickets_bp.route("/export", methods=["GET"])
+def export_service_tickets():
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be 'ndjson' or 'csv'"}), 400
+
+    filters = []
+    try:
+        if request.args.get("start_date"):
+            start_date = date.fromisoformat(request.args["start_date"])
+            filters.append(ServiceTicket.service_date >= start_date)
+        if request.args.get("end_date"):
+            end_date = date.fromisoformat(request.args["end_date"])
+            filters.append(ServiceTicket.service_date <= end_date)
+        if request.args.get("customer_id"):
+            customer_id = int(request.args["customer_id"])
+            filters.append(ServiceTicket.customer_id == customer_id)
+    except ValueError:
+        return (
+            jsonify(
+                {"error": "Dates must be YYYY-MM-DD and customer_id must be an integer"}
+            ),
+            400,
+        )
+
+    batches = iter_export_batches(filters)
+    if export_format == "csv":
+        body, mimetype = iter_csv(batches), "text/csv"
+    else:
+        body, mimetype = iter_ndjson(batches), "application/x-ndjson"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename=service_tickets.{export_format}"
+        },
+    )
+
+
+# Link table, its id column, the linked model and the label used in notes
+ticket_links = {
+    "mechanic": (
+        service_mechanics,
+        service_mechanics.c.mechanic_id,
+        Mechanic,
+        "Mechanic",
+    ),
+    "item": (
+        service_inventory,
+        service_inventory.c.item_id,
+        InventoryItem,
+        "Inventory item",
+    ),
+}
+
+
+def apply_link_edits(ticket_ids, link, add_ids, remove_ids, notes):
+    """Add/remove mechanics or inventory items on every ticket in ``ticket_ids``
+    using one lookup per table and bulk INSERT/DELETE statements.
+
+    Per-id problems are appended to ``notes[ticket_id]``; edits are applied in
+    request order, so adding then removing the same id is a no-op.
+    """
+    table, link_column, model, label = ticket_links[link]
+    if not add_ids and not remove_ids:
+        return
+
+    names = dict(
+        db.session.execute(
+            select(model.id, model.name).where(model.id.in_(set(add_ids + remove_ids)))
+        ).all()
+    )
+    assigned = {ticket_id: set() for ticket_id in ticket_ids}
+    for ticket_id, link_id in db.session.execute(
+        select(table.c.service_id, link_column).where(
+            table.c.service_id.in_(ticket_ids)
+        )
+    ):
+        assigned[ticket_id].add(link_id)
+
+    to_insert, to_delete = set(), set()
+    for ticket_id in ticket_ids:
+        current = assigned[ticket_id]
+        for link_id in add_ids:
+            if link_id not in names:
+                notes[ticket_id].append(f"{label} ID '{link_id}' not found in system")
+            elif link_id in current:
+                notes[ticket_id].append(
+                    f"{label} '{names[link_id]}' already assigned to this ticket"
+                )
+            else:
+                current.add(link_id)
+                to_insert.add((ticket_id, link_id))
+        for link_id in remove_ids:
+            if link_id not in names:
+                notes[ticket_id].append(f"{label} ID '{link_id}' not found in system")
+            elif link_id not in current:
+                notes[ticket_id].append(
+                    f"{label} '{names[link_id]}' not assigned to this ticket"
+                )
+            else:
+                current.remove(link_id)
+                if (ticket_id, link_id) in to_insert:
+                    to_insert.remove((ticket_id, link_id))
+                else:
+                    to_delete.add((ticket_id, link_id))
+
+    if to_insert:
+        db.session.execute(
+            insert(table),
+            [
+                {"service_id": ticket_id, link_column.key: link_id}
+                for ticket_id, link_id in sorted(to_insert)
+            ],
+        )
+    if to_delete:
+        db.session.execute(
+            delete(table).where(
+                tuple_(table.c.service_id, link_column).in_(sorted(to_delete))
+            )
+        )
+    # Link rows bypass the ORM, so bump the ticket versions explicitly
+    changed_ids = {ticket_id for ticket_id, _ in to_insert | to_delete}
+    if changed_ids:
+        db.session.execute(
+            update(ServiceTicket)
+            .where(ServiceTicket.id.in_(changed_ids))
+            .values(version=ServiceTicket.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def apply_ticket_edits(ticket_ids, edits):
+    notes = {ticket_id: [] for ticket_id in ticket_ids}
+    apply_link_edits(
+        ticket_ids,
+        "mechanic",
+        edits.get("add_mechanic_ids", []),
+        edits.get("remove_mechanic_ids", []),
+        notes,
+    )
+    apply_link_edits(
+        ticket_ids,
+        "item",
+        edits.get("add_item_ids", []),
+        edits.get("remove_item_ids", []),
+        notes,
+    )
+    return notes
 
 
 # UPDATE SERVICE TICKET - ADD/REMOVE MECHANICS AND INVENTORY
@@ -92,8 +458,7 @@ def edit_service_ticket(service_ticket_id):
     except ValidationError as e:
         return jsonify(e.messages), 400
 
-    query = select(ServiceTicket).where(ServiceTicket.id == service_ticket_id)
-    service_ticket = db.session.execute(query).scalars().first()
+    service_ticket = db.session.get(ServiceTicket, service_ticket_id)
     if not service_ticket:
         return (
             jsonify(
@@ -102,51 +467,19 @@ def edit_service_ticket(service_ticket_id):
             404,
         )
 
-    errors = []
-
-    # Add Mechanics
-    for mech_id in service_ticket_edits.get("add_mechanic_ids", []):
-        mechanic = db.session.get(Mechanic, mech_id)
-        if not mechanic:
-            errors.append(f"Mechanic ID '{mech_id}' not found in system")
-        elif mechanic in service_ticket.mechanics:
-            errors.append(f"Mechanic '{mechanic.name}' already assigned to this ticket")
-        else:
-            service_ticket.mechanics.append(mechanic)
-
-    # Remove Mechanics
-    for mech_id in service_ticket_edits.get("remove_mechanic_ids", []):
-        mechanic = db.session.get(Mechanic, mech_id)
-        if not mechanic:
-            errors.append(f"Mechanic ID '{mech_id}' not found in system")
-        elif mechanic not in service_ticket.mechanics:
-            errors.append(f"Mechanic '{mechanic.name}' not assigned to this ticket")
-        else:
-            service_ticket.mechanics.remove(mechanic)
-
-    # Add Inventory Items
-    for item_id in service_ticket_edits.get("add_item_ids", []):
-        item = db.session.get(InventoryItem, item_id)
-        if not item:
-            errors.append(f"Inventory item ID '{item_id}' not found in system")
-        elif item in service_ticket.inventory_items:
-            errors.append(
-                f"Inventory item '{item.name}' already assigned to this ticket"
-            )
-        else:
-            service_ticket.inventory_items.append(item)
-
-    # Remove Inventory Items
-    for item_id in service_ticket_edits.get("remove_item_ids", []):
-        item = db.session.get(InventoryItem, item_id)
-        if not item:
-            errors.append(f"Inventory item ID '{item_id}' not found in system")
-        elif item not in service_ticket.inventory_items:
-            errors.append(f"Inventory item '{item.name}' not assigned to this ticket")
-        else:
-            service_ticket.inventory_items.remove(item)
-
+    errors = apply_ticket_edits([service_ticket_id], service_ticket_edits)[
+        service_ticket_id
+    ]
     db.session.commit()
+    invalidate("service_tickets", f"service_ticket:{service_ticket_id}")
+
+    # Reload with relationships eagerly loaded for the response
+    service_ticket = db.session.get(
+        ServiceTicket,
+        service_ticket_id,
+        options=ticket_load_options,
+        populate_existing=True,
+    )
 
     return (
         jsonify(
@@ -160,6 +493,54 @@ def edit_service_ticket(service_ticket_id):
     )
 
 
+# BULK UPDATE SERVICE TICKETS - ADD/REMOVE MECHANICS AND INVENTORY
+@service_tickets_bp.route("/bulk-edit", methods=["PUT"])
+def bulk_edit_service_tickets():
+    try:
+        service_ticket_edits = bulk_edit_service_tickets_schema.load(request.json)
+    except ValidationError as e:
+        return jsonify(e.messages), 400
+
+    requested_ids = list(dict.fromkeys(service_ticket_edits["ticket_ids"]))
+    found_ids = set(
+        db.session.execute(
+            select(ServiceTicket.id).where(ServiceTicket.id.in_(requested_ids))
+        ).scalars()
+    )
+    ticket_ids = [ticket_id for ticket_id in requested_ids if ticket_id in found_ids]
+
+    notes = apply_ticket_edits(ticket_ids, service_ticket_edits)
+    for ticket_id in requested_ids:
+        if ticket_id not in found_ids:
+            notes[ticket_id] = [f"Service Ticket #{ticket_id} not found in system"]
+    db.session.commit()
+    invalidate(
+        "service_tickets", *[f"service_ticket:{ticket_id}" for ticket_id in ticket_ids]
+    )
+
+    query = (
+        select(ServiceTicket)
+        .where(ServiceTicket.id.in_(ticket_ids))
+        .order_by(ServiceTicket.id)
+        .options(*ticket_load_options)
+        .execution_options(populate_existing=True)
+    )
+    service_tickets = db.session.execute(query).scalars().all()
+
+    return (
+        jsonify(
+            {
+                "message": f"{len(ticket_ids)} Service Ticket(s) updated successfully",
+                "service_tickets": dump(service_tickets_schema, service_tickets),
+                "notes": {
+                    str(ticket_id): notes[ticket_id] for ticket_id in requested_ids
+                },
+            }
+        ),
+        200,
+    )
+
+
 # DELETE SERVICE TICKET
 @service_tickets_bp.route("/<int:service_ticket_id>", methods=["DELETE"])
 def delete_service_ticket(service_ticket_id):
@@ -178,6 +559,7 @@ def delete_service_ticket(service_ticket_id):
 
     db.session.delete(service_ticket)
     db.session.commit()
+    invalidate("service_tickets", f"service_ticket:{service_ticket_id}")
     return (
         jsonify(
             {f"message": f"Service Ticket #{service_ticket_id} deleted successfully"}
@@ -1,6 +1,6 @@
 from app.extensions import ma
 from app.models import ServiceTicket
-from marshmallow import fields
+from marshmallow import fields, validate
 
 
 class ServiceTicketSchema(ma.SQLAlchemyAutoSchema):
@@ -45,6 +45,22 @@ class EditServiceTicketSchema(ma.Schema):
         )
 
 
+class BulkEditServiceTicketsSchema(EditServiceTicketSchema):
+    ticket_ids = fields.List(
+        fields.Int(), required=True, validate=validate.Length(min=1)
+    )
+
+    class Meta:
+        fields = (
+            "ticket_ids",
+            "add_mechanic_ids",
+            "remove_mechanic_ids",
+            "add_item_ids",
+            "remove_item_ids",
+        )
+
+
 service_ticket_schema = ServiceTicketSchema()
 service_tickets_schema = ServiceTicketSchema(many=True)
 edit_service_ticket_schema = EditServiceTicketSchema()
+bulk_edit_service_tickets_schema = BulkEditServiceTicketsSchema()
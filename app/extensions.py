@@ -4,6 +4,16 @@ from flask_limiter.util import get_remote_address
 from flask_caching import Cache
 
 
+def customer_or_remote_address():
+    # Customers with a valid token get their own budget, whatever their address
+    from app.utils.util import token_customer_id
+
+    customer_id = token_customer_id()
+    if customer_id is not None:
+        return f"customer:{customer_id}"
+    return get_remote_address()
+
+
 ma = Marshmallow()  # Instantiate Marshmallow for serialization
-limiter = Limiter(key_func=get_remote_address)  # creating an instance of Limiter
-cache = Cache(config={"CACHE_TYPE": "SimpleCache"})  # Simple in-memory cache
+limiter = Limiter(key_func=customer_or_remote_address)  # creating an instance of Limiter
+cache = Cache()  # Backend comes from CACHE_TYPE in the app config
@@ -2,30 +2,36 @@ from datetime import date
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from typing import List
-from sqlalchemy import Numeric, Column, Integer
+from sqlalchemy import Numeric, Column, Integer, Index
+from app.utils.replicas import RoutingSession
 
 
 class Base(DeclarativeBase):
     pass
 
 
-db = SQLAlchemy(model_class=Base)  # Instantiate SQLAlchemy database
+# Sessions send safe requests' reads to replicas when configured (utils/replicas.py)
+db = SQLAlchemy(model_class=Base, session_options={"class_": RoutingSession})
 
 
 # Define association tables BEFORE models
+# Composite PKs cover ticket -> mechanic/item lookups; the reverse indexes cover
+# mechanic/item -> ticket lookups (usage counts, deletes)
 service_mechanics = db.Table(
     "service_mechanics",
     Base.metadata,
-    db.Column("service_id", db.ForeignKey("service_tickets.id")),
-    db.Column("mechanic_id", db.ForeignKey("mechanics.id")),
+    db.Column("service_id", db.ForeignKey("service_tickets.id"), primary_key=True),
+    db.Column("mechanic_id", db.ForeignKey("mechanics.id"), primary_key=True),
+    Index("ix_service_mechanics_mechanic_service", "mechanic_id", "service_id"),
 )
 
 service_inventory = db.Table(
     "service_inventory",
     Base.metadata,
     # db.Model.metadata,
-    db.Column("service_id", db.ForeignKey("service_tickets.id")),
-    db.Column("item_id", db.ForeignKey("inventory_items.id")),
+    db.Column("service_id", db.ForeignKey("service_tickets.id"), primary_key=True),
+    db.Column("item_id", db.ForeignKey("inventory_items.id"), primary_key=True),
+    Index("ix_service_inventory_item_service", "item_id", "service_id"),
 )
 
 
@@ -37,6 +43,8 @@ class Customer(Base):
     email: Mapped[str] = mapped_column(db.String(250), nullable=False, unique=True)
     phone: Mapped[str] = mapped_column(db.String(15), nullable=False)
     password: Mapped[str] = mapped_column(db.String(255), nullable=False)
+    version: Mapped[int] = mapped_column(nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version}  # bumped on every UPDATE
 
     service_tickets: Mapped[List["ServiceTicket"]] = db.relationship(
         back_populates="customer", cascade="all, delete"
@@ -45,12 +53,20 @@ class Customer(Base):
 
 class ServiceTicket(Base):
     __tablename__ = "service_tickets"
+    __table_args__ = (
+        # Serves customer FK lookups and /my-tickets paging on (service_date, id)
+        Index("ix_service_tickets_customer_date", "customer_id", "service_date", "id"),
+        # Serves the ticket list paging on (service_date, id)
+        Index("ix_service_tickets_date", "service_date", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    VIN: Mapped[str] = mapped_column(db.String(17), nullable=False)
+    VIN: Mapped[str] = mapped_column(db.String(17), nullable=False, index=True)
     service_date: Mapped[date] = mapped_column(db.Date)
     service_desc: Mapped[str] = mapped_column(db.String(500), nullable=False)
     customer_id: Mapped[int] = mapped_column(db.ForeignKey("customers.id"))
+    version: Mapped[int] = mapped_column(nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
 
     customer: Mapped["Customer"] = db.relationship(
         "Customer", back_populates="service_tickets"
@@ -72,6 +88,8 @@ class Mechanic(Base):
     email: Mapped[str] = mapped_column(db.String(250), nullable=False, unique=True)
     phone: Mapped[str] = mapped_column(db.String(15), nullable=False)
     salary: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
+    version: Mapped[int] = mapped_column(nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
 
     service_tickets: Mapped[List["ServiceTicket"]] = db.relationship(
         secondary=service_mechanics, back_populates="mechanics"
@@ -86,6 +104,8 @@ class InventoryItem(Base):
     price: Mapped[float] = mapped_column(db.Float(), nullable=False)
     # price: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
     # item_desc: Mapped[str] = mapped_column(db.String(500), nullable=False)
+    version: Mapped[int] = mapped_column(nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
 
     # Define association table for InventoryItem and ServiceTicket
     service_tickets: Mapped[List["ServiceTicket"]] = db.relationship(
@@ -0,0 +1,114 @@
+from functools import wraps
+from threading import Lock
+from flask import request, current_app
+from app.extensions import cache
+import hashlib
+import uuid
+
+# Tag versions never expire; a missing version gets a fresh random value so an
+# evicted tag can never resurrect entries cached under an older version.
+TAG_PREFIX = "tag:"
+VIEW_PREFIX = "view:"
+
+_stats_lock = Lock()
+
+
+def _app_stats():
+    # Counters live on the app so each app instance (and test) starts at zero
+    return current_app.extensions.setdefault(
+        "response_cache_stats", {"hits": 0, "misses": 0, "invalidations": 0}
+    )
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _app_stats()[name] += amount
+
+
+def get_cache_stats():
+    with _stats_lock:
+        stats = dict(_app_stats())
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    # Tier breakdown when the backend tracks it (TwoTierCache)
+    backend_stats = getattr(cache.cache, "stats", None)
+    if backend_stats:
+        stats["backend"] = dict(backend_stats)
+    return stats
+
+
+def _tag_versions(tags):
+    keys = [TAG_PREFIX + tag for tag in tags]
+    versions = cache.get_many(*keys)
+    missing = {key: uuid.uuid4().hex for key, v in zip(keys, versions) if v is None}
+    if missing:
+        cache.set_many(missing, timeout=0)
+    return [version or missing[key] for key, version in zip(keys, versions)]
+
+
+def invalidate(*tags):
+    """Invalidate every cached response tagged with any of ``tags``."""
+    if not tags:
+        return
+    cache.set_many({TAG_PREFIX + tag: uuid.uuid4().hex for tag in tags}, timeout=0)
+    _count("invalidations", len(tags))
+
+
+def _normalized_args():
+    # Order-independent, ignores empty values: ?b=1&a=2 and ?a=2&b=1&c= match
+    return "&".join(
+        f"{key}={value}"
+        for key in sorted(request.args)
+        for value in sorted(request.args.getlist(key))
+        if value != ""
+    )
+
+
+def cached_response(*tags, timeout=None, per_customer=False):
+    """Cache a GET view's 200 responses under ``tags``.
+
+    Tags may reference view arguments, e.g. ``"mechanic:{mechanic_id}"``. With
+    ``per_customer`` the view must sit under ``@token_required`` and entries are
+    keyed on the authenticated customer id (the view's first argument).
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            view_tags = [tag.format(**kwargs) for tag in tags]
+            identity = str(args[0]) if per_customer else ""
+            raw_key = "|".join(
+                [request.path, _normalized_args(), identity] + _tag_versions(view_tags)
+            )
+            key = VIEW_PREFIX + hashlib.sha1(raw_key.encode()).hexdigest()
+
+            hit = cache.get(key)
+            if hit is not None:
+                _count("hits")
+                body, status, mimetype, etag = hit
+                response = current_app.response_class(
+                    body, status=status, mimetype=mimetype
+                )
+                if etag:
+                    response.headers["ETag"] = etag
+                    response.make_conditional(request)
+                return response
+
+            _count("misses")
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                cache.set(
+                    key,
+                    (
+                        response.get_data(),
+                        response.status_code,
+                        response.mimetype,
+                        response.headers.get("ETag"),
+                    ),
+                    timeout=timeout,
+                )
+            return response
+
+        return decorated
+
+    return decorator
@@ -0,0 +1,146 @@
+from datetime import datetime, timezone
+from threading import Event, Lock, Thread
+from flask import current_app
+from sqlalchemy import text
+from app.extensions import cache, limiter
+from app.models import db
+import os
+import time
+
+
+def check_database():
+    db.session.execute(text("SELECT 1"))
+
+
+def check_cache():
+    # Probe the shared tier directly; the two-tier cache's L1 would hide Redis
+    backend = getattr(cache.cache, "l2", cache.cache)
+    backend.set("health:probe", 1, timeout=60)
+    if backend.get("health:probe") != 1:
+        raise RuntimeError("cache backend did not return the probe value")
+
+
+def check_limiter():
+    if not limiter.storage.check():
+        raise RuntimeError("rate limit storage unreachable")
+
+
+CHECKS = {
+    "database": check_database,
+    "cache": check_cache,
+    "limiter": check_limiter,
+}
+
+
+class HealthMonitor:
+    """Runs the readiness checks off the request path and caches the results.
+
+    Daemon threads (one per check in each worker process) probe every
+    ``interval`` seconds, so /readyz only reads the last results. A check
+    counts as failed when it raised, when its last result is older than
+    ``stale_after``, or when the current probe has been running for more than
+    ``timeout`` (a hung database shows up as not ready instead of tying up
+    request threads).
+    The call that starts the threads waits (up to ``timeout``) for their
+    first round, so a fresh worker's first probe already has results.
+    With ``interval=0`` no thread is started and ``run_checks`` is called
+    directly (tests, and inline by /health).
+    """
+
+    def __init__(self, app, interval=5.0, timeout=2.0, stale_after=None):
+        self.app = app
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after or max(3 * interval, timeout)
+        self.results = {}  # name -> result dict
+        self.running = {}  # name -> monotonic start of the in-flight check
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread_pid = None
+
+    def ensure_started(self):
+        # Threads do not survive fork, so each worker starts its own probers
+        if not self.interval or self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+        # One thread per check so a hung database cannot hold up the others
+        first_round = {name: Event() for name in CHECKS}
+        for name, done in first_round.items():
+            Thread(
+                target=self._run, args=(name, done), name=f"health-{name}", daemon=True
+            ).start()
+        deadline = time.monotonic() + self.timeout
+        for done in first_round.values():
+            done.wait(max(0.0, deadline - time.monotonic()))
+
+    def _run(self, name, first_done):
+        while True:
+            self.run_check(name)
+            first_done.set()
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop.set()
+
+    def run_checks(self):
+        for name in CHECKS:
+            self.run_check(name)
+
+    def run_check(self, name):
+        started = time.monotonic()
+        with self._lock:
+            self.running[name] = started
+        result = {"ok": True}
+        with self.app.app_context():
+            try:
+                CHECKS[name]()
+            except Exception as e:
+                result = {"ok": False, "error": str(e)}
+            finally:
+                db.session.remove()
+        result.update(
+            latency_ms=round((time.monotonic() - started) * 1000, 2),
+            checked_at=datetime.now(timezone.utc).isoformat(),
+            _monotonic=time.monotonic(),
+        )
+        with self._lock:
+            self.running.pop(name, None)
+            self.results[name] = result
+
+    def snapshot(self):
+        """Return ``(ready, checks)`` from the cached results; no I/O."""
+        now = time.monotonic()
+        with self._lock:
+            results = dict(self.results)
+            running = dict(self.running)
+        checks = {}
+        for name in CHECKS:
+            result = results.get(name)
+            if result is None:
+                checks[name] = {"ok": False, "error": "not checked yet"}
+                continue
+            check = {k: v for k, v in result.items() if not k.startswith("_")}
+            if name in running and now - running[name] > self.timeout:
+                check.update(ok=False, error="check timed out")
+            elif now - result["_monotonic"] > self.stale_after:
+                check.update(ok=False, error="result is stale")
+            checks[name] = check
+        return all(check["ok"] for check in checks.values()), checks
+
+
+def init_health(app):
+    app.extensions["health_monitor"] = HealthMonitor(
+        app,
+        interval=app.config.get("HEALTH_PROBE_INTERVAL", 5.0),
+        timeout=app.config.get("HEALTH_PROBE_TIMEOUT", 2.0),
+    )
+
+
+def get_health_monitor():
+    monitor = current_app.extensions["health_monitor"]
+    monitor.ensure_started()
+    return monitor
@@ -0,0 +1,357 @@
+"""Request metrics in the Prometheus text format (``GET /metrics``).
+
+Every thread records into its own shard (plain dicts reached through a
+``threading.local``), so the request path never takes a lock; a scrape copies
+and merges the shards. Under multi-process gunicorn each worker only sees its
+own requests, so when ``PROMETHEUS_MULTIPROC_DIR`` is set every worker also
+writes its merged totals to ``<dir>/<pid>.json`` (on each scrape it serves and
+every ``METRICS_FLUSH_INTERVAL`` seconds), and a scrape adds up all the files.
+Counters of exited workers keep counting; their gauges are dropped.
+"""
+
+from bisect import bisect_left
+from threading import Thread, local
+from flask import current_app, g, request
+from app.utils.query_tracker import n_plus_one_suspects
+import json
+import math
+import os
+import time
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0
+)  # fmt: skip
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    "http_requests_total": (
+        "counter",
+        "HTTP requests by route, method and status.",
+        None,
+    ),
+    "http_request_duration_seconds": (
+        "histogram",
+        "HTTP request latency by route and method.",
+        LATENCY_BUCKETS,
+    ),
+    "http_request_db_queries": (
+        "histogram",
+        "Database queries issued per request by route and method.",
+        QUERY_COUNT_BUCKETS,
+    ),
+    "db_queries_total": (
+        "counter",
+        "Database queries issued while handling requests.",
+        None,
+    ),
+    "db_query_duration_seconds_total": (
+        "counter",
+        "Time spent executing database queries while handling requests.",
+        None,
+    ),
+    "db_n_plus_one_requests_total": (
+        "counter",
+        "Requests that repeated one statement shape N_PLUS_ONE_THRESHOLD+ times.",
+        None,
+    ),
+    "ratelimit_rejections_total": (
+        "counter",
+        "Requests rejected by the rate limiter.",
+        None,
+    ),
+    "response_cache_hits_total": ("counter", "Response cache hits.", None),
+    "response_cache_misses_total": ("counter", "Response cache misses.", None),
+    "response_cache_invalidations_total": (
+        "counter",
+        "Response cache tag invalidations.",
+        None,
+    ),
+    "cache_backend_lookups_total": (
+        "counter",
+        "Two-tier cache lookups by result (l1_hits, l2_hits, misses).",
+        None,
+    ),
+    "app_startup_seconds": (
+        "gauge",
+        "Seconds this worker spent in each startup phase.",
+        None,
+    ),
+    "db_pool_checked_out": ("gauge", "Connections checked out of the pool.", None),
+    "db_pool_idle": ("gauge", "Idle connections in the pool.", None),
+    "db_pool_overflow": ("gauge", "Overflow connections open.", None),
+    "db_pool_checkouts_total": ("counter", "Pool checkouts.", None),
+    "db_pool_checkout_timeouts_total": ("counter", "Pool checkout timeouts.", None),
+    "db_pool_checkout_wait_seconds_total": (
+        "counter",
+        "Time spent waiting for pool connections.",
+        None,
+    ),
+}
+
+
+class _Shard:
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts..., +Inf, sum]
+
+
+class Metrics:
+    """Per-process metric store; each thread writes to its own shard."""
+
+    def __init__(self):
+        self._local = local()
+        self._shards = []
+        self._flusher_pid = None
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            self._shards.append(shard)  # list.append is atomic
+        return shard
+
+    def inc(self, name, labels, amount=1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        histograms = self._shard().histograms
+        key = (name, labels)
+        buckets = METRICS[name][2]
+        counts = histograms.get(key)
+        if counts is None:
+            counts = histograms[key] = [0] * (len(buckets) + 2)
+        counts[bisect_left(buckets, value)] += 1
+        counts[-1] += value
+
+    def collect(self):
+        """Merged ``(counters, histograms)`` of every thread in this process."""
+        counters, histograms = {}, {}
+        for shard in list(self._shards):
+            # dict() copies in one step, safe against concurrent inserts
+            for key, value in dict(shard.counters).items():
+                counters[key] = counters.get(key, 0) + value
+            for key, counts in dict(shard.histograms).items():
+                _add_counts(histograms, key, list(counts))
+        return counters, histograms
+
+    def ensure_flusher(self, app):
+        directory = app.config.get("PROMETHEUS_MULTIPROC_DIR")
+        interval = app.config.get("METRICS_FLUSH_INTERVAL", 5)
+        if not directory or not interval or self._flusher_pid == os.getpid():
+            return
+        # Threads do not survive fork, so each worker starts its own
+        self._flusher_pid = os.getpid()
+        Thread(
+            target=self._flush_forever,
+            args=(app, directory, interval),
+            name="metrics-flush",
+            daemon=True,
+        ).start()
+
+    def _flush_forever(self, app, directory, interval):
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                write_snapshot(directory)
+
+
+def _add_counts(histograms, key, counts):
+    total = histograms.get(key)
+    if total is None:
+        histograms[key] = counts
+    else:
+        for i, count in enumerate(counts):
+            total[i] += count
+
+
+def _route_labels():
+    rule = request.url_rule
+    return (
+        ("route", rule.rule if rule is not None else "<unmatched>"),
+        ("method", request.method),
+    )
+
+
+# Request hooks
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+
+
+def _record_request(response):
+    started = g.pop("metrics_started", None)
+    if started is None or request.endpoint == "static":
+        return response
+    metrics = current_app.extensions["metrics"]
+    labels = _route_labels()
+    metrics.inc(
+        "http_requests_total", labels + (("status", str(response.status_code)),)
+    )
+    metrics.observe(
+        "http_request_duration_seconds", labels, time.perf_counter() - started
+    )
+    log = g.get("query_log")  # see query_tracker.py
+    if log is not None:
+        metrics.observe("http_request_db_queries", labels, log.count)
+        if log.count:
+            metrics.inc("db_queries_total", labels, log.count)
+            metrics.inc("db_query_duration_seconds_total", labels, log.seconds)
+        if n_plus_one_suspects(log):
+            metrics.inc("db_n_plus_one_requests_total", labels)
+    if response.status_code == 429:
+        metrics.inc("ratelimit_rejections_total", labels)
+    metrics.ensure_flusher(current_app._get_current_object())
+    return response
+
+
+def init_metrics(app):
+    app.extensions["metrics"] = Metrics()
+    if app.config.get("METRICS_ENABLED", True):
+        app.before_request(_start_request)
+        app.after_request(_record_request)
+
+
+# Collection
+
+
+def _process_metrics():
+    """This worker's request metrics plus its cache and pool counters."""
+    from app.models import db
+    from app.utils.caching import get_cache_stats
+    from app.utils.pool import get_pool_stats
+
+    counters, histograms = current_app.extensions["metrics"].collect()
+    gauges = {}
+
+    cache_stats = get_cache_stats()
+    for stat in ("hits", "misses", "invalidations"):
+        counters[(f"response_cache_{stat}_total", ())] = cache_stats[stat]
+    for result, value in cache_stats.get("backend", {}).items():
+        counters[("cache_backend_lookups_total", (("result", result),))] = value
+
+    for phase, seconds in current_app.extensions.get("startup", {}).items():
+        gauges[("app_startup_seconds", (("phase", phase),))] = seconds
+
+    pool_stats = get_pool_stats(db.engine)
+    for stat in ("checked_out", "idle", "overflow"):
+        if stat in pool_stats:
+            gauges[(f"db_pool_{stat}", ())] = pool_stats[stat]
+    checkout = pool_stats.get("checkout")
+    if checkout:
+        counters[("db_pool_checkouts_total", ())] = checkout["checkouts"]
+        counters[("db_pool_checkout_timeouts_total", ())] = checkout["timeouts"]
+        counters[("db_pool_checkout_wait_seconds_total", ())] = checkout[
+            "wait_seconds_total"
+        ]
+    return counters, histograms, gauges
+
+
+def write_snapshot(directory):
+    """Write this worker's totals to ``<directory>/<pid>.json`` atomically."""
+    counters, histograms, gauges = _process_metrics()
+    data = {
+        "counters": [
+            [name, labels, value] for (name, labels), value in counters.items()
+        ],
+        "histograms": [
+            [name, labels, counts] for (name, labels), counts in histograms.items()
+        ],
+        "gauges": [[name, labels, value] for (name, labels), value in gauges.items()],
+    }
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(data, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_snapshots(directory):
+    counters, histograms, gauges = {}, {}, {}
+    for filename in os.listdir(directory):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue  # removed or replaced mid-read
+        for name, labels, value in data["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, counts in data["histograms"]:
+            _add_counts(histograms, (name, tuple(map(tuple, labels))), counts)
+        if _pid_alive(int(filename[: -len(".json")])):
+            for name, labels, value in data["gauges"]:
+                key = (name, tuple(map(tuple, labels)))
+                gauges[key] = gauges.get(key, 0) + value
+    return counters, histograms, gauges
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    directory = current_app.config.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        write_snapshot(directory)
+        counters, histograms, gauges = _read_snapshots(directory)
+    else:
+        counters, histograms, gauges = _process_metrics()
+
+    groups = {}  # metric name -> {labels: [(sample name, labels, value)]}
+    for (name, labels), value in {**counters, **gauges}.items():
+        groups.setdefault(name, {})[labels] = [(name, labels, value)]
+    for (name, labels), counts in histograms.items():
+        lines = groups.setdefault(name, {})[labels] = []
+        cumulative = 0
+        for bound, count in zip(METRICS[name][2] + (math.inf,), counts):
+            cumulative += count
+            le = _format_value(float(bound))
+            lines.append((f"{name}_bucket", labels + (("le", le),), cumulative))
+        lines.append((f"{name}_sum", labels, counts[-1]))
+        lines.append((f"{name}_count", labels, cumulative))
+
+    output = []
+    for name in sorted(groups):
+        kind, help_text, _ = METRICS[name]
+        output.append(f"# HELP {name} {help_text}")
+        output.append(f"# TYPE {name} {kind}")
+        for labels in sorted(groups[name]):
+            for sample, sample_labels, value in groups[name][labels]:
+                output.append(
+                    f"{sample}{_format_labels(sample_labels)} {_format_value(value)}"
+                )
+    return "\n".join(output) + "\n"
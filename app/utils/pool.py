@@ -0,0 +1,64 @@
+from threading import Lock
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+import time
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection.
+
+    The wait covers queueing for a free connection, opening a new one and the
+    pre-ping, i.e. the time a request spends before it can issue SQL.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = Lock()
+        self.checkout_stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    def connect(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                stats = self.checkout_stats
+                stats["checkouts"] += 1
+                stats["timeouts"] += timed_out
+                stats["wait_seconds_total"] += waited
+                stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+
+
+def get_pool_stats(engine):
+    """Current pool occupancy (and checkout wait times for TimedQueuePool)."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            # overflow() counts down from -size until the base pool is in use
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    checkout_stats = getattr(pool, "checkout_stats", None)
+    if checkout_stats:
+        with pool._stats_lock:
+            checkout = dict(checkout_stats)
+        count = checkout["checkouts"]
+        checkout["wait_seconds_avg"] = (
+            round(checkout["wait_seconds_total"] / count, 6) if count else 0.0
+        )
+        stats["checkout"] = checkout
+    return stats
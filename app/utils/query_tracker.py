@@ -0,0 +1,148 @@
+"""Per-request SQL statement counting and N+1 detection.
+
+A cursor listener on every Engine records each statement into the query logs
+active in the current context (thread, or asyncio task under asgi_app.py):
+one per request (``g.query_log``) plus any opened by
+``track_queries``/``query_budget``. Statements are fingerprinted
+(literals and bind parameters replaced, IN lists collapsed), so the same
+statement shape running once per row shows up as one shape repeated N times.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import re
+import time
+
+# A ContextVar rather than a thread local: async requests share the event loop
+# thread but each runs in its own task context
+_logs = ContextVar("query_logs", default=())
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMS = re.compile(r"%s|%\(\w+\)s|\$\d+|(?<!:):\w+|\?")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_POSTCOMPILE = re.compile(r"\(\s*__\[POSTCOMPILE_\w+\]\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(statement):
+    """Statement shape with literals and parameters replaced by ``?``."""
+    shape = _STRINGS.sub("?", statement)
+    shape = _PARAMS.sub("?", shape)
+    shape = _NUMBERS.sub("?", shape)
+    shape = _IN_LISTS.sub("(...)", shape)
+    shape = _POSTCOMPILE.sub("(...)", shape)
+    return _SPACES.sub(" ", shape).strip()
+
+
+class QueryLog:
+    """Statements seen while the log was active."""
+
+    __slots__ = ("count", "seconds", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = {}  # fingerprint -> times executed
+
+    def repeated(self, threshold):
+        """``[(fingerprint, times)]`` for shapes run at least ``threshold`` times."""
+        return [(shape, n) for shape, n in self.shapes.items() if n >= threshold]
+
+    def summary(self):
+        return "\n".join(
+            f"  {n} x {shape}"
+            for shape, n in sorted(self.shapes.items(), key=lambda s: -s[1])
+        )
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if _logs.get():
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    started = conn.info.get("query_started")
+    logs = _logs.get()
+    if not started or not logs:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    shape = fingerprint(statement)
+    for log in logs:
+        log.count += 1
+        log.seconds += elapsed
+        log.shapes[shape] = log.shapes.get(shape, 0) + 1
+
+
+@contextmanager
+def track_queries():
+    """Record the statements executed on this thread inside the block."""
+    log = QueryLog()
+    token = _logs.set(_logs.get() + (log,))
+    try:
+        yield log
+    finally:
+        _logs.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries, max_repeats=None):
+    """Fail with AssertionError when the block runs more than ``max_queries``
+    statements, or any one statement shape more than ``max_repeats`` times.
+
+    with query_budget(2, max_repeats=1):
+        client.get("/service_tickets/")
+    """
+    with track_queries() as log:
+        yield log
+    if log.count > max_queries:
+        raise AssertionError(
+            f"{log.count} queries exceed the budget of {max_queries}:\n{log.summary()}"
+        )
+    if max_repeats is not None and log.repeated(max_repeats + 1):
+        raise AssertionError(
+            f"statement repeated more than {max_repeats} times (N+1?):\n{log.summary()}"
+        )
+
+
+def n_plus_one_suspects(log):
+    threshold = current_app.config.get("N_PLUS_ONE_THRESHOLD", 5)
+    return log.repeated(threshold) if threshold else []
+
+
+# Request hooks
+
+
+def _start_request():
+    g.query_log = QueryLog()
+    _logs.set(_logs.get() + (g.query_log,))
+
+
+def _finish_request(response):
+    log = g.get("query_log")
+    if log is None:
+        return response
+    for shape, n in n_plus_one_suspects(log):
+        current_app.logger.warning(
+            "Possible N+1 in %s %s: %d x %s", request.method, request.path, n, shape
+        )
+    if current_app.config.get("QUERY_COUNT_HEADER"):
+        response.headers["X-Query-Count"] = str(log.count)
+    return response
+
+
+def _stop_request(exc):
+    log = g.pop("query_log", None)
+    if log is not None:
+        _logs.set(tuple(active for active in _logs.get() if active is not log))
+
+
+def init_query_tracking(app):
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_stop_request)
@@ -0,0 +1,173 @@
+"""Rate limit storage that pre-aggregates hits per worker (``batched+redis://``).
+
+Each worker counts hits locally and adds them to the shared Redis counter in
+one ``INCRBY`` per batch instead of one round trip per request. A key syncs
+on a hit when any of these holds:
+
+- it has ``batch_size`` unsynced hits, or ``batch_fraction`` of its limit if
+  that is smaller;
+- the last known total is within one batch of the limit;
+- the last sync is older than ``sync_interval`` seconds;
+- this worker has not seen the key in the current window yet.
+
+Once a sync shows the window used up, further hits are rejected locally until
+it ends. Small limits (``5 per day``) sync on every hit and stay exact. Near
+any limit, each decision uses the shared total plus this worker's own hits.
+What a worker cannot see is the hits since its last sync (its own unsynced
+ones, and other workers'), and each worker admits fewer than one batch of
+those, so a window lets through at most ``workers * (batch - 1)`` requests
+over its limit.
+
+Works with the fixed-window strategy (Flask-Limiter's default). The limit is
+read from the key, which ``limits`` builds as ``.../<amount>/<multiples>/<unit>``.
+Tuning goes in the URI query:
+``batched+redis://host:6379/0?batch_size=20&batch_fraction=0.05&sync_interval=1``.
+"""
+
+from threading import Lock
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from limits.storage import RedisStorage
+import time
+
+BATCH_SIZE = 20
+BATCH_FRACTION = 0.05
+SYNC_INTERVAL = 1.0  # seconds
+
+
+def batched_storage_uri(uri, **options):
+    """``uri`` (a redis:// URL) as a batched storage URI with ``options``."""
+    parts = urlsplit(f"batched+{uri}")
+    query = parse_qsl(parts.query) + [
+        (name, value) for name, value in options.items() if value is not None
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def limit_amount(key):
+    """The limit encoded in a ``limits`` key, or None if it has no amount."""
+    try:
+        return int(key.rsplit("/", 3)[-3])
+    except (IndexError, ValueError):
+        return None
+
+
+class _Window:
+    __slots__ = ("pending", "shared", "synced_at", "expires_at")
+
+    def __init__(self):
+        self.pending = 0  # hits not yet added to the shared counter
+        self.shared = 0  # shared counter after the last sync
+        self.synced_at = float("-inf")
+        self.expires_at = float("inf")
+
+
+class BatchedRedisStorage(RedisStorage):
+    """Redis storage with per-worker pre-aggregation; see the module docstring."""
+
+    STORAGE_SCHEME = ["batched+redis", "batched+rediss", "batched+redis+unix"]
+
+    def __init__(self, uri, **options):
+        parts = urlsplit(uri.replace("batched+", "", 1))
+        query = dict(parse_qsl(parts.query))
+        settings = {
+            name: cast(query.pop(name, default))
+            for name, cast, default in (
+                ("batch_size", int, BATCH_SIZE),
+                ("batch_fraction", float, BATCH_FRACTION),
+                ("sync_interval", float, SYNC_INTERVAL),
+            )
+        }
+        self.batch_size = settings["batch_size"]
+        self.batch_fraction = settings["batch_fraction"]
+        self.sync_interval = settings["sync_interval"]
+        self.windows = {}  # key -> _Window
+        self.stats = {"hits": 0, "syncs": 0}
+        self._lock = Lock()
+        super().__init__(urlunsplit(parts._replace(query=urlencode(query))), **options)
+
+    def batch_for(self, key):
+        """Unsynced hits allowed for ``key`` in this worker."""
+        limit = limit_amount(key)
+        if limit is None:
+            return 1
+        return max(1, min(self.batch_size, int(limit * self.batch_fraction)))
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        # limits 4.x passes elastic_expiry (moving-window strategies only);
+        # windows here are fixed, so it is accepted and ignored
+        batch = self.batch_for(key)
+        limit = limit_amount(key) or 0
+        now = time.monotonic()
+        with self._lock:
+            self.stats["hits"] += 1
+            window = self.windows.get(key)
+            if window is None or now >= window.expires_at:
+                window = self.windows[key] = _Window()
+            window.pending += amount
+            total = window.shared + window.pending
+            if limit and window.shared >= limit:
+                return total  # window used up: reject without a round trip
+            if not (
+                window.pending >= batch
+                or total + batch > limit
+                or now - window.synced_at >= self.sync_interval
+            ):
+                return total
+            pending, window.pending = window.pending, 0
+        return self._sync(key, window, expiry, pending)
+
+    def _sync(self, key, window, expiry, pending):
+        redis_key = self.prefixed_key(key)
+        pipeline = self.get_connection().pipeline()
+        pipeline.incrby(redis_key, pending)
+        pipeline.pttl(redis_key)
+        shared, ttl_ms = pipeline.execute()
+        if ttl_ms < 0:  # new key (or one without a TTL): start the window
+            self.get_connection().expire(redis_key, expiry)
+            ttl_ms = expiry * 1000
+        with self._lock:
+            self.stats["syncs"] += 1
+            window.shared = max(window.shared, shared)
+            window.synced_at = time.monotonic()
+            window.expires_at = window.synced_at + ttl_ms / 1000
+            return window.shared + window.pending
+
+    def flush(self):
+        """Add every key's unsynced hits to the shared counters (call it when a
+        worker shuts down; hits it never syncs are simply not counted)."""
+        with self._lock:
+            unsynced = [
+                (key, window, window.pending)
+                for key, window in self.windows.items()
+                if window.pending
+            ]
+            for _, window, _ in unsynced:
+                window.pending = 0
+        for key, window, pending in unsynced:
+            remaining = window.expires_at - time.monotonic()
+            if remaining > 0:
+                self._sync(key, window, max(1, int(remaining)), pending)
+
+    def get(self, key):
+        with self._lock:
+            window = self.windows.get(key)
+            if window is not None and time.monotonic() < window.expires_at:
+                return window.shared + window.pending
+        return super().get(key)
+
+    def get_expiry(self, key):
+        with self._lock:
+            window = self.windows.get(key)
+            if window is not None and time.monotonic() < window.expires_at:
+                return time.time() + window.expires_at - time.monotonic()
+        return super().get_expiry(key)
+
+    def clear(self, key):
+        with self._lock:
+            self.windows.pop(key, None)
+        super().clear(key)
+
+    def reset(self):
+        with self._lock:
+            self.windows.clear()
+        return super().reset()
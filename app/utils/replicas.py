@@ -0,0 +1,163 @@
+"""Read/write splitting for ``db.session``.
+
+With ``SQLALCHEMY_REPLICA_URIS`` set, the statements of GET/HEAD/OPTIONS
+requests go to a replica, one per request, chosen round-robin. Everything
+else uses the primary: writes and flushes (even inside a GET), other request
+methods, CLI commands and the health probes. A replica that fails to connect
+or loses a connection is skipped for ``REPLICA_RETRY_AFTER`` seconds and then
+probed before it is used again (each worker also probes a replica before its
+first use); with no replica available, reads fall back to the primary.
+
+Read-your-writes: a request that writes marks its client (the customer of a
+valid bearer token, else the remote address) in the cache for
+``REPLICA_STICKY_SECONDS``. That client's reads stay on the primary until the
+mark expires, so replication lag never hides its own changes. With Redis as
+the cache backend the mark is seen by every worker.
+"""
+
+from itertools import count
+from threading import Lock
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from app.extensions import cache
+import math
+import time
+
+SAFE_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+STICKY_PREFIX = "replica:sticky:"
+
+
+class RoutingSession(Session):
+    """Session that sends the reads of safe requests to a replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and "db_replica" in g:
+            if self._flushing or getattr(clause, "is_dml", False):
+                g.db_wrote = True
+            elif not g.db_wrote:
+                replica = _request_replica()
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Round-robin over the replica engines, skipping ones that recently failed."""
+
+    def __init__(self, engines, retry_after=30.0):
+        self.engines = engines
+        self.retry_after = retry_after
+        # engine index -> monotonic time of the last failure; replicas start
+        # out unchecked, so the first read probes them
+        self.down = dict.fromkeys(range(len(engines)), -math.inf)
+        self._turn = count()
+        self._lock = Lock()
+        for index, engine in enumerate(engines):
+            event.listen(engine, "handle_error", self._error_listener(index))
+
+    def _error_listener(self, index):
+        def handle_error(context):
+            # Unreachable or dropped connections, not bad SQL
+            if context.is_disconnect or isinstance(
+                context.sqlalchemy_exception, OperationalError
+            ):
+                self.mark_down(index)
+
+        return handle_error
+
+    def mark_down(self, index):
+        with self._lock:
+            self.down[index] = time.monotonic()
+
+    def choose(self):
+        """The next usable replica engine, or None to read from the primary."""
+        start = next(self._turn)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            failed_at = self.down.get(index)
+            if failed_at is None:
+                return self.engines[index]
+            if time.monotonic() - failed_at >= self.retry_after and self._probe(index):
+                return self.engines[index]
+        return None
+
+    def _probe(self, index):
+        try:
+            with self.engines[index].connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except DBAPIError:
+            self.mark_down(index)  # restart the wait
+            return False
+        with self._lock:
+            self.down.pop(index, None)
+        return True
+
+    def status(self):
+        now = time.monotonic()
+        down = dict(self.down)
+        statuses = []
+        for index, engine in enumerate(self.engines):
+            status = {"url": engine.url.render_as_string(hide_password=True)}
+            if index not in down:
+                status["state"] = "up"
+            elif math.isinf(down[index]):
+                status["state"] = "unchecked"
+            else:
+                status.update(state="down", down_seconds=round(now - down[index], 1))
+            statuses.append(status)
+        return statuses
+
+
+def _request_replica():
+    # True until the first read picks one, so cache hits never touch a replica
+    if g.db_replica is True:
+        g.db_replica = current_app.extensions["db_replicas"].choose()
+    return g.db_replica or None
+
+
+def _client_key():
+    from app.utils.util import token_customer_id
+
+    customer_id = token_customer_id()
+    if customer_id is not None:
+        return f"{STICKY_PREFIX}customer:{customer_id}"
+    return f"{STICKY_PREFIX}{request.remote_addr}"
+
+
+# Request hooks
+
+
+def _start_request():
+    # g outlives the request when an app context is already pushed (tests, CLI)
+    g.db_wrote = False
+    g.db_replica = request.method in SAFE_METHODS and cache.get(_client_key()) is None
+
+
+def _finish_request(response):
+    if g.get("db_wrote"):
+        seconds = current_app.config.get("REPLICA_STICKY_SECONDS", 5)
+        if seconds:
+            cache.set(_client_key(), 1, timeout=seconds)
+    return response
+
+
+def _stop_request(exc):
+    g.pop("db_replica", None)
+    g.pop("db_wrote", None)
+
+
+def init_replicas(app):
+    """Route safe requests' reads to ``SQLALCHEMY_REPLICA_URIS``, if any."""
+    uris = app.config.get("SQLALCHEMY_REPLICA_URIS")
+    if not uris:
+        return
+    options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    app.extensions["db_replicas"] = ReplicaRouter(
+        [create_engine(uri, **options) for uri in uris],
+        retry_after=app.config.get("REPLICA_RETRY_AFTER", 30),
+    )
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_stop_request)
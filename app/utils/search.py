@@ -0,0 +1,272 @@
+"""Full-text index over mechanic names, customer contact details and ticket VINs.
+
+All searchable rows share one ``search_index`` table keyed on ``doc_id``
+(``ref_id * len(KINDS) + kind code``) so writes touch the index by primary key:
+
+* SQLite: an FTS5 virtual table (``doc_id`` is the rowid), ranked with bm25.
+* PostgreSQL: a ``tsvector`` column with a GIN index for prefix matches plus a
+  ``pg_trgm`` index on the raw text for typo-tolerant word similarity.
+* Anything else: a plain table matched with LIKE (correct, but unindexed).
+
+The table is created alongside ``db.create_all()`` and kept in sync from a
+session ``after_flush`` hook, inside the same transaction as the write.
+"""
+
+from sqlalchemy import (
+    BigInteger,
+    Float,
+    Integer,
+    String,
+    and_,
+    bindparam,
+    column,
+    event,
+    func,
+    inspect,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+)
+from sqlalchemy.orm import Session
+from app.models import db, Customer, Mechanic, ServiceTicket
+from app.utils.util import keyset_paginate
+import re
+import weakref
+
+SEARCH_TABLE = "search_index"
+
+# kind -> (model, columns fed into the index); the order fixes each kind's code
+KINDS = {
+    "mechanic": (Mechanic, ("name",)),
+    "customer": (Customer, ("name", "email", "phone")),
+    "ticket": (ServiceTicket, ("VIN",)),
+}
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+MODEL_KINDS = {model: kind for kind, (model, _) in KINDS.items()}
+
+REINDEX_BATCH_SIZE = 1000
+
+search_index = table(
+    SEARCH_TABLE,
+    column("doc_id", BigInteger),
+    column("kind", String),
+    column("ref_id", Integer),
+    column("body", String),
+    column("document"),
+)
+
+DDL = {
+    "sqlite": [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "kind UNINDEXED, ref_id UNINDEXED, body, prefix='2 3 4')",
+    ],
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        "doc_id BIGINT PRIMARY KEY, kind VARCHAR(16) NOT NULL, "
+        "ref_id INTEGER NOT NULL, body TEXT NOT NULL, "
+        "document TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED)",
+        f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document "
+        f"ON {SEARCH_TABLE} USING GIN (document)",
+        f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_body_trgm "
+        f"ON {SEARCH_TABLE} USING GIN (body gin_trgm_ops)",
+    ],
+    "default": [
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        "doc_id BIGINT PRIMARY KEY, kind VARCHAR(16) NOT NULL, "
+        "ref_id INTEGER NOT NULL, body VARCHAR(600) NOT NULL)",
+    ],
+}
+
+# Engines known to have the index table, so the flush hook skips the lookup
+_ready_engines = weakref.WeakSet()
+
+
+def _id_column(dialect_name):
+    return "rowid" if dialect_name == "sqlite" else "doc_id"
+
+
+def doc_id(kind, ref_id):
+    return ref_id * len(KINDS) + KIND_CODES[kind]
+
+
+def document_body(obj):
+    _, columns = KINDS[MODEL_KINDS[type(obj)]]
+    return " ".join(str(getattr(obj, name) or "") for name in columns)
+
+
+def tokenize(text_query):
+    """Split user input into search terms (each matched as a prefix)."""
+    return re.findall(r"\w+", text_query or "")
+
+
+# INDEX MAINTENANCE
+def create_search_index(target, connection, **kwargs):
+    for statement in DDL.get(connection.dialect.name, DDL["default"]):
+        connection.execute(text(statement))
+    _ready_engines.add(connection.engine)
+
+
+def drop_search_index(target, connection, **kwargs):
+    connection.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+    _ready_engines.discard(connection.engine)
+
+
+def _index_ready(connection):
+    if connection.engine in _ready_engines:
+        return True
+    if inspect(connection).has_table(SEARCH_TABLE):
+        _ready_engines.add(connection.engine)
+        return True
+    return False  # created by an older release; see `flask search reindex`
+
+
+def _write_documents(connection, stale_ids, documents):
+    id_column = _id_column(connection.dialect.name)
+    if stale_ids:
+        connection.execute(
+            text(f"DELETE FROM {SEARCH_TABLE} WHERE {id_column} IN :ids").bindparams(
+                bindparam("ids", expanding=True)
+            ),
+            {"ids": list(stale_ids)},
+        )
+    if documents:
+        connection.execute(
+            text(
+                f"INSERT INTO {SEARCH_TABLE} ({id_column}, kind, ref_id, body) "
+                "VALUES (:doc_id, :kind, :ref_id, :body)"
+            ),
+            documents,
+        )
+
+
+def _document(kind, ref_id, body):
+    return {
+        "doc_id": doc_id(kind, ref_id),
+        "kind": kind,
+        "ref_id": ref_id,
+        "body": body,
+    }
+
+
+def _changed(obj, columns):
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in columns)
+
+
+@event.listens_for(Session, "after_flush")
+def sync_search_index(session, flush_context):
+    deleted, dirty = session.deleted, session.dirty  # both are rebuilt per access
+    stale_ids, documents = set(), []
+    for obj in deleted:
+        kind = MODEL_KINDS.get(type(obj))
+        if kind:
+            stale_ids.add(doc_id(kind, obj.id))
+    for obj in list(session.new) + [obj for obj in dirty if obj not in deleted]:
+        kind = MODEL_KINDS.get(type(obj))
+        if not kind or (obj in dirty and not _changed(obj, KINDS[kind][1])):
+            continue
+        stale_ids.add(doc_id(kind, obj.id))
+        documents.append(_document(kind, obj.id, document_body(obj)))
+
+    if not stale_ids:
+        return
+    connection = session.connection()
+    if _index_ready(connection):
+        _write_documents(connection, stale_ids, documents)
+
+
+def index_rows(session, rows):
+    """Index new rows inserted outside the unit of work (``insert_all``),
+    which the flush hook does not see."""
+    documents = [
+        _document(MODEL_KINDS[type(row)], row.id, document_body(row))
+        for row in rows
+        if type(row) in MODEL_KINDS
+    ]
+    if documents:
+        connection = session.connection()
+        if _index_ready(connection):
+            _write_documents(connection, (), documents)
+
+
+event.listen(db.metadata, "after_create", create_search_index)
+event.listen(db.metadata, "before_drop", drop_search_index)
+
+
+def rebuild_search_index():
+    """Recreate the index from the source tables and return the document count."""
+    connection = db.session.connection()
+    drop_search_index(None, connection)
+    create_search_index(None, connection)
+    total = 0
+    for kind, (model, columns) in KINDS.items():
+        query = select(model.id, *[getattr(model, name) for name in columns])
+        rows = db.session.execute(query.execution_options(yield_per=REINDEX_BATCH_SIZE))
+        for batch in rows.partitions():
+            documents = [
+                _document(kind, row[0], " ".join(str(v or "") for v in row[1:]))
+                for row in batch
+            ]
+            _write_documents(connection, (), documents)
+            total += len(documents)
+    db.session.commit()
+    return total
+
+
+# QUERYING
+def _match(dialect_name, terms, raw_query):
+    """Return (where clause, rank expression); lower rank sorts first."""
+    if dialect_name == "sqlite":
+        fts_query = " AND ".join(f'"{term}"*' for term in terms)
+        where = text(f"{SEARCH_TABLE} MATCH :fts_query").bindparams(fts_query=fts_query)
+        return where, literal_column(f"bm25({SEARCH_TABLE})", Float)
+    if dialect_name == "postgresql":
+        ts_query = func.to_tsquery(
+            "simple", " & ".join(f"{term.lower()}:*" for term in terms)
+        )
+        # <% (word similarity above pg_trgm.word_similarity_threshold) is the
+        # form the trigram index can serve; it catches misspelled names
+        similarity = func.word_similarity(raw_query, search_index.c.body)
+        where = or_(
+            search_index.c.document.op("@@")(ts_query),
+            literal(raw_query).op("<%")(search_index.c.body),
+        )
+        rank = -(func.ts_rank(search_index.c.document, ts_query) + similarity)
+        return where, rank.cast(Float)
+    where = and_(*[search_index.c.body.ilike(f"%{term}%") for term in terms])
+    return where, literal(0.0, Float)
+
+
+def matching_ids(kind, text_query):
+    """Select of the ids of ``kind`` rows matching ``text_query`` (unranked)."""
+    terms = tokenize(text_query)
+    if not terms:
+        raise ValueError("search text must contain at least one letter or digit")
+    where, _ = _match(db.engine.dialect.name, terms, text_query)
+    return select(search_index.c.ref_id).where(where, search_index.c.kind == kind)
+
+
+def search_page(text_query, kinds=None):
+    """Return one ranked page of ``(kind, ref_id)`` hits and the next cursor.
+
+    Reads ``limit`` and ``cursor`` from the request args and raises ValueError
+    for an empty query or invalid paging input.
+    """
+    terms = tokenize(text_query)
+    if not terms:
+        raise ValueError("q must contain at least one letter or digit")
+
+    where, rank = _match(db.engine.dialect.name, terms, text_query)
+    hits = select(rank.label("rank"), search_index.c.kind, search_index.c.ref_id).where(
+        where
+    )
+    if kinds:
+        hits = hits.where(search_index.c.kind.in_(kinds))
+    hits = hits.subquery("hits")
+    key_columns = [hits.c.rank, hits.c.kind, hits.c.ref_id]
+
+    return keyset_paginate(select(*key_columns), key_columns, rows=True)
@@ -0,0 +1,468 @@
+"""Synthetic data for performance and capacity testing (``flask seed``).
+
+Rows are generated in chunks of ``batch_size`` and written with Core bulk
+inserts, one transaction per chunk. Ids continue after the current maximum,
+so seeding appends to an existing database (on PostgreSQL the id sequences
+are then moved past the new rows, so later inserts do not reuse their ids).
+Each chunk has its own random seed (derived from ``--seed`` and its first
+id), so the data does not depend on the number of workers.
+
+With ``--workers N`` chunks are generated in N processes. On server databases
+(MySQL, PostgreSQL) each worker also inserts its chunks over its own
+connection; SQLite allows one writer, so there the workers only generate and
+the main process inserts.
+"""
+
+from datetime import date, timedelta
+from itertools import accumulate
+from multiprocessing import Pool
+from sqlalchemy import create_engine, func, insert, select
+import click
+import random
+import time
+
+from app.models import (
+    Customer,
+    InventoryItem,
+    Mechanic,
+    ServiceTicket,
+    db,
+    service_inventory,
+    service_mechanics,
+)
+
+FIRST_NAMES = (
+    "James Mary Robert Patricia John Jennifer Michael Linda David Elizabeth "
+    "William Barbara Richard Susan Joseph Jessica Thomas Sarah Carlos Maria "
+    "Daniel Karen Matthew Nancy Anthony Lisa Mark Betty Luis Ana Wei Mei "
+    "Hiroshi Yuki Ahmed Fatima Olga Ivan Priya Ravi Kwame Amara Liam Noah"
+).split()
+LAST_NAMES = (
+    "Smith Johnson Williams Brown Jones Garcia Miller Davis Rodriguez Martinez "
+    "Hernandez Lopez Gonzalez Wilson Anderson Thomas Taylor Moore Jackson Martin "
+    "Lee Perez Thompson White Harris Sanchez Clark Ramirez Lewis Robinson Walker "
+    "Young Allen King Wright Scott Torres Nguyen Hill Flores Green Adams Patel"
+).split()
+EMAIL_DOMAINS = ("gmail.com", "yahoo.com", "outlook.com", "icloud.com", "example.com")
+SERVICES = (
+    "Oil change",
+    "Brake pad replacement",
+    "Tire rotation",
+    "Battery replacement",
+    "Transmission service",
+    "Coolant flush",
+    "Wheel alignment",
+    "Check engine light diagnosis",
+    "Spark plug replacement",
+    "Air conditioning recharge",
+    "Timing belt replacement",
+    "State inspection",
+)
+PARTS = (
+    ("Oil filter", 8, 25),
+    ("Air filter", 12, 40),
+    ("Cabin filter", 15, 45),
+    ("Brake pads", 35, 120),
+    ("Brake rotor", 45, 180),
+    ("Spark plug", 4, 30),
+    ("Wiper blade", 10, 35),
+    ("Battery", 90, 250),
+    ("Serpentine belt", 20, 75),
+    ("Timing belt kit", 90, 400),
+    ("Headlight bulb", 10, 60),
+    ("Coolant (1 gal)", 12, 30),
+    ("Synthetic oil (5 qt)", 25, 60),
+    ("Alternator", 150, 450),
+    ("Starter motor", 120, 380),
+)
+BRANDS = ("Bosch", "ACDelco", "Denso", "Motorcraft", "NGK", "Mobil 1", "Wagner")
+
+# VINs: ISO 3779 characters (no I, O, Q), transliteration values and weights
+# for the check digit in position 9
+VIN_CHARS = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+VIN_VALUES = {
+    **{str(d): d for d in range(10)},
+    **dict(zip("ABCDEFGH", range(1, 9))),
+    **dict(zip("JKLMN", range(1, 6))),
+    "P": 7,
+    "R": 9,
+    **dict(zip("STUVWXYZ", range(2, 10))),
+}
+VIN_WEIGHTS = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
+WMIS = ("1HG", "1FT", "1G1", "2T1", "3VW", "5YJ", "JHM", "JTD", "KMH", "WBA", "WVW")
+MODEL_YEARS = "ABCDEFGHJKLMNPRST123456789"  # 2010-2026 and 2001-2009
+
+# Ticket mix: mechanics per ticket and parts per ticket
+MECHANIC_COUNTS = ((1, 2, 3), (60, 30, 10))
+PART_COUNTS = ((0, 1, 2, 3, 4), (20, 35, 25, 12, 8))
+ZIPF_EXPONENT = 1.1  # a few busy mechanics and popular parts
+
+TABLE_COLUMNS = {
+    "customers": ("id", "name", "email", "phone", "password"),
+    "mechanics": ("id", "name", "email", "phone", "salary"),
+    "inventory_items": ("id", "name", "price"),
+    "service_tickets": ("id", "VIN", "service_date", "service_desc", "customer_id"),
+    "service_mechanics": ("service_id", "mechanic_id"),
+    "service_inventory": ("service_id", "item_id"),
+}
+TABLES = {
+    "customers": Customer.__table__,
+    "mechanics": Mechanic.__table__,
+    "inventory_items": InventoryItem.__table__,
+    "service_tickets": ServiceTicket.__table__,
+    "service_mechanics": service_mechanics,
+    "service_inventory": service_inventory,
+}
+
+
+def vin_check_digit(vin):
+    total = sum(VIN_VALUES[c] * w for c, w in zip(vin, VIN_WEIGHTS))
+    return "X" if total % 11 == 10 else str(total % 11)
+
+
+def _weighted(text, weights):
+    return sum(VIN_VALUES[c] * w for c, w in zip(text, weights))
+
+
+class VinMaker:
+    """Valid VINs, fast: the check-digit sum is precomputed for a pool of
+    WMI+VDS prefixes, the year/plant pairs and both halves of the serial."""
+
+    def __init__(self, rng, prefixes=4096):
+        self.prefixes = []
+        for _ in range(prefixes):
+            prefix = rng.choice(WMIS) + "".join(rng.choices(VIN_CHARS, k=5))
+            self.prefixes.append((prefix, _weighted(prefix, VIN_WEIGHTS[:8])))
+        self.year_plants = [
+            (year + plant, _weighted(year + plant, VIN_WEIGHTS[9:11]))
+            for year in MODEL_YEARS
+            for plant in VIN_CHARS
+        ]
+        self.serial_high = [
+            _weighted(f"{n:03d}", VIN_WEIGHTS[11:14]) for n in range(1000)
+        ]
+        self.serial_low = [_weighted(f"{n:03d}", VIN_WEIGHTS[14:]) for n in range(1000)]
+
+    def make(self, rng, serials):
+        prefixes = rng.choices(self.prefixes, k=len(serials))
+        year_plants = rng.choices(self.year_plants, k=len(serials))
+        vins = []
+        for (prefix, p), (year_plant, y), serial in zip(prefixes, year_plants, serials):
+            serial %= 1_000_000
+            check = (
+                p
+                + y
+                + self.serial_high[serial // 1000]
+                + self.serial_low[serial % 1000]
+            ) % 11
+            vins.append(
+                f"{prefix}{'X' if check == 10 else check}{year_plant}{serial:06d}"
+            )
+        return vins
+
+
+def make_vin(rng, serial):
+    return VinMaker(rng, prefixes=1).make(rng, [serial])[0]
+
+
+def service_dates(end_date, days):
+    """``(dates, cumulative weights)``: busier recent months, fewer Sundays."""
+    dates, weights = [], []
+    for age in range(days + 1):
+        day = end_date - timedelta(days=age)
+        dates.append(day.isoformat())
+        weights.append((days + 1 - age) * (0.3 if day.weekday() == 6 else 1.0))
+    return dates, list(accumulate(weights))
+
+
+def _person(rng, row_id):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    email = f"{first}.{last}{row_id}@{rng.choice(EMAIL_DOMAINS)}".lower()
+    phone = f"555-{rng.randrange(1000):03d}-{rng.randrange(10000):04d}"
+    return f"{first} {last}", email, phone
+
+
+def _customers(rng, first_id, count, options):
+    for row_id in range(first_id, first_id + count):
+        yield (row_id, *_person(rng, row_id), "password")
+
+
+def _mechanics(rng, first_id, count, options):
+    for row_id in range(first_id, first_id + count):
+        yield (row_id, *_person(rng, row_id), rng.randrange(40_000, 120_000, 500))
+
+
+def _inventory_items(rng, first_id, count, options):
+    for row_id in range(first_id, first_id + count):
+        part, low, high = rng.choice(PARTS)
+        yield (
+            row_id,
+            f"{part} ({rng.choice(BRANDS)}) #{row_id}",  # names are unique
+            round(rng.uniform(low, high), 2),
+        )
+
+
+def _cumulative_zipf(count):
+    return list(accumulate(1 / rank**ZIPF_EXPONENT for rank in range(1, count + 1)))
+
+
+def _links(rng, ticket_ids, ids, cum_weights, counts):
+    """Link rows giving each ticket ``counts[i]`` skewed picks (duplicates
+    within a ticket are dropped)."""
+    cum_counts = list(accumulate(counts[1]))
+    per_ticket = rng.choices(counts[0], cum_weights=cum_counts, k=len(ticket_ids))
+    if not ids:
+        return []
+    picks = iter(rng.choices(ids, cum_weights=cum_weights, k=sum(per_ticket)))
+    links = []
+    for ticket_id, n in zip(ticket_ids, per_ticket):
+        if n == 1:
+            links.append((ticket_id, next(picks)))
+        elif n:
+            links.extend((ticket_id, i) for i in {next(picks) for _ in range(n)})
+    return links
+
+
+def _service_tickets(rng, first_id, count, options):
+    """Ticket rows; the link rows go to ``options["links"]``."""
+    ids = range(first_id, first_id + count)
+    dates, date_weights = options["dates"]
+    rows = zip(
+        ids,
+        options["vins"].make(rng, ids),
+        rng.choices(dates, cum_weights=date_weights, k=count),
+        rng.choices(SERVICES, k=count),
+        rng.choices(options["customer_ids"], k=count),
+    )
+    mechanic_links, item_links = options["links"]
+    mechanic_links.extend(_links(rng, ids, *options["mechanics"], MECHANIC_COUNTS))
+    item_links.extend(_links(rng, ids, *options["items"], PART_COUNTS))
+    return rows
+
+
+GENERATORS = {
+    "customers": _customers,
+    "mechanics": _mechanics,
+    "inventory_items": _inventory_items,
+    "service_tickets": _service_tickets,
+}
+
+
+# Per-process state for pool workers (set by _init_worker)
+_worker = {}
+
+
+def _init_worker(options, url):
+    _worker["options"] = options
+    _worker["engine"] = create_engine(url) if url else None
+
+
+def build_chunk(table_name, first_id, count, options):
+    """Return ``{table name: [row tuples]}`` for one chunk."""
+    rng = random.Random(options["seed"] * 1_000_003 + first_id)
+    rows = {table_name: []}
+    if table_name == "service_tickets":
+        rows["service_mechanics"], rows["service_inventory"] = [], []
+        options = {
+            **options,
+            "links": (rows["service_mechanics"], rows["service_inventory"]),
+        }
+    rows[table_name].extend(GENERATORS[table_name](rng, first_id, count, options))
+    return rows
+
+
+def _insert(connection, table_name, rows):
+    table, columns = TABLES[table_name], TABLE_COLUMNS[table_name]
+    statement = insert(table)
+    if connection.dialect.paramstyle in ("qmark", "format"):
+        # Plain DBAPI executemany with tuples skips per-row parameter handling
+        compiled = statement.compile(dialect=connection.dialect, column_keys=columns)
+        if list(compiled.positiontup) == list(columns):
+            connection.exec_driver_sql(str(compiled), rows)
+            return
+    connection.execute(statement, [dict(zip(columns, row)) for row in rows])
+
+
+def insert_chunk(connection, rows):
+    for table_name, table_rows in rows.items():
+        if table_rows:
+            _insert(connection, table_name, table_rows)
+    return sum(len(table_rows) for table_rows in rows.values())
+
+
+def _run_chunk(task):
+    rows = build_chunk(*task, _worker["options"])
+    if _worker["engine"] is None:
+        return rows  # the main process inserts (SQLite)
+    with _worker["engine"].begin() as connection:
+        return insert_chunk(connection, rows)
+
+
+def _next_id(table):
+    return (db.session.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def sync_sequence(table):
+    """Statement moving the PostgreSQL sequence behind ``table.id`` to the
+    largest id (the seeder writes explicit ids, which bypass it)."""
+    sequence = func.pg_get_serial_sequence(table.name, "id")
+    return select(func.setval(sequence, func.max(table.c.id)))
+
+
+def _ids(table):
+    return db.session.execute(select(table.c.id).order_by(table.c.id)).scalars().all()
+
+
+def _seed_table(table_name, count, batch_size, options, workers):
+    """Insert ``count`` generated rows; returns the number of rows written
+    (tickets include their link rows)."""
+    first_id = _next_id(TABLES[table_name])
+    tasks = [
+        (table_name, start, min(batch_size, first_id + count - start))
+        for start in range(first_id, first_id + count, batch_size)
+    ]
+    engine = db.engine
+    if workers <= 1:
+        _init_worker(options, None)
+        chunks = map(_run_chunk, tasks)
+        pool = None
+    else:
+        # Workers write themselves unless the database allows a single writer
+        url = None
+        if engine.dialect.name != "sqlite":
+            url = engine.url.render_as_string(hide_password=False)
+        pool = Pool(workers, initializer=_init_worker, initargs=(options, url))
+        chunks = pool.imap(_run_chunk, tasks)
+
+    written = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, int):
+                written += chunk
+                continue
+            with engine.begin() as connection:
+                if engine.dialect.name == "sqlite":
+                    connection.exec_driver_sql("PRAGMA synchronous = OFF")
+                written += insert_chunk(connection, chunk)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            connection.execute(sync_sequence(TABLES[table_name]))
+    return written
+
+
+def seed_database(
+    customers=0,
+    mechanics=0,
+    items=0,
+    tickets=0,
+    batch_size=20_000,
+    workers=1,
+    seed=0,
+    end_date=None,
+    days=3 * 365,
+    report=print,
+):
+    """Append generated rows to every table; returns ``{table: rows}``."""
+    db.create_all()
+    db.session.commit()  # release SQLite's lock before other connections write
+    options = {"seed": seed, "end_date": end_date or date.today(), "days": days}
+    plan = [
+        ("customers", customers),
+        ("mechanics", mechanics),
+        ("inventory_items", items),
+        ("service_tickets", tickets),
+    ]
+    totals = {}
+    for table_name, count in plan:
+        if not count:
+            continue
+        if table_name == "service_tickets":
+            mechanic_ids = _ids(TABLES["mechanics"])
+            item_ids = _ids(TABLES["inventory_items"])
+            customer_ids = _ids(TABLES["customers"])
+            if not mechanic_ids or not customer_ids:
+                raise ValueError("tickets need customers and mechanics")
+            rng = random.Random(seed)
+            rng.shuffle(mechanic_ids)  # spread the busy mechanics over the ids
+            rng.shuffle(item_ids)
+            options.update(
+                mechanics=(mechanic_ids, _cumulative_zipf(len(mechanic_ids))),
+                items=(item_ids, _cumulative_zipf(len(item_ids))),
+                customer_ids=customer_ids,
+                dates=service_dates(options["end_date"], days),
+                vins=VinMaker(rng),
+            )
+            db.session.commit()
+        started = time.perf_counter()
+        rows = _seed_table(table_name, count, batch_size, options, workers)
+        elapsed = time.perf_counter() - started
+        totals[table_name] = rows
+        report(
+            f"{table_name}: {count} rows"
+            + (f" (+{rows - count} links)" if rows > count else "")
+            + f" in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)"
+        )
+    return totals
+
+
+@click.command("seed")
+@click.option("--customers", default=1000, show_default=True)
+@click.option("--mechanics", default=50, show_default=True)
+@click.option("--items", default=200, show_default=True)
+@click.option("--tickets", default=10_000, show_default=True)
+@click.option(
+    "--batch-size",
+    default=20_000,
+    show_default=True,
+    help="Rows per insert transaction.",
+)
+@click.option("--workers", default=1, show_default=True, help="Generator processes.")
+@click.option("--seed", "seed_value", default=0, show_default=True, help="Random seed.")
+@click.option(
+    "--end-date",
+    type=click.DateTime(["%Y-%m-%d"]),
+    help="Latest service date (default: today).",
+)
+@click.option("--days", default=3 * 365, show_default=True, help="Service date span.")
+@click.option(
+    "--no-search-index", is_flag=True, help="Skip rebuilding the search index."
+)
+def seed_command(
+    customers,
+    mechanics,
+    items,
+    tickets,
+    batch_size,
+    workers,
+    seed_value,
+    end_date,
+    days,
+    no_search_index,
+):
+    """Append synthetic customers, mechanics, parts and linked tickets."""
+    from app.utils.caching import invalidate
+    from app.utils.search import rebuild_search_index
+
+    started = time.perf_counter()
+    try:
+        seed_database(
+            customers=customers,
+            mechanics=mechanics,
+            items=items,
+            tickets=tickets,
+            batch_size=batch_size,
+            workers=workers,
+            seed=seed_value,
+            end_date=end_date.date() if end_date else None,
+            days=days,
+        )
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    if not no_search_index:
+        print(f"search index: {rebuild_search_index()} documents")
+    invalidate("customers", "mechanics", "inventory", "service_tickets", "search")
+    print(f"Seeded {db.engine.url.database} in {time.perf_counter() - started:.1f}s")
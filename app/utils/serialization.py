@@ -0,0 +1,193 @@
+"""Compiled dump functions for marshmallow schemas, plus an optional orjson
+JSON provider.
+
+``compile_dump`` reads a schema's ``dump_fields`` once and generates a plain
+Python function that builds the same dict ``schema.dump`` would, without the
+per-field ``serialize``/accessor dispatch. Integer, Float, String (and
+subclasses such as Email), Date/DateTime and Nested fields are inlined; any
+other field type calls that field's own ``serialize`` so the result stays
+identical. Schemas with dump hooks or a custom ``dict_class`` are not compiled.
+"""
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import Schema, fields, missing
+import re
+import sys
+import weakref
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used without it
+    orjson = None
+
+_compiled = weakref.WeakKeyDictionary()  # schema -> dump function or None
+
+
+def _text(value):
+    # marshmallow.utils.ensure_text_type
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    return str(value)
+
+
+def _inline(field, value):
+    """Source expression serializing ``value`` like ``field._serialize``, or
+    None when the field type is not inlined."""
+    serialize = type(field)._serialize
+    if (
+        serialize is fields.Number._serialize
+        and type(field)._format_num is fields.Number._format_num
+        and type(field).num_type in (int, float)
+    ):
+        expr = f"{type(field).num_type.__name__}({value})"
+        if field.as_string:
+            expr = f"str({expr})"
+        return f"(None if {value} is None else {expr})"
+    if serialize is fields.String._serialize:
+        return f"(None if {value} is None else {value} if {value}.__class__ is str else _text({value}))"
+    return None
+
+
+def _field_source(index, attr_name, field, namespace):
+    key = field.data_key if field.data_key is not None else attr_name
+    attribute = field.attribute or attr_name
+    value = f"_v{index}"
+    simple_access = "." not in attribute and field.dump_default is missing
+
+    expr = _inline(field, value) if simple_access else None
+    if (
+        expr is None
+        and simple_access
+        and hasattr(field, "SERIALIZATION_FUNCS")  # Date, DateTime, Time
+        and type(field)._serialize is fields.DateTime._serialize
+    ):
+        data_format = field.format or field.DEFAULT_FORMAT
+        namespace[f"_fmt{index}"] = field.SERIALIZATION_FUNCS.get(data_format) or (
+            lambda v: v.strftime(data_format)
+        )
+        expr = f"(None if {value} is None else _fmt{index}({value}))"
+    if expr is None and simple_access and type(field) is fields.Nested:
+        nested = compile_dump(field.schema)
+        if nested is not None:
+            namespace[f"_nested{index}"] = nested
+            if field.schema.many or field.many:
+                expr = f"(None if {value} is None else [_nested{index}(o) for o in {value}])"
+            else:
+                expr = f"(None if {value} is None else _nested{index}({value}))"
+
+    if expr is not None:
+        return [
+            f"    {value} = getattr(obj, {attribute!r}, _missing)",
+            f"    if {value} is not _missing:",
+            f"        ret[{key!r}] = {expr}",
+        ]
+    # Anything else goes through the field itself
+    namespace[f"_field{index}"] = field
+    return [
+        f"    {value} = _field{index}.serialize({attr_name!r}, obj, accessor=_get_attribute)",
+        f"    if {value} is not _missing:",
+        f"        ret[{key!r}] = {value}",
+    ]
+
+
+def compile_dump(schema):
+    """Return ``f(obj) -> dict`` equivalent to ``schema.dump(obj, many=False)``,
+    or None when the schema cannot be compiled."""
+    if schema in _compiled:
+        return _compiled[schema]
+
+    dump = None
+    if not schema._hooks["pre_dump"] and not schema._hooks["post_dump"]:
+        if schema.dict_class is dict:
+            namespace = {
+                "_missing": missing,
+                "_text": _text,
+                "_get_attribute": schema.get_attribute,
+            }
+            lines = ["def dump(obj):", "    ret = {}"]
+            for index, (attr_name, field) in enumerate(schema.dump_fields.items()):
+                lines += _field_source(index, attr_name, field, namespace)
+            lines.append("    return ret")
+            exec(
+                compile("\n".join(lines), f"<dump {type(schema).__name__}>", "exec"),
+                namespace,
+            )
+            dump = namespace["dump"]
+    _compiled[schema] = dump
+    return dump
+
+
+def precompile_schemas(prefix="app.blueprints."):
+    """Compile every schema instance (or dict of them) defined at module level
+    in the loaded modules under ``prefix``; returns how many compiled."""
+    compiled = 0
+    for name, module in list(sys.modules.items()):
+        if not name.startswith(prefix) or module is None:
+            continue
+        for value in list(vars(module).values()):
+            for schema in value.values() if isinstance(value, dict) else (value,):
+                if isinstance(schema, Schema) and compile_dump(schema) is not None:
+                    compiled += 1
+    return compiled
+
+
+def dump(schema, obj, many=None):
+    """Drop-in for ``schema.dump(obj, many=many)`` that uses the compiled
+    function unless ``FAST_SERIALIZER`` is disabled."""
+    many = schema.many if many is None else bool(many)
+    compiled = None
+    if current_app.config.get("FAST_SERIALIZER", True):
+        compiled = compile_dump(schema)
+    if compiled is None:
+        return schema.dump(obj, many=many)
+    if many:
+        return None if obj is None else [compiled(item) for item in obj]
+    return compiled(obj)
+
+
+_EXPONENT = re.compile(rb"e[-+]?[0-9]")
+
+
+def _needs_stdlib(body):
+    """True when orjson's output may differ from the stdlib's: non-ASCII text
+    and DEL (the stdlib escapes both), or floats the stdlib writes with an
+    exponent (orjson gives 1e16 for 1e+16 and 0.00001 for 1e-05)."""
+    if not body.isascii() or b"\x7f" in body or b"0.0000" in body:
+        return True
+    return any(
+        body[m.start() - 1 : m.start()].isdigit() for m in _EXPONENT.finditer(body)
+    )
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes responses with orjson.
+
+    Bodies are checked for the cases orjson formats differently and re-encoded
+    with the stdlib when found, so responses are unchanged. Not covered: NaN
+    and Infinity floats (orjson writes null) and integers beyond 64 bits
+    (orjson raises, and the stdlib encoder is used).
+    """
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Dates and dataclasses go through Flask's default() as with the stdlib
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        try:
+            body = orjson.dumps(obj, default=self.default, option=options)
+        except (orjson.JSONEncodeError, TypeError):
+            body = None
+        if body is None or _needs_stdlib(body):
+            return super().response(obj)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Install FastJSONProvider when ``JSON_FAST_ENCODER`` is set and orjson
+    is installed."""
+    if app.config.get("JSON_FAST_ENCODER") and orjson is not None:
+        app.json = FastJSONProvider(app)
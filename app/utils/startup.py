@@ -0,0 +1,247 @@
+"""Cold-start support: one-time schema bootstrap, lazy CLI commands and
+startup timings.
+
+``bootstrap_schema`` creates missing tables while holding a lock that every
+process starting against the same database shares: a session advisory lock
+on PostgreSQL and MySQL, a file lock (``<instance>/schema.lock``) elsewhere.
+The first process creates the schema; the others wait for it, find nothing
+missing and skip ``create_all``, so scaling out many workers at once neither
+races on DDL nor repeats it. Columns added to existing tables (such as the
+``version`` columns) are added with ``ALTER TABLE`` under the same lock; they
+need a server default or must be nullable. A newly created search index is
+filled from the rows already in the database. Indexes missing from existing
+tables are created there too, as are the link tables' composite primary keys
+(duplicate links are dropped first; SQLite cannot add a primary key to a
+table, so it gets an equivalent unique index).
+
+Startup phases (import, ``create_app``, schema bootstrap, worker warm-up,
+first request) are kept in ``app.extensions["startup"]``, logged, and
+exported by ``/metrics`` as ``app_startup_seconds``. Warm-up requests (marked
+with ``WARM_UP_ENVIRON``) are not the first request.
+"""
+
+from contextlib import contextmanager
+from importlib import import_module
+from flask import current_app, g, request
+from sqlalchemy import delete, func, insert, inspect, select, text
+from sqlalchemy.schema import CreateColumn
+from app.models import db
+from app.utils.search import SEARCH_TABLE, rebuild_search_index
+import click
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no file lock; run a single process there
+    fcntl = None
+
+LOCK_NAME = "mechanic_shop:schema"
+WARM_UP_ENVIRON = "mechanic_shop.warm_up"  # set on a worker's own warm-up requests
+
+# dialect -> (acquire, release); both hold until released or disconnected
+ADVISORY_LOCKS = {
+    "postgresql": (
+        "SELECT pg_advisory_lock(hashtext(:name))",
+        "SELECT pg_advisory_unlock(hashtext(:name))",
+    ),
+    "mysql": ("SELECT GET_LOCK(:name, -1)", "SELECT RELEASE_LOCK(:name)"),
+}
+ADVISORY_LOCKS["mariadb"] = ADVISORY_LOCKS["mysql"]
+
+
+# SCHEMA BOOTSTRAP
+@contextmanager
+def schema_lock(app, engine):
+    """Hold the lock shared by every process bootstrapping ``engine``."""
+    statements = ADVISORY_LOCKS.get(engine.dialect.name)
+    if statements is not None:
+        acquire, release = statements
+        with engine.connect() as connection:
+            connection.execute(text(acquire), {"name": LOCK_NAME})
+            connection.commit()
+            try:
+                yield
+            finally:
+                connection.execute(text(release), {"name": LOCK_NAME})
+                connection.commit()
+        return
+
+    path = app.config.get("SCHEMA_LOCK_FILE") or os.path.join(
+        app.instance_path, "schema.lock"
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield  # closing the file releases the lock
+
+
+def missing_tables(engine):
+    """Tables the app expects (the search index included) that do not exist."""
+    expected = set(db.metadata.tables) | {SEARCH_TABLE}
+    return expected - set(inspect(engine).get_table_names())
+
+
+def missing_columns(engine):
+    """Mapped columns absent from tables that already exist, in table order."""
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing:
+            continue  # create_all makes it whole
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        missing += [column for column in table.columns if column.name not in present]
+    return missing
+
+
+def add_columns(connection, columns):
+    """``ALTER TABLE ... ADD COLUMN`` for each column (existing rows get the
+    server default, e.g. ``version INTEGER DEFAULT '1' NOT NULL``)."""
+    preparer = connection.dialect.identifier_preparer
+    for column in columns:
+        if not column.nullable and column.server_default is None:
+            raise RuntimeError(
+                f"cannot add {column.table.name}.{column.name} to existing rows: "
+                "it is NOT NULL without a server default"
+            )
+        definition = CreateColumn(column).compile(dialect=connection.dialect)
+        connection.execute(
+            text(
+                f"ALTER TABLE {preparer.format_table(column.table)} ADD COLUMN {definition}"
+            )
+        )
+
+
+def missing_indexes(engine):
+    """Declared indexes absent from tables that already exist."""
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name in existing:
+            present = {index["name"] for index in inspector.get_indexes(table.name)}
+            missing += [index for index in table.indexes if index.name not in present]
+    return missing
+
+
+def _pk_index_name(table):
+    return f"uq_{table.name}_pk"
+
+
+def missing_primary_keys(engine):
+    """Existing tables without their declared primary key (such as link tables
+    created before they had one) or, on SQLite, its stand-in unique index."""
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        expected = [column.name for column in table.primary_key.columns]
+        present = inspector.get_pk_constraint(table.name)["constrained_columns"]
+        stand_ins = {index["name"] for index in inspector.get_indexes(table.name)}
+        if present != expected and _pk_index_name(table) not in stand_ins:
+            missing.append(table)
+    return missing
+
+
+def add_primary_keys(connection, tables):
+    """Add each table's primary key, first dropping duplicate rows of link
+    tables (every column in the key); other duplicates are an error."""
+    preparer = connection.dialect.identifier_preparer
+    for table in tables:
+        columns = list(table.primary_key.columns)
+        rows = connection.execute(select(*columns).distinct()).all()
+        total = connection.execute(select(func.count()).select_from(table)).scalar()
+        if len(rows) < total:
+            if len(columns) < len(table.columns):
+                raise RuntimeError(
+                    f"cannot add the primary key of {table.name}: duplicate keys"
+                )
+            connection.execute(delete(table))
+            connection.execute(insert(table), [row._asdict() for row in rows])
+
+        names = ", ".join(preparer.quote(column.name) for column in columns)
+        if connection.dialect.name == "sqlite":
+            statement = (
+                f"CREATE UNIQUE INDEX {preparer.quote(_pk_index_name(table))} "
+                f"ON {preparer.format_table(table)} ({names})"
+            )
+        else:
+            statement = (
+                f"ALTER TABLE {preparer.format_table(table)} ADD PRIMARY KEY ({names})"
+            )
+        connection.execute(text(statement))
+
+
+def bootstrap_schema(app):
+    """Create or upgrade the schema once across processes; True if this call
+    changed it."""
+    started = time.perf_counter()
+    with app.app_context():
+        engine = db.engine
+        with schema_lock(app, engine):
+            missing = missing_tables(engine)
+            created = bool(missing)
+            if created:
+                db.create_all()
+            if SEARCH_TABLE in missing:
+                rebuild_search_index()  # index rows written before it existed
+            columns = missing_columns(engine)
+            tables = missing_primary_keys(engine)
+            indexes = missing_indexes(engine)
+            if columns or tables or indexes:
+                with engine.begin() as connection:
+                    add_columns(connection, columns)
+                    add_primary_keys(connection, tables)
+                    for index in indexes:
+                        index.create(connection, checkfirst=True)
+                created = True
+    record_phase(app, "schema_bootstrap", time.perf_counter() - started)
+    return created
+
+
+# LAZY CLI COMMANDS
+class LazyCommand(click.Command):
+    """CLI command imported from ``import_name`` (``module:attr``) only when it
+    runs, so serving requests never loads its module."""
+
+    def __init__(self, name, import_name, help=None):
+        super().__init__(name, help=help)
+        self.import_name = import_name
+
+    def load(self):
+        module, _, attr = self.import_name.partition(":")
+        return getattr(import_module(module), attr)
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        return self.load().make_context(info_name, args, parent=parent, **extra)
+
+
+# STARTUP TIMINGS
+def record_phase(app, phase, seconds):
+    app.extensions.setdefault("startup", {})[phase] = seconds
+    app.logger.info("Startup: %s took %.3fs", phase, seconds)
+
+
+def _start_request():
+    # Only until this worker has served its first request from a client
+    if request.environ.get(WARM_UP_ENVIRON):
+        return
+    if "first_request" not in current_app.extensions["startup"]:
+        g.startup_request_started = time.perf_counter()
+
+
+def _record_first_request(response):
+    started = g.pop("startup_request_started", None)
+    if started is not None:
+        record_phase(current_app, "first_request", time.perf_counter() - started)
+    return response
+
+
+def init_startup(app):
+    app.extensions.setdefault("startup", {})
+    app.before_request(_start_request)
+    app.after_request(_record_first_request)
@@ -0,0 +1,191 @@
+from collections import OrderedDict
+from threading import Lock
+from flask_caching.backends.base import BaseCache
+from flask_caching.backends.rediscache import RedisCache
+from app.utils.caching import VIEW_PREFIX
+import os
+import time
+
+
+class TwoTierCache(BaseCache):
+    """Per-process LRU (L1) in front of a shared Redis cache (L2).
+
+    Response entries from ``app.utils.caching`` are immutable: their keys embed
+    the tag versions they were built from, so a write never changes the value
+    behind an existing key. Only those keys (``l1_prefixes``) are kept in L1.
+    Every other key, such as tag versions and replica sticky marks, may change
+    or expire early and is always read from L2, which is what makes every
+    worker see a write on its next request.
+
+    Explicit deletes and clears are broadcast over Redis pub/sub so other
+    workers drop their L1 copies as well.
+    """
+
+    def __init__(
+        self,
+        l2,
+        l1_max_entries=1024,
+        l1_timeout=60,
+        l1_prefixes=(VIEW_PREFIX,),
+        channel="flask_cache_l1_invalidate",
+        default_timeout=300,
+    ):
+        super().__init__(default_timeout=default_timeout)
+        self.l2 = l2
+        self.client = l2._write_client
+        self.l1_max_entries = l1_max_entries
+        self.l1_timeout = l1_timeout
+        self.l1_prefixes = tuple(l1_prefixes)
+        self.channel = channel
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0}
+        self._l1 = OrderedDict()  # key -> (expires_at, value)
+        self._lock = Lock()
+        self._subscriber_pid = None
+        self._subscriber = None
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        l2 = RedisCache.factory(app, config, [], dict(kwargs))
+        kwargs.update(
+            l1_max_entries=config.get("CACHE_L1_MAX_ENTRIES", 1024),
+            l1_timeout=config.get("CACHE_L1_TIMEOUT", 60),
+        )
+        if config.get("CACHE_L1_PREFIXES"):
+            kwargs["l1_prefixes"] = config["CACHE_L1_PREFIXES"]
+        return cls(l2, *args, **kwargs)
+
+    # L1 helpers
+    def _l1_cacheable(self, key):
+        return self.l1_max_entries > 0 and key.startswith(self.l1_prefixes)
+
+    def _l1_get(self, key):
+        self._ensure_subscriber()
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._l1[key]
+                return None
+            self._l1.move_to_end(key)
+            return value
+
+    def _l1_set(self, key, value, timeout):
+        timeout = self._normalize_timeout(timeout)
+        ttl = min(timeout, self.l1_timeout) if timeout else self.l1_timeout
+        with self._lock:
+            self._l1[key] = (time.monotonic() + ttl, value)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_evict(self, keys):
+        with self._lock:
+            if keys is None:
+                self._l1.clear()
+            else:
+                for key in keys:
+                    self._l1.pop(key, None)
+
+    # Cross-process L1 invalidation
+    def _ensure_subscriber(self):
+        # Threads do not survive fork, so each worker starts its own listener
+        if self._subscriber_pid == os.getpid():
+            return
+        self._subscriber_pid = os.getpid()
+        self._l1_evict(None)
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.channel: self._on_invalidate})
+        self._subscriber = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def _on_invalidate(self, message):
+        data = message["data"]
+        key = data.decode() if isinstance(data, bytes) else data
+        self._l1_evict(None if key == "*" else [key])
+
+    def _publish(self, keys):
+        if keys is None:
+            self.client.publish(self.channel, "*")
+        for key in keys or []:
+            if self._l1_cacheable(key):
+                self.client.publish(self.channel, key)
+
+    # BaseCache API
+    def get(self, key):
+        if self._l1_cacheable(key):
+            value = self._l1_get(key)
+            if value is not None:
+                self.stats["l1_hits"] += 1
+                return value
+        value = self.l2.get(key)
+        if value is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["l2_hits"] += 1
+        if self._l1_cacheable(key):
+            self._l1_set(key, value, None)
+        return value
+
+    def get_many(self, *keys):
+        values = {}
+        remote = []
+        for key in keys:
+            value = self._l1_get(key) if self._l1_cacheable(key) else None
+            if value is None:
+                remote.append(key)
+            else:
+                values[key] = value
+        if remote:
+            for key, value in zip(remote, self.l2.get_many(*remote)):
+                values[key] = value
+                if value is not None and self._l1_cacheable(key):
+                    self._l1_set(key, value, None)
+        return [values[key] for key in keys]
+
+    def set(self, key, value, timeout=None):
+        result = self.l2.set(key, value, timeout=timeout)
+        if self._l1_cacheable(key):
+            self._l1_set(key, value, timeout)
+        return result
+
+    def add(self, key, value, timeout=None):
+        added = self.l2.add(key, value, timeout=timeout)
+        if added and self._l1_cacheable(key):
+            self._l1_set(key, value, timeout)
+        return added
+
+    def set_many(self, mapping, timeout=None):
+        result = self.l2.set_many(mapping, timeout=timeout)
+        for key, value in mapping.items():
+            if self._l1_cacheable(key):
+                self._l1_set(key, value, timeout)
+        return result
+
+    def delete(self, key):
+        self._l1_evict([key])
+        self._publish([key])
+        return self.l2.delete(key)
+
+    def delete_many(self, *keys):
+        self._l1_evict(keys)
+        self._publish(keys)
+        return self.l2.delete_many(*keys)
+
+    def has(self, key):
+        if self._l1_cacheable(key) and self._l1_get(key) is not None:
+            return True
+        return self.l2.has(key)
+
+    def clear(self):
+        self._l1_evict(None)
+        self._publish(None)
+        return self.l2.clear()
+
+    def inc(self, key, delta=1):
+        self._l1_evict([key])
+        return self.l2.inc(key, delta=delta)
+
+    def dec(self, key, delta=1):
+        self._l1_evict([key])
+        return self.l2.dec(key, delta=delta)
@@ -1,9 +1,27 @@
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from jose import jwt
 import jose
+from collections import OrderedDict
 from functools import wraps
-from flask import jsonify, request
+from threading import Lock
+from flask import current_app, g, jsonify, request
+from marshmallow import ValidationError, fields
+from sqlalchemy import insert, inspect, select, tuple_
+from sqlalchemy.orm import (
+    ColumnProperty,
+    RelationshipProperty,
+    load_only,
+    selectinload,
+)
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models import db, Customer
+from app.utils.serialization import dump
+import base64
+import hashlib
+import hmac
+import json
 import os
+import time
 
 # SECRET_KEY = "super secret key"
 SECRET_KEY = os.environ.get("SECRET_KEY") or "super secret secrets"
@@ -26,6 +44,67 @@ def encode_token(customer_id):
     return token
 
 
+# VERIFIED TOKEN CACHE
+TOKEN_CACHE_MAX_ENTRIES = 4096
+TOKEN_CACHE_TTL = 300  # seconds
+
+
+class TokenCache:
+    """Bounded LRU of verified JWT claims keyed on the raw token.
+
+    Only tokens that passed signature and expiry checks are stored, and an
+    entry never outlives the token's own ``exp``, so a hit is equivalent to a
+    fresh ``jwt.decode``. Expired or unknown tokens fall through to the full
+    verification, which produces the usual error messages.
+    """
+
+    def __init__(self, max_entries=TOKEN_CACHE_MAX_ENTRIES, ttl=TOKEN_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # token -> (expires_at, claims)
+        self._lock = Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, claims = entry
+            if expires_at <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims
+
+    def set(self, token, claims):
+        expires_at = time.time() + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, claims["exp"])
+        with self._lock:
+            self._entries[token] = (expires_at, claims)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = TokenCache()
+
+
+def decode_token(token):
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+        token_cache.set(token, claims)
+    return claims
+
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -41,14 +120,363 @@ def token_required(f):
             return jsonify({"message": "Required token missing"}), 401
 
         try:
-            data = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-            customer_id = data["sub"]
+            data = decode_token(token)
+            customer_id = int(data["sub"])
         except jose.exceptions.ExpiredSignatureError:
             return jsonify({"message": "Token expired"}), 401
-        except jose.exceptions.JWTError:
+        except (jose.exceptions.JWTError, KeyError, ValueError):
             return jsonify({"message": "Invalid token"}), 401
 
+        # Routes that need the row call get_current_customer(), loaded once.
+        # g outlives the request when an app context is already pushed (tests,
+        # CLI), so drop any principal left over from an earlier request.
+        g.customer_id = customer_id
+        g.pop("current_customer", None)
+
         # ✅ Execute the wrapped function with decoded customer ID
         return f(customer_id, *args, **kwargs)
 
     return decorated
+
+
+def internal_token_required(f):
+    """Require ``Authorization: Bearer <INTERNAL_ENDPOINTS_TOKEN>`` when that
+    setting is configured (internal stats endpoints)."""
+
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        expected = current_app.config.get("INTERNAL_ENDPOINTS_TOKEN")
+        if expected:
+            supplied = request.headers.get("Authorization", "").encode()
+            if not hmac.compare_digest(supplied, f"Bearer {expected}".encode()):
+                return jsonify({"message": "Invalid token"}), 401
+        return f(*args, **kwargs)
+
+    return decorated
+
+
+def token_customer_id():
+    """Customer id from a valid bearer token on the current request, else None.
+
+    For code that only needs to tell clients apart (no 401 on bad tokens).
+    """
+    parts = request.headers.get("Authorization", "").split()
+    if len(parts) < 2:
+        return None
+    try:
+        return int(decode_token(parts[1])["sub"])
+    except (jose.exceptions.JWTError, KeyError, ValueError):
+        return None
+
+
+def get_current_customer():
+    """Return the authenticated Customer (or None), fetched at most once per request."""
+    if "current_customer" not in g:
+        g.current_customer = db.session.get(Customer, g.customer_id)
+    return g.current_customer
+
+
+# KEYSET (CURSOR) PAGINATION
+DEFAULT_PAGE_LIMIT = 25
+MAX_PAGE_LIMIT = 100
+
+
+def encode_cursor(values):
+    # Dates are stored as ISO strings so the cursor stays plain JSON
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, date) else value for value in values]
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, key_columns):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(key_columns):
+            raise ValueError
+        return [
+            (
+                date.fromisoformat(value)
+                if column.type.python_type is date
+                else column.type.python_type(value)
+            )
+            for column, value in zip(key_columns, values)
+        ]
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def get_page_limit():
+    limit = request.args.get("limit", DEFAULT_PAGE_LIMIT)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, MAX_PAGE_LIMIT)
+
+
+def keyset_paginate(query, key_columns, rows=False):
+    """Return one page of ``query`` ordered by ``key_columns`` and the cursor for
+    the next page (``None`` on the last page). With ``rows`` the page holds
+    result rows instead of the first column's objects.
+
+    Reads ``limit`` and ``cursor`` from the request args and raises ValueError
+    if either is invalid.
+    """
+    limit = get_page_limit()
+    cursor = request.args.get("cursor")
+
+    if cursor:
+        values = decode_cursor(cursor, key_columns)
+        if len(key_columns) == 1:
+            query = query.where(key_columns[0] > values[0])
+        else:
+            query = query.where(tuple_(*key_columns) > tuple_(*values))
+
+    # Fetch one extra row to know whether another page exists
+    query = query.order_by(*key_columns).limit(limit + 1)
+    result = db.session.execute(query)
+    items = result.all() if rows else result.scalars().all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(
+            [getattr(items[-1], column.key) for column in key_columns]
+        )
+    return items, next_cursor
+
+
+def paginated_response(schema, items, next_cursor, etag_rows=None):
+    """Page envelope with a weak ETag over the page's rows (``etag_rows``
+    defaults to ``items``; pass nested rows too when they are serialized)."""
+    extra = next_cursor
+    if request.args.get("fields"):
+        extra = f"{next_cursor}|{request.args['fields']}"
+    etag = row_etag(items if etag_rows is None else etag_rows, extra=extra)
+    return conditional_response(
+        etag,
+        lambda: jsonify({"items": dump(schema, items), "next_cursor": next_cursor}),
+        weak=True,
+    )
+
+
+# SPARSE FIELDSETS
+_fieldsets = {}  # (schema, fields, key columns) -> (narrowed schema, options)
+
+
+def _loader_options(schema, model, key_columns=()):
+    """Return ``(columns, relationship loaders)`` covering ``schema``'s fields,
+    or None when a field cannot be mapped to a column or relationship."""
+    mapper = inspect(model)
+    columns = {*mapper.primary_key, *key_columns}
+    if mapper.version_id_col is not None:
+        columns.add(mapper.version_id_col)  # read by row_etag
+    attributes = {getattr(model, mapper.get_property_by_column(c).key) for c in columns}
+    loaders = []
+    for name, field in schema.dump_fields.items():
+        prop = mapper.attrs.get(field.attribute or name)
+        if isinstance(prop, ColumnProperty):
+            attributes.add(getattr(model, prop.key))
+        elif isinstance(prop, RelationshipProperty) and isinstance(
+            field, fields.Nested
+        ):
+            nested = _loader_options(field.schema, prop.mapper.class_)
+            loader = selectinload(getattr(model, prop.key))
+            if nested is not None:
+                loader = loader.load_only(*nested[0]).options(*nested[1])
+            loaders.append(loader)
+        else:
+            return None
+    return attributes, loaders
+
+
+def sparse_fieldset(schema, key_columns=(), default_options=()):
+    """Apply the ``fields`` request arg (comma separated) to a list endpoint.
+
+    Returns ``(schema, options)``: the schema narrowed with ``only=`` and the
+    loader options that SELECT just those columns (plus primary key, version
+    and ``key_columns``) and eager load only the nested relationships being
+    serialized; ``default_options`` when a field has no column to map to.
+    Raises ValueError for unknown field names.
+    """
+    # Sorted so each subset is narrowed (and cached) once; jsonify sorts keys
+    requested = tuple(
+        sorted(
+            {
+                name.strip()
+                for name in request.args.get("fields", "").split(",")
+                if name.strip()
+            }
+        )
+    )
+    unknown = [name for name in requested if name not in schema.dump_fields]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+    cache_key = (schema, requested, tuple(str(column) for column in key_columns))
+    if cache_key not in _fieldsets:
+        narrowed = (
+            type(schema)(many=schema.many, only=requested) if requested else schema
+        )
+        model = schema.opts.model
+        loading = _loader_options(narrowed, model, [c.expression for c in key_columns])
+        if loading is None:
+            options = default_options
+        else:
+            attributes, loaders = loading
+            options = (load_only(*attributes), *loaders)
+        _fieldsets[cache_key] = (narrowed, options)
+    return _fieldsets[cache_key]
+
+
+# ETAGS / CONDITIONAL GET
+def row_etag(rows, extra=None):
+    """Hash of (table, id, version) for ``rows``; changes whenever any of the
+    rows is updated, added or removed."""
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(f"{row.__tablename__}:{row.id}:{row.version};".encode())
+    if extra:
+        digest.update(str(extra).encode())
+    return digest.hexdigest()
+
+
+def conditional_response(etag, build, weak=False):
+    """Return 304 when If-None-Match matches ``etag`` without calling
+    ``build``; otherwise ``build()``'s response with the ETag attached."""
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.make_response(build())
+    response.set_etag(etag, weak=weak)
+    return response
+
+
+# BULK CREATE
+MAX_BULK_ITEMS = 1000
+
+
+def find_duplicates(column, keyed_values, message):
+    """Return ``{index: (400, message)}`` for every value that already exists in
+    ``column`` or repeats earlier in the batch, using a single IN query."""
+    existing = set(
+        db.session.execute(
+            select(column).where(column.in_({value for _, value in keyed_values}))
+        ).scalars()
+    )
+    conflicts = {}
+    for index, value in keyed_values:
+        if value in existing:
+            conflicts[index] = (400, message)
+        existing.add(value)
+    return conflicts
+
+
+def insert_all(instances):
+    """Insert new ``instances`` of one model with multi-row INSERT ... RETURNING
+    statements (a flush sends one INSERT per row when it needs the new ids).
+    Returns the persistent rows, in the order of ``instances``.
+
+    Column values come from the instances; their collections (e.g. a ticket's
+    mechanics) are copied onto the rows and their link rows flushed. Databases
+    without INSERT ... RETURNING (MySQL) fall back to a plain flush.
+    """
+    if not instances:
+        return []
+    dialect = db.session.get_bind().dialect
+    if not dialect.insert_returning:
+        db.session.add_all(instances)
+        db.session.flush()
+        return instances
+
+    from app.utils.search import index_rows  # search imports this module
+
+    model = type(instances[0])
+    mapper = inspect(model)
+    columns = [
+        column.key
+        for column in mapper.columns
+        if not column.primary_key and column.server_default is None
+    ]
+    params = [
+        {key: getattr(instance, key) for key in columns} for instance in instances
+    ]
+    if dialect.name == "sqlite":
+        # SQLite assigns ids in VALUES order but returns the rows in any order;
+        # asking for parameter order would make SQLAlchemy send one row at a time
+        result = db.session.execute(insert(model).returning(model), params)
+        rows = sorted(result.scalars(), key=lambda row: row.id)
+    else:
+        statement = insert(model).returning(model, sort_by_parameter_order=True)
+        rows = db.session.execute(statement, params).scalars().all()
+
+    for instance, row in zip(instances, rows):
+        state = inspect(instance)
+        for relationship in mapper.relationships:
+            if relationship.uselist:  # a new row has no related rows yet
+                set_committed_value(row, relationship.key, [])
+                getattr(row, relationship.key).extend(
+                    state.dict.get(relationship.key) or []
+                )
+    db.session.flush()  # link rows, if any
+    index_rows(db.session, rows)
+    return rows
+
+
+def bulk_create(schema, build, find_conflicts):
+    """Validate a JSON list with ``schema``, drop invalid items and those reported by
+    ``find_conflicts`` and insert the rest with ``insert_all`` (multi-row INSERT).
+
+    ``build`` turns loaded data into a model instance; ``find_conflicts`` gets
+    ``[(index, loaded), ...]`` and returns ``{index: (status, error)}``.
+    Returns the JSON response and status code with a result per input item.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, list) or not payload:
+        return jsonify({"error": "Request body must be a non-empty list"}), 400
+    if len(payload) > MAX_BULK_ITEMS:
+        return (
+            jsonify({"error": f"A batch may contain at most {MAX_BULK_ITEMS} items"}),
+            400,
+        )
+
+    # Load the batch in one call (per-call schema overhead is significant); on
+    # errors, record them per index and reload only the valid items
+    results = [None] * len(payload)
+    try:
+        loaded = list(enumerate(schema.load(payload, many=True)))
+    except ValidationError as e:
+        for index, messages in e.messages.items():
+            results[index] = {"index": index, "status": 400, "errors": messages}
+        valid = [index for index in range(len(payload)) if index not in e.messages]
+        loaded = []
+        if valid:
+            items = schema.load([payload[index] for index in valid], many=True)
+            loaded = list(zip(valid, items))
+
+    conflicts = find_conflicts(loaded) if loaded else {}
+    created = []
+    for index, data in loaded:
+        if index in conflicts:
+            status, error = conflicts[index]
+            results[index] = {"index": index, "status": status, "error": error}
+        else:
+            created.append((index, build(data)))
+
+    rows = insert_all([instance for _, instance in created])
+    # Dump before commit to avoid a refresh per row
+    for (index, _), row in zip(created, rows):
+        results[index] = {"index": index, "status": 201, "data": schema.dump(row)}
+    db.session.commit()
+
+    if len(created) == len(payload):
+        status_code = 201
+    elif created:
+        status_code = 207
+    else:
+        status_code = 400
+    return jsonify({"created": len(created), "results": results}), status_code
@@ -0,0 +1,61 @@
+"""Worker lifecycle hooks for pre-forking servers (see gunicorn.conf.py).
+
+With ``preload_app`` the master imports flask_app once: the app, its engines
+and its compiled schemas are shared by every forked worker (copy-on-write).
+Pooled connections must not be shared, so each worker drops the ones it
+inherited (``dispose_engines``, without closing them under the master's feet)
+and opens its own. ``warm_up`` then readies the worker before it takes
+traffic, and ``shut_down`` flushes what it holds on exit.
+"""
+
+from app.extensions import limiter
+from app.models import db
+from app.utils.health import get_health_monitor
+from app.utils.serialization import precompile_schemas
+from app.utils.startup import WARM_UP_ENVIRON, record_phase
+import time
+
+WARMUP_ADDRESS = "worker-warmup"  # REMOTE_ADDR of the warm-up requests
+
+
+def dispose_engines(app):
+    """Forget the pooled connections inherited from the parent process."""
+    with app.app_context():
+        engines = list(db.engines.values())
+    replicas = app.extensions.get("db_replicas")
+    if replicas:
+        engines += replicas.engines
+    for engine in engines:
+        engine.dispose(close=False)  # the parent still owns those sockets
+    return len(engines)
+
+
+def warm_up(app, paths=()):
+    """Compile the schemas, start the readiness probes and GET ``paths``
+    (filling the shared response cache and this worker's L1) before the
+    worker accepts requests. Returns ``{path: status code}``; the time taken is
+    the ``warm_up`` startup phase."""
+    started = time.perf_counter()
+    precompile_schemas()
+    with app.app_context():
+        get_health_monitor()  # starts this worker's probe threads
+
+    # Not counted against any client's rate limit; nothing else is running yet
+    enabled, limiter.enabled = limiter.enabled, False
+    environ = {"REMOTE_ADDR": WARMUP_ADDRESS, WARM_UP_ENVIRON: True}
+    try:
+        client = app.test_client()
+        statuses = {
+            path: client.get(path, environ_base=environ).status_code for path in paths
+        }
+    finally:
+        limiter.enabled = enabled
+    record_phase(app, "warm_up", time.perf_counter() - started)
+    return statuses
+
+
+def shut_down():
+    """Push this worker's unsynced rate-limit hits (batched storage only)."""
+    flush = getattr(limiter.storage, "flush", None)
+    if flush is not None:
+        flush()
@@ -0,0 +1,13 @@
+"""Optional ASGI entry point: the read-heavy routes run on the async engine,
+everything else on the Flask app from flask_app.py (see app/asgi.py).
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+    gunicorn -k uvicorn.workers.UvicornWorker asgi_app:app
+
+Needs the async driver for the database: aiosqlite, asyncpg or aiomysql.
+"""
+
+from app.asgi import AsyncReadApp
+from flask_app import app as flask_app
+
+app = AsyncReadApp(flask_app)
@@ -0,0 +1,158 @@
+"""Concurrent-client throughput of the read-heavy routes on the sync Flask
+workers (gunicorn, flask_app.py) versus the ASGI entry point (uvicorn,
+asgi_app.py), both serving the same seeded SQLite file.
+
+Each server is started with the same number of worker processes, then every
+route in app.asgi.ASYNC_READ_ENDPOINTS is driven at each --concurrency level
+with the endpoints.py scenarios (response caching bypassed unless --cache).
+SQLite answers in microseconds, so the async path mostly adds overhead there;
+the comparison that matters is against a networked database: pass
+--database-uri for one seeded earlier (endpoints.py --seed-only, same dataset
+options) and install its async driver.
+
+    python benchmarks/async_reads.py --workers 2 --concurrency 1 8 32
+    python benchmarks/async_reads.py --threads 4 --output async_reads.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from endpoints import HTTPTransport, id_layout, run_scenario, scenarios, seed
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def server_commands(args, port):
+    bind = f"127.0.0.1:{port}"
+    return {
+        "gunicorn-sync": [
+            "gunicorn",
+            "--worker-class=sync",  # gunicorn.conf.py defaults to gthread
+            f"--workers={args.workers}",
+            f"--threads={args.threads}",
+            f"--bind={bind}",
+            "--log-level=warning",
+            "flask_app:app",
+        ],
+        "uvicorn-async": [
+            "uvicorn",
+            f"--workers={args.workers}",
+            "--host=127.0.0.1",
+            f"--port={port}",
+            "--log-level=warning",
+            "asgi_app:app",
+        ],
+    }
+
+
+def wait_until_up(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/livez")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--mechanics", type=int, default=200)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-uri", help="already seeded database")
+    parser.add_argument("--workers", type=int, default=2, help="processes per server")
+    parser.add_argument("--threads", type=int, default=1, help="gunicorn threads")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=400, help="per route and level")
+    parser.add_argument("--warmup", type=int, default=20, help="per route, untimed")
+    parser.add_argument("--cache", action="store_true", help="keep response caching")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    from app.asgi import ASYNC_READ_ENDPOINTS
+
+    uri = args.database_uri
+    if not uri:
+        db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        uri = f"sqlite:///{db_path}"
+        os.environ["SQLALCHEMY_DATABASE_URI"] = uri
+
+        from app import create_app
+
+        app = create_app("ProductionConfig")
+        started = time.perf_counter()
+        seed(app, args)
+        print(f"seeded {db_path} in {time.perf_counter() - started:.1f}s")
+
+    env = {**os.environ, "SQLALCHEMY_DATABASE_URI": uri, "RATELIMIT_ENABLED": "false"}
+    plan = scenarios(id_layout(args))
+    results = {}
+    for name, command in server_commands(args, args.port).items():
+        server = subprocess.Popen(
+            command,
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_up(args.port)
+            url = f"http://127.0.0.1:{args.port}"
+            for concurrency in args.concurrency:
+                run_args = argparse.Namespace(
+                    **{**vars(args), "concurrency": concurrency}
+                )
+                for endpoint in ASYNC_READ_ENDPOINTS:
+                    stats = run_scenario(
+                        lambda: HTTPTransport(url), plan[endpoint], run_args
+                    )
+                    results.setdefault(endpoint, {}).setdefault(name, {})[
+                        concurrency
+                    ] = stats
+                    print(
+                        f"{name:<14} c={concurrency:<3} {endpoint:<45} "
+                        f"{stats['throughput_rps']:>8.1f} req/s   "
+                        f"p95 {stats['p95_ms']:>7.2f} ms"
+                        + (f"   {stats['errors']} errors" if stats["errors"] else "")
+                    )
+        finally:
+            server.terminate()
+            server.wait()
+
+    print()
+    for endpoint, servers in results.items():
+        for concurrency in args.concurrency:
+            sync = servers["gunicorn-sync"][concurrency]["throughput_rps"]
+            async_ = servers["uvicorn-async"][concurrency]["throughput_rps"]
+            print(
+                f"{endpoint:<45} c={concurrency:<3} async/sync throughput "
+                f"{async_ / sync:>5.2f}x"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"workers": args.workers, "threads": args.threads, "routes": results},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
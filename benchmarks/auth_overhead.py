@@ -0,0 +1,79 @@
+"""Measure per-request auth overhead of ``token_required``: full JWT
+verification on every call vs a hit in the verified-claims cache, plus the
+cost of loading the principal with ``get_current_customer``.
+
+    python benchmarks/auth_overhead.py --repeat 20000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import create_app
+from app.models import db, Customer
+from app.utils import util
+
+
+def time_calls(call, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        "p50_us": round(statistics.median(samples), 2),
+        "p99_us": round(samples[int(len(samples) * 0.99) - 1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20_000)
+    args = parser.parse_args()
+
+    app = create_app("TestingConfig")
+    with app.app_context():
+        db.create_all()
+        customer = Customer(
+            name="Bench", email="bench@customer.com", phone="555", password="pw"
+        )
+        db.session.add(customer)
+        db.session.commit()
+        token = util.encode_token(customer.id)
+
+        @util.token_required
+        def claims_only(customer_id):
+            return customer_id
+
+        @util.token_required
+        def with_principal(customer_id):
+            return util.get_current_customer()
+
+        def uncached(view):
+            def call():
+                util.token_cache.clear()
+                view()
+
+            return call
+
+        headers = {"Authorization": f"Bearer {token}"}
+        with app.test_request_context(headers=headers):
+            results = {
+                "jwt.decode every call": time_calls(uncached(claims_only), args.repeat),
+                "claims cache hit": time_calls(claims_only, args.repeat),
+                "cache hit + principal": time_calls(with_principal, args.repeat),
+            }
+
+    for label, result in results.items():
+        print(
+            f"{label:<24} p50 {result['p50_us']:>8} us   p99 {result['p99_us']:>8} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Compare insert throughput of the single-row POST endpoints with the /bulk
+endpoints, driven through the Flask test client against in-memory SQLite.
+
+    python benchmarks/bulk_create.py --rows 5000 --batch 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import create_app
+from app.models import db
+
+
+def customer(i):
+    return {
+        "name": f"Customer {i}",
+        "email": f"customer{i}@example.com",
+        "phone": "555-0000",
+        "password": "secret",
+    }
+
+
+def mechanic(i):
+    return {
+        "name": f"Mechanic {i}",
+        "email": f"mechanic{i}@example.com",
+        "phone": "555-0000",
+        "salary": 50000,
+    }
+
+
+def inventory_item(i):
+    return {"name": f"Part {i}", "price": 9.99}
+
+
+RESOURCES = {
+    "customers": customer,
+    "mechanics": mechanic,
+    "inventory": inventory_item,
+}
+
+
+def run_single(client, resource, make, rows):
+    started = time.perf_counter()
+    for i in range(rows):
+        res = client.post(f"/{resource}/", json=make(i))
+        assert res.status_code == 201, res.json
+    return time.perf_counter() - started
+
+
+def run_bulk(client, resource, make, rows, batch):
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+        items = [make(i) for i in range(offset, min(offset + batch, rows))]
+        res = client.post(f"/{resource}/bulk", json=items)
+        assert res.status_code == 201, res.json
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_app("TestingConfig")
+    app.config["RATELIMIT_ENABLED"] = False
+
+    for resource, make in RESOURCES.items():
+        timings = {}
+        for label in ["single", "bulk"]:
+            with app.app_context():
+                db.drop_all()
+                db.create_all()
+                client = app.test_client()
+                if label == "single":
+                    timings[label] = run_single(client, resource, make, args.rows)
+                else:
+                    timings[label] = run_bulk(
+                        client, resource, make, args.rows, args.batch
+                    )
+        single_rate = args.rows / timings["single"]
+        bulk_rate = args.rows / timings["bulk"]
+        print(
+            f"{resource:<10} single: {single_rate:>8.0f} rows/s   "
+            f"bulk: {bulk_rate:>8.0f} rows/s   ({bulk_rate / single_rate:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compare cache hit latency for SimpleCache, the two-tier cache's L1 and its
+Redis L2. Uses an in-process fakeredis server unless --redis-url is given
+(a real server shows the network round trip the L1 avoids).
+
+    python benchmarks/cache_tiers.py --redis-url redis://localhost:6379/0
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask_caching.backends.rediscache import RedisCache
+from flask_caching.backends.simplecache import SimpleCache
+from app.utils.two_tier_cache import TwoTierCache
+
+# Roughly the size of a cached 25-ticket list response
+PAYLOAD = (b"x" * 12_000, 200, "application/json")
+
+
+def time_gets(get, key, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        get(key)
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        "p50_us": round(statistics.median(samples), 2),
+        "p99_us": round(samples[int(len(samples) * 0.99) - 1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--redis-url")
+    parser.add_argument("--repeat", type=int, default=20_000)
+    args = parser.parse_args()
+
+    if args.redis_url:
+        import redis
+
+        client = redis.from_url(args.redis_url)
+    else:
+        import fakeredis
+
+        client = fakeredis.FakeRedis()
+
+    simple = SimpleCache()
+    simple.set("view:bench", PAYLOAD)
+
+    two_tier = TwoTierCache(RedisCache(host=client, key_prefix="bench_"))
+    two_tier.set("view:bench", PAYLOAD)  # set() also fills L1
+
+    l2_only = TwoTierCache(RedisCache(host=client, key_prefix="bench_"))
+    l2_only.l1_max_entries = 0  # every get goes to Redis
+
+    results = {
+        "SimpleCache (per process)": time_gets(simple.get, "view:bench", args.repeat),
+        "TwoTier L1 hit": time_gets(two_tier.get, "view:bench", args.repeat),
+        "TwoTier L2 hit (Redis)": time_gets(l2_only.get, "view:bench", args.repeat),
+    }
+    for label, result in results.items():
+        print(
+            f"{label:<28} p50 {result['p50_us']:>8} us   p99 {result['p99_us']:>8} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
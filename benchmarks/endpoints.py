@@ -0,0 +1,610 @@
+"""Throughput and p50/p95/p99 latency for every customers, mechanics,
+service_tickets, inventory and search route against a seeded database.
+
+The database (a SQLite file by default) is seeded through the app factory with
+Core bulk inserts: customers, mechanics, inventory items and tickets linked to
+a skewed set of mechanics and parts, plus spare rows for the DELETE routes.
+Requests go through the Flask test client, or with --url to a server running
+on the same database (e.g. a local gunicorn). Response caching is bypassed
+unless --cache is given, so reads measure the database and serialization.
+
+Results are written as JSON. With --baseline each route is compared with an
+earlier run, and the script exits 1 when a route's p95 grows, or its
+throughput drops, by more than --threshold.
+
+    python benchmarks/endpoints.py --tickets 20000 --output baseline.json
+    python benchmarks/endpoints.py --tickets 20000 --baseline baseline.json
+
+    # against gunicorn: seed, start the server on that file, then run with the
+    # same dataset and --requests/--warmup options
+    python benchmarks/endpoints.py --db /tmp/bench.db --seed-only
+    SQLALCHEMY_DATABASE_URI=sqlite:////tmp/bench.db RATELIMIT_ENABLED=false \\
+        gunicorn -w 4 -b 127.0.0.1:8000 flask_app:app &
+    python benchmarks/endpoints.py --url http://127.0.0.1:8000 --concurrency 8
+"""
+
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import insert
+
+BLUEPRINTS = (
+    "customers_bp",
+    "mechanics_bp",
+    "service_tickets_bp",
+    "inventory_items_bp",
+    "search_bp",
+)
+
+
+# SEEDING
+
+
+def vin(i):
+    return f"1HGCM8263{i:08d}"
+
+
+def batched_insert(table, rows, batch=5000):
+    from app.models import db
+
+    rows = iter(rows)
+    while True:
+        chunk = [row for _, row in zip(range(batch), rows)]
+        if not chunk:
+            return
+        db.session.execute(insert(table), chunk)
+
+
+def id_layout(args):
+    """Id ranges of the seeded rows, shared by the seeding and the scenarios."""
+    spare = args.requests + args.warmup  # rows consumed by each DELETE route
+    return {
+        "customers": args.customers,
+        "mechanics": args.mechanics,
+        "items": args.items,
+        "tickets": args.tickets,
+        "spare": spare,
+        # Never linked by the seed, so edits can add and remove it freely
+        "edit_mechanic": args.mechanics + spare + 1,
+    }
+
+
+def seed(app, args):
+    """Create the schema and bulk-insert the benchmark data."""
+    from app.models import (
+        Customer,
+        InventoryItem,
+        Mechanic,
+        ServiceTicket,
+        db,
+        service_inventory,
+        service_mechanics,
+    )
+    from app.utils.search import rebuild_search_index
+
+    rng = random.Random(args.seed)
+    layout = id_layout(args)
+    spare = layout["spare"]
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        batched_insert(
+            Customer.__table__,
+            (
+                {
+                    "id": i,
+                    "name": f"Customer {i}",
+                    "email": f"customer{i}@example.com",
+                    "phone": "555-0100",
+                    "password": "secret",
+                }
+                for i in range(1, args.customers + spare + 1)
+            ),
+        )
+        batched_insert(
+            Mechanic.__table__,
+            (
+                {
+                    "id": i,
+                    "name": f"Mechanic {i}",
+                    "email": f"mechanic{i}@example.com",
+                    "phone": "555-0200",
+                    "salary": 50000,
+                }
+                for i in range(1, layout["edit_mechanic"] + 1)
+            ),
+        )
+        batched_insert(
+            InventoryItem.__table__,
+            (
+                {"id": i, "name": f"Part {i}", "price": round(5 + i % 200 * 0.5, 2)}
+                for i in range(1, args.items + spare + 1)
+            ),
+        )
+        start = date(2020, 1, 1)
+        batched_insert(
+            ServiceTicket.__table__,
+            (
+                {
+                    "id": i,
+                    "VIN": vin(i),
+                    "service_date": start + timedelta(days=rng.randrange(2000)),
+                    "service_desc": f"Service visit {i}",
+                    # Spare tickets belong to customer 1
+                    "customer_id": (
+                        rng.randint(1, args.customers) if i <= args.tickets else 1
+                    ),
+                }
+                for i in range(1, args.tickets + spare + 1)
+            ),
+        )
+
+        # A few busy mechanics and popular parts get most of the work
+        mechanic_weights = [1 / k for k in range(1, args.mechanics + 1)]
+        item_weights = [1 / k for k in range(1, args.items + 1)]
+
+        # Spare tickets stay unlinked: tickets with mechanics cannot be deleted
+        def links(count, weights, lo, hi):
+            for ticket_id in range(1, args.tickets + 1):
+                picks = rng.choices(range(1, count + 1), weights, k=rng.randint(lo, hi))
+                for linked_id in set(picks):
+                    yield ticket_id, linked_id
+
+        batched_insert(
+            service_mechanics,
+            (
+                {"service_id": t, "mechanic_id": m}
+                for t, m in links(args.mechanics, mechanic_weights, 1, 3)
+            ),
+        )
+        batched_insert(
+            service_inventory,
+            (
+                {"service_id": t, "item_id": p}
+                for t, p in links(args.items, item_weights, 0, 3)
+            ),
+        )
+        db.session.commit()
+        rebuild_search_index()
+        db.session.commit()
+
+
+# SCENARIOS
+
+
+def scenarios(layout):
+    """Request builders per endpoint: ``endpoint -> (method, path(i),
+    json(i) or None, customer id for the token(i) or None, expected status)``."""
+    run = uuid.uuid4().hex[:8]  # keeps created emails unique across runs
+    c, m, p, t = (layout[k] for k in ("customers", "mechanics", "items", "tickets"))
+    spare, edit_mechanic = layout["spare"], layout["edit_mechanic"]
+
+    def customer_body(i):
+        return {
+            "name": f"Bench {i}",
+            "email": f"bench-{run}-{i}@example.com",
+            "phone": "555-0100",
+            "password": "secret",
+        }
+
+    def mechanic_body(i):
+        return {
+            "name": f"Bench {i}",
+            "email": f"bench-{run}-{i}@fixit.com",
+            "phone": "555-0200",
+            "salary": 50000,
+        }
+
+    def ticket_body(i):
+        return {
+            "VIN": vin(i),
+            "service_date": "2025-07-15",
+            "service_desc": "Benchmark visit",
+            "customer_id": i % c + 1,
+        }
+
+    def link_edit(i):
+        key = "remove_mechanic_ids" if i % 2 else "add_mechanic_ids"
+        return {key: [edit_mechanic]}
+
+    return {
+        # customers
+        "customers_bp.login_customer": (
+            "POST",
+            lambda i: "/customers/login",
+            lambda i: {"email": f"customer{i % c + 1}@example.com", "password": "secret"},
+            None,
+            200,
+        ),
+        "customers_bp.create_customer": (
+            "POST", lambda i: "/customers/", customer_body, None, 201
+        ),
+        "customers_bp.bulk_create_customers": (
+            "POST",
+            lambda i: "/customers/bulk",
+            lambda i: [customer_body(f"{i}-{k}") for k in range(10)],
+            None,
+            201,
+        ),
+        "customers_bp.get_all_customers": (
+            "GET", lambda i: "/customers/", None, None, 200
+        ),
+        "customers_bp.update_customer": (
+            "PUT",
+            lambda i: "/customers/",
+            lambda i: {
+                "name": f"Customer {i % c + 1} v{i}",
+                "email": f"customer{i % c + 1}@example.com",
+                "phone": "555-0100",
+                "password": "secret",
+            },
+            lambda i: i % c + 1,
+            200,
+        ),
+        "customers_bp.delete_customer": (
+            "DELETE", lambda i: "/customers/", None, lambda i: c + i + 1, 200
+        ),
+        # mechanics
+        "mechanics_bp.create_mechanic": (
+            "POST", lambda i: "/mechanics/", mechanic_body, None, 201
+        ),
+        "mechanics_bp.bulk_create_mechanics": (
+            "POST",
+            lambda i: "/mechanics/bulk",
+            lambda i: [mechanic_body(f"{i}-{k}") for k in range(10)],
+            None,
+            201,
+        ),
+        "mechanics_bp.get_all_mechanics": (
+            "GET", lambda i: "/mechanics/", None, None, 200
+        ),
+        "mechanics_bp.get_mechanic": (
+            "GET", lambda i: f"/mechanics/{i % m + 1}", None, None, 200
+        ),
+        "mechanics_bp.search_mechanics": (
+            "GET", lambda i: f"/mechanics/search?name=Mechanic {i % m + 1}", None, None, 200
+        ),
+        "mechanics_bp.update_mechanic": (
+            "PUT",
+            lambda i: f"/mechanics/{i % m + 1}",
+            lambda i: {
+                "name": f"Mechanic {i % m + 1} v{i}",
+                "email": f"mechanic{i % m + 1}@example.com",
+                "phone": "555-0200",
+                "salary": 50000 + i,
+            },
+            None,
+            200,
+        ),
+        "mechanics_bp.delete_mechanic": (
+            "DELETE", lambda i: f"/mechanics/{m + i + 1}", None, None, 200
+        ),
+        "mechanics_bp.mechanic_usage": (
+            "GET", lambda i: "/mechanics/usage", None, None, 200
+        ),
+        # service tickets
+        "service_tickets_bp.create_service_ticket": (
+            "POST", lambda i: "/service_tickets/", ticket_body, None, 201
+        ),
+        "service_tickets_bp.bulk_create_service_tickets": (
+            "POST",
+            lambda i: "/service_tickets/bulk",
+            lambda i: [ticket_body(i * 10 + k) for k in range(10)],
+            None,
+            201,
+        ),
+        "service_tickets_bp.get_all_service_tickets": (
+            "GET", lambda i: "/service_tickets/", None, None, 200
+        ),
+        "service_tickets_bp.get_service_ticket": (
+            "GET", lambda i: f"/service_tickets/{i % t + 1}", None, None, 200
+        ),
+        "service_tickets_bp.get_my_tickets": (
+            "GET", lambda i: "/service_tickets/my-tickets", None, lambda i: i % c + 1, 200
+        ),
+        "service_tickets_bp.export_service_tickets": (
+            "GET",
+            lambda i: f"/service_tickets/export?customer_id={i % c + 1}",
+            None,
+            None,
+            200,
+        ),
+        "service_tickets_bp.edit_service_ticket": (
+            "PUT",
+            lambda i: f"/service_tickets/{i // 2 % t + 1}/edit",
+            link_edit,
+            None,
+            200,
+        ),
+        "service_tickets_bp.bulk_edit_service_tickets": (
+            "PUT",
+            lambda i: "/service_tickets/bulk-edit",
+            lambda i: {
+                "ticket_ids": [(i // 2 * 25 + k) % t + 1 for k in range(25)],
+                **link_edit(i),
+            },
+            None,
+            200,
+        ),
+        "service_tickets_bp.delete_service_ticket": (
+            "DELETE", lambda i: f"/service_tickets/{t + i + 1}", None, None, 200
+        ),
+        # inventory
+        "inventory_items_bp.create_inventory_item": (
+            "POST",
+            lambda i: "/inventory/",
+            lambda i: {"name": f"Bench part {run}-{i}", "price": 9.99},
+            None,
+            201,
+        ),
+        "inventory_items_bp.bulk_create_inventory_items": (
+            "POST",
+            lambda i: "/inventory/bulk",
+            lambda i: [{"name": f"Bench part {run}-{i}-{k}", "price": 9.99} for k in range(10)],
+            None,
+            201,
+        ),
+        "inventory_items_bp.get_all_inventory_items": (
+            "GET", lambda i: "/inventory/", None, None, 200
+        ),
+        "inventory_items_bp.get_inventory_item": (
+            "GET", lambda i: f"/inventory/{i % p + 1}", None, None, 200
+        ),
+        "inventory_items_bp.update_inventory_item": (
+            "PUT",
+            lambda i: f"/inventory/{i % p + 1}",
+            lambda i: {"name": f"Part {i % p + 1}", "price": round(5 + i % 100 * 0.01, 2)},
+            None,
+            200,
+        ),
+        "inventory_items_bp.delete_inventory_item": (
+            "DELETE", lambda i: f"/inventory/{p + i + 1}", None, None, 200
+        ),
+        # search
+        "search_bp.search": (
+            "GET", lambda i: f"/search/?q=mechanic {i % m + 1}", None, None, 200
+        ),
+    }  # fmt: skip
+
+
+# CLIENTS
+
+
+class TestClientTransport:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body, headers):
+        # Some views print progress; keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = self.client.open(path, method=method, json=body, headers=headers)
+            response.get_data()  # drain streamed bodies (export)
+        return response.status_code
+
+
+class HTTPTransport:
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+
+    def request(self, method, path, body, headers):
+        headers = dict(headers)
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        self.connection.request(method, path.replace(" ", "%20"), payload, headers)
+        response = self.connection.getresponse()
+        response.read()
+        return response.status
+
+
+def percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_scenario(make_transport, scenario, args):
+    from app.utils.util import encode_token
+
+    method, path, body, auth, expected = scenario
+    tokens = {}
+
+    def one(transport, i):
+        headers = {}
+        if auth is not None:
+            customer_id = auth(i)
+            if customer_id not in tokens:
+                tokens[customer_id] = encode_token(customer_id)
+            headers["Authorization"] = f"Bearer {tokens[customer_id]}"
+        url = path(i)
+        if method == "GET" and not args.cache:
+            url += ("&" if "?" in url else "?") + f"_nocache={uuid.uuid4().hex}"
+        started = time.perf_counter()
+        status = transport.request(method, url, body(i) if body else None, headers)
+        return time.perf_counter() - started, status == expected
+
+    transport = make_transport()
+    for i in range(args.warmup):
+        one(transport, i)
+
+    def worker(indexes):
+        transport = make_transport()
+        return [one(transport, i) for i in indexes]
+
+    indexes = list(range(args.warmup, args.warmup + args.requests))
+    shards = [indexes[k :: args.concurrency] for k in range(args.concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = [r for shard in pool.map(worker, shards) for r in shard]
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    return {
+        "method": method,
+        "requests": len(results),
+        "errors": sum(not ok for _, ok in results),
+        "throughput_rps": round(len(results) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return the routes that regressed against ``baseline``."""
+    regressions = []
+    for endpoint, current in results["routes"].items():
+        before = baseline["routes"].get(endpoint)
+        if before is None:
+            continue
+        slower = current["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0
+        fewer = (
+            1 - current["throughput_rps"] / before["throughput_rps"]
+            if before["throughput_rps"]
+            else 0
+        )
+        flag = "REGRESSED" if slower > threshold or fewer > threshold else "ok"
+        print(
+            f"{endpoint:<50} p95 {before['p95_ms']:>8.2f} -> {current['p95_ms']:>8.2f} ms "
+            f"({slower:+.0%})   rps {before['throughput_rps']:>8.1f} -> "
+            f"{current['throughput_rps']:>8.1f} ({-fewer:+.0%})   {flag}"
+        )
+        if flag != "ok":
+            regressions.append(endpoint)
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--mechanics", type=int, default=200)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=200, help="per route")
+    parser.add_argument("--warmup", type=int, default=20, help="per route, untimed")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="SQLite file (default: a temporary file)")
+    parser.add_argument(
+        "--url", help="benchmark a running server (seeded with --seed-only)"
+    )
+    parser.add_argument("--seed-only", action="store_true")
+    parser.add_argument("--cache", action="store_true", help="keep response caching")
+    parser.add_argument("--routes", nargs="*", help="endpoint name substrings")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.abspath(db_path)}"
+
+    from app import create_app
+    from app.extensions import cache, limiter
+
+    app = create_app("ProductionConfig")
+    app.logger.setLevel(logging.ERROR)  # N+1 warnings on the bulk routes
+    limiter.enabled = False
+    if not args.cache:
+        cache.init_app(app, config={"CACHE_TYPE": "NullCache"})
+
+    # A running server already has its data (seeded earlier with --seed-only)
+    if not args.url:
+        started = time.perf_counter()
+        seed(app, args)
+        print(f"seeded {db_path} in {time.perf_counter() - started:.1f}s")
+        if args.seed_only:
+            return
+
+    plan = scenarios(id_layout(args))
+    endpoints = sorted(
+        rule.endpoint
+        for rule in app.url_map.iter_rules()
+        if rule.endpoint.split(".")[0] in BLUEPRINTS
+    )
+    missing = [endpoint for endpoint in endpoints if endpoint not in plan]
+    if missing:
+        sys.exit(f"no scenario for: {', '.join(missing)}")
+    if args.routes:
+        endpoints = [e for e in endpoints if any(r in e for r in args.routes)]
+
+    if args.url:
+        make_transport = lambda: HTTPTransport(args.url)  # noqa: E731
+    else:
+        make_transport = lambda: TestClientTransport(app)  # noqa: E731
+
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "target": args.url or "test-client",
+            "cache": args.cache,
+            "concurrency": args.concurrency,
+            "dataset": {
+                k: getattr(args, k)
+                for k in ("customers", "mechanics", "items", "tickets", "seed")
+            },
+        },
+        "routes": {},
+    }
+    for endpoint in endpoints:
+        stats = run_scenario(make_transport, plan[endpoint], args)
+        results["routes"][endpoint] = stats
+        print(
+            f"{endpoint:<50} {stats['throughput_rps']:>8.1f} req/s   "
+            f"p50 {stats['p50_ms']:>7.2f}  p95 {stats['p95_ms']:>7.2f}  "
+            f"p99 {stats['p99_ms']:>7.2f} ms"
+            + (f"   {stats['errors']} errors" if stats["errors"] else "")
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["meta"]["dataset"] != results["meta"]["dataset"]:
+            print("warning: baseline was seeded with a different dataset")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            sys.exit(
+                f"{len(regressions)} route(s) regressed by more than {args.threshold:.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
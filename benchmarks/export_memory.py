@@ -0,0 +1,91 @@
+"""Check that GET /service_tickets/export streams with flat memory: peak Python
+allocations while consuming the response should not grow with ticket count.
+
+    python benchmarks/export_memory.py --tickets 10000 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import insert
+from app import create_app
+from app.models import db, Customer, Mechanic, ServiceTicket, service_mechanics
+
+
+def seed(tickets):
+    db.session.execute(
+        insert(Customer),
+        [
+            {"name": "C", "email": f"c{i}@example.com", "phone": "5", "password": "x"}
+            for i in range(1, 101)
+        ],
+    )
+    db.session.execute(
+        insert(Mechanic),
+        [
+            {"name": f"M{i}", "email": f"m{i}@example.com", "phone": "5", "salary": 1}
+            for i in range(1, 21)
+        ],
+    )
+    start = date(2020, 1, 1)
+    for offset in range(0, tickets, 10_000):
+        ids = range(offset + 1, min(offset + 10_000, tickets) + 1)
+        db.session.execute(
+            insert(ServiceTicket),
+            [
+                {
+                    "id": i,
+                    "VIN": f"VIN{i:014d}",
+                    "service_date": start + timedelta(days=i % 2000),
+                    "service_desc": "Routine service",
+                    "customer_id": i % 100 + 1,
+                }
+                for i in ids
+            ],
+        )
+        db.session.execute(
+            insert(service_mechanics),
+            [{"service_id": i, "mechanic_id": i % 20 + 1} for i in ids],
+        )
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--format", default="ndjson", choices=["ndjson", "csv"])
+    args = parser.parse_args()
+
+    app = create_app("TestingConfig")
+    for tickets in args.tickets:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            seed(tickets)
+            client = app.test_client()
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            res = client.get(
+                f"/service_tickets/export?format={args.format}", buffered=False
+            )
+            size = sum(len(chunk) for chunk in res.response)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            res.close()
+
+        print(
+            f"{tickets:>10} tickets  {size / 1e6:>8.1f} MB out  "
+            f"{elapsed:>6.2f}s  peak Python memory {peak / 1e6:>6.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Requests per second per core for each gunicorn profile in gunicorn.conf.py
+(sync and gthread workers, preloaded), against one seeded SQLite file.
+
+Each profile starts gunicorn with its GUNICORN_* environment and the shipped
+config (workers from the core count unless --workers is given), then drives
+the read routes below and a write route with the endpoints.py scenarios at
+--concurrency clients. Workers are recycled by max_requests during the run,
+as in production. Response caching is bypassed unless --cache is given.
+Throughput is divided by the cores this process may run on, so runs on
+different machines can be compared.
+
+    python benchmarks/gunicorn_profiles.py --concurrency 16
+    python benchmarks/gunicorn_profiles.py --profiles gthread --threads 8 --output gthread.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from async_reads import wait_until_up
+from endpoints import HTTPTransport, id_layout, run_scenario, scenarios, seed
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+PROFILES = {
+    "sync": {"GUNICORN_WORKER_CLASS": "sync"},
+    "gthread": {"GUNICORN_WORKER_CLASS": "gthread"},
+}
+
+ROUTES = [
+    "mechanics_bp.get_all_mechanics",
+    "service_tickets_bp.get_all_service_tickets",
+    "service_tickets_bp.get_service_ticket",
+    "inventory_items_bp.get_all_inventory_items",
+    "search_bp.search",
+    "mechanics_bp.update_mechanic",
+]
+
+
+class ReconnectingTransport(HTTPTransport):
+    """Reconnects and retries once when a recycled worker (max_requests)
+    closes a kept-alive connection, as a load balancer would."""
+
+    def request(self, method, path, body, headers):
+        try:
+            return super().request(method, path, body, headers)
+        except (ConnectionError, http.client.RemoteDisconnected):
+            self.connection.close()
+            return super().request(method, path, body, headers)
+
+
+def usable_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--mechanics", type=int, default=200)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--profiles", nargs="+", choices=PROFILES, default=list(PROFILES)
+    )
+    parser.add_argument("--workers", type=int, help="default: gunicorn.conf.py")
+    parser.add_argument("--threads", type=int, help="gthread threads per worker")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="per route")
+    parser.add_argument("--warmup", type=int, default=50, help="per route, untimed")
+    parser.add_argument("--cache", action="store_true", help="keep response caching")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    uri = f"sqlite:///{db_path}"
+    os.environ["SQLALCHEMY_DATABASE_URI"] = uri
+
+    from app import create_app
+
+    app = create_app("ProductionConfig")
+    started = time.perf_counter()
+    seed(app, args)
+    print(f"seeded {db_path} in {time.perf_counter() - started:.1f}s")
+
+    cores = usable_cores()
+    plan = scenarios(id_layout(args))
+    results = {}
+    for name in args.profiles:
+        env = {
+            **os.environ,
+            **PROFILES[name],
+            "SQLALCHEMY_DATABASE_URI": uri,
+            "RATELIMIT_ENABLED": "false",
+        }
+        if args.workers:
+            env["WEB_CONCURRENCY"] = str(args.workers)
+        if args.threads:
+            env["GUNICORN_THREADS"] = str(args.threads)
+        server = subprocess.Popen(
+            ["gunicorn", f"--bind=127.0.0.1:{args.port}", "flask_app:app"],
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_up(args.port)
+            url = f"http://127.0.0.1:{args.port}"
+            routes = {}
+            for endpoint in ROUTES:
+                stats = run_scenario(
+                    lambda: ReconnectingTransport(url), plan[endpoint], args
+                )
+                stats["rps_per_core"] = round(stats["throughput_rps"] / cores, 1)
+                routes[endpoint] = stats
+                print(
+                    f"{name:<8} {endpoint:<45} {stats['throughput_rps']:>8.1f} req/s"
+                    f"   {stats['rps_per_core']:>8.1f} req/s/core"
+                    f"   p95 {stats['p95_ms']:>7.2f} ms"
+                    + (f"   {stats['errors']} errors" if stats["errors"] else "")
+                )
+        finally:
+            server.terminate()
+            server.wait()
+        total = sum(s["requests"] for s in routes.values())
+        seconds = sum(s["requests"] / s["throughput_rps"] for s in routes.values())
+        results[name] = {
+            "routes": routes,
+            "rps_per_core": round(total / seconds / cores, 1),
+        }
+
+    print(f"\n{cores} core(s), {args.concurrency} clients")
+    for name, result in results.items():
+        print(f"{name:<8} {result['rps_per_core']:>8.1f} req/s/core over all routes")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"cores": cores, "concurrency": args.concurrency, "profiles": results},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
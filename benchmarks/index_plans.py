@@ -0,0 +1,207 @@
+"""Compare query plans and timings for the ticket lookups before and after the
+model-level indexes (composite PKs on the link tables, reverse-direction
+indexes, customer/date/VIN indexes on service_tickets).
+
+Builds two SQLite files with identical seeded data: one with the original
+unindexed schema, one created from ``app.models``.
+
+    python benchmarks/index_plans.py --tickets 1000000
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+from app.models import Base
+
+# Schema as it was before the indexes were added
+BEFORE_DDL = [
+    """CREATE TABLE customers (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL,
+    email VARCHAR(250) NOT NULL UNIQUE, phone VARCHAR(15) NOT NULL,
+    password VARCHAR(255) NOT NULL)""",
+    """CREATE TABLE mechanics (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL,
+    email VARCHAR(250) NOT NULL UNIQUE, phone VARCHAR(15) NOT NULL,
+    salary NUMERIC(10, 2) NOT NULL)""",
+    """CREATE TABLE inventory_items (id INTEGER PRIMARY KEY,
+    name VARCHAR(255) NOT NULL, price FLOAT NOT NULL)""",
+    """CREATE TABLE service_tickets (id INTEGER PRIMARY KEY, "VIN" VARCHAR(17) NOT NULL,
+    service_date DATE NOT NULL, service_desc VARCHAR(500) NOT NULL,
+    customer_id INTEGER NOT NULL REFERENCES customers (id))""",
+    """CREATE TABLE service_mechanics (service_id INTEGER REFERENCES service_tickets (id),
+    mechanic_id INTEGER REFERENCES mechanics (id))""",
+    """CREATE TABLE service_inventory (service_id INTEGER REFERENCES service_tickets (id),
+    item_id INTEGER REFERENCES inventory_items (id))""",
+]
+
+QUERIES = {
+    "my_tickets_page": (
+        'SELECT id, "VIN", service_date, service_desc, customer_id FROM service_tickets '
+        "WHERE customer_id = :customer_id ORDER BY service_date, id LIMIT 26"
+    ),
+    "ticket_list_deep_page": (
+        'SELECT id, "VIN", service_date, service_desc, customer_id FROM service_tickets '
+        "WHERE (service_date, id) > (:service_date, :ticket_id) "
+        "ORDER BY service_date, id LIMIT 26"
+    ),
+    "selectin_mechanics_join": (
+        "SELECT service_mechanics.service_id, mechanics.id, mechanics.name "
+        "FROM mechanics JOIN service_mechanics "
+        "ON mechanics.id = service_mechanics.mechanic_id "
+        "WHERE service_mechanics.service_id IN (:t1, :t2, :t3, :t4, :t5)"
+    ),
+    "selectin_inventory_join": (
+        "SELECT service_inventory.service_id, inventory_items.id, inventory_items.name "
+        "FROM inventory_items JOIN service_inventory "
+        "ON inventory_items.id = service_inventory.item_id "
+        "WHERE service_inventory.service_id IN (:t1, :t2, :t3, :t4, :t5)"
+    ),
+    "mechanic_membership": (
+        "SELECT 1 FROM service_mechanics "
+        "WHERE service_id = :ticket_id AND mechanic_id = :mechanic_id"
+    ),
+    "tickets_for_mechanic": (
+        "SELECT service_id FROM service_mechanics WHERE mechanic_id = :mechanic_id"
+    ),
+    "vin_lookup": 'SELECT id FROM service_tickets WHERE "VIN" = :vin',
+    "delete_ticket_links": (
+        "SELECT count(*) FROM service_inventory WHERE service_id = :ticket_id"
+    ),
+}
+
+
+def after_ddl():
+    dialect = sqlite.dialect()
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(dialect=dialect)))
+        for index in table.indexes:
+            statements.append(str(CreateIndex(index).compile(dialect=dialect)))
+    return statements
+
+
+def seed(conn, args):
+    rng = random.Random(args.seed)
+    conn.executemany(
+        "INSERT INTO customers (id, name, email, phone, password) VALUES (?, ?, ?, ?, ?)",
+        (
+            (i, f"Customer {i}", f"c{i}@example.com", "555-0000", "x")
+            for i in range(1, args.customers + 1)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO mechanics (id, name, email, phone, salary) VALUES (?, ?, ?, ?, ?)",
+        (
+            (i, f"Mechanic {i}", f"m{i}@example.com", "555-0000", 50000)
+            for i in range(1, args.mechanics + 1)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO inventory_items (id, name, price) VALUES (?, ?, ?)",
+        ((i, f"Part {i}", 9.99) for i in range(1, args.items + 1)),
+    )
+
+    start = date(2020, 1, 1)
+
+    def tickets():
+        for i in range(1, args.tickets + 1):
+            yield (
+                i,
+                f"VIN{i:014d}",
+                (start + timedelta(days=rng.randrange(2000))).isoformat(),
+                "Routine service",
+                rng.randint(1, args.customers),
+            )
+
+    def links(count):
+        for ticket_id in range(1, args.tickets + 1):
+            for other_id in rng.sample(range(1, count + 1), 2):
+                yield ticket_id, other_id
+
+    conn.executemany(
+        'INSERT INTO service_tickets (id, "VIN", service_date, service_desc, '
+        "customer_id) VALUES (?, ?, ?, ?, ?)",
+        tickets(),
+    )
+    conn.executemany(
+        "INSERT INTO service_mechanics VALUES (?, ?)", links(args.mechanics)
+    )
+    conn.executemany("INSERT INTO service_inventory VALUES (?, ?)", links(args.items))
+    conn.commit()
+    conn.execute("ANALYZE")
+
+
+def build(path, ddl, args):
+    conn = sqlite3.connect(path)
+    for statement in ddl:
+        conn.execute(statement)
+    seed(conn, args)
+    return conn
+
+
+def measure(conn, sql, params, repeat):
+    plan = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"plan": plan, "median_ms": round(statistics.median(timings), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int, default=50_000)
+    parser.add_argument("--mechanics", type=int, default=200)
+    parser.add_argument("--items", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    mid = args.tickets // 2
+    params = {
+        "customer_id": args.customers // 2,
+        "service_date": "2022-06-01",
+        "ticket_id": mid,
+        "mechanic_id": 1,
+        "vin": f"VIN{mid:014d}",
+        **{f"t{n}": mid + n for n in range(1, 6)},
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, ddl in [("before", BEFORE_DDL), ("after", after_ddl())]:
+            started = time.perf_counter()
+            conn = build(os.path.join(tmp, f"{label}.db"), ddl, args)
+            print(f"seeded {label} schema in {time.perf_counter() - started:.1f}s")
+            results[label] = {
+                name: measure(conn, sql, params, args.repeat)
+                for name, sql in QUERIES.items()
+            }
+            conn.close()
+
+    for name in QUERIES:
+        before, after = results["before"][name], results["after"][name]
+        print(f"\n{name}: {before['median_ms']} ms -> {after['median_ms']} ms")
+        print("  before: " + " | ".join(before["plan"]))
+        print("  after:  " + " | ".join(after["plan"]))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
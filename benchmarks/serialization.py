@@ -0,0 +1,96 @@
+"""Compare the marshmallow + stdlib json path with the compiled dump functions
+(and orjson, when installed) on service ticket pages of 1k/10k/100k rows.
+
+Rows are transient model instances with two mechanics and two parts each, so
+only serialization is timed. Every path's bytes are checked against the
+baseline before timing.
+
+    python benchmarks/serialization.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import jsonify
+from app import create_app
+from app.models import InventoryItem, Mechanic, ServiceTicket
+from app.blueprints.service_tickets.schemas import service_tickets_schema
+from app.utils.serialization import FastJSONProvider, dump, orjson
+
+
+def build_tickets(count):
+    mechanics = [
+        Mechanic(id=i, name=f"Mechanic {i}", email=f"m{i}@example.com", salary=5e4)
+        for i in range(50)
+    ]
+    items = [InventoryItem(id=i, name=f"Part {i}", price=9.99 + i) for i in range(50)]
+    return [
+        ServiceTicket(
+            id=i,
+            VIN=f"1HGCM82633A{i:06d}",
+            service_date=date(2025, 1, 1) + timedelta(days=i % 365),
+            service_desc=f"Service visit {i}",
+            customer_id=i % 1000,
+            mechanics=[mechanics[i % 50], mechanics[(i + 1) % 50]],
+            inventory_items=[items[i % 50], items[(i + 7) % 50]],
+        )
+        for i in range(count)
+    ]
+
+
+def timed(render, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = render()
+        best = min(best, time.perf_counter() - started)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_app("TestingConfig")
+    app.debug = False  # compact JSON, as in production
+    stdlib_json = app.json
+    fast_json = FastJSONProvider(app) if orjson is not None else None
+
+    paths = {
+        "marshmallow + json": (False, stdlib_json),
+        "compiled + json": (True, stdlib_json),
+    }
+    if fast_json:
+        paths["compiled + orjson"] = (True, fast_json)
+
+    with app.test_request_context():
+        for size in args.sizes:
+            tickets = build_tickets(size)
+            print(f"\n{size} rows")
+            baseline = None
+            for label, (compiled, provider) in paths.items():
+                app.config["FAST_SERIALIZER"] = compiled
+                app.json = provider
+
+                def render():
+                    payload = {"items": dump(service_tickets_schema, tickets)}
+                    return jsonify(payload).get_data()
+
+                seconds, body = timed(render, args.repeat)
+                baseline = baseline or (seconds, body)
+                assert body == baseline[1], f"{label} output differs"
+                print(
+                    f"  {label:<20} {seconds * 1000:>9.1f} ms"
+                    f"   {baseline[0] / seconds:>5.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Cold-start latency of the production entry point (flask_app.py): import,
+create_app, schema bootstrap and first request, each measured in a fresh
+interpreter.
+
+Every run boots flask_app in a new process and serves one request to
+--route, then a second one for comparison. "fresh" runs start from an empty
+SQLite file (the schema is created), "existing" runs from one that already
+has it. --workers N also boots N processes at once against one empty file
+and checks that exactly one of them created the schema. --top lists the
+slowest imports under `app` (python -X importtime).
+
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --workers 8 --top 15 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+BOOT = """
+import json, time
+import flask_app
+client = flask_app.app.test_client()
+client.get({route!r})
+started = time.perf_counter()
+client.get({route!r})
+phases = dict(flask_app.app.extensions["startup"])
+phases["second_request"] = time.perf_counter() - started
+print("RESULT " + json.dumps({{"phases": phases, "created": flask_app.schema_created}}))
+"""
+
+
+def boot(uri, route):
+    """Start a boot process; returns (process, start time)."""
+    env = {**os.environ, "SQLALCHEMY_DATABASE_URI": uri, "RATELIMIT_ENABLED": "false"}
+    process = subprocess.Popen(
+        [sys.executable, "-c", BOOT.format(route=route)],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    return process, time.perf_counter()
+
+
+def result(process, started):
+    stdout, stderr = process.communicate()
+    elapsed = time.perf_counter() - started
+    if process.returncode:
+        raise RuntimeError(f"boot failed:\n{stdout}{stderr}")
+    line = next(line for line in stdout.splitlines() if line.startswith("RESULT "))
+    data = json.loads(line[len("RESULT ") :])
+    data["phases"]["process_to_first_response"] = elapsed
+    return data
+
+
+def summarize(runs):
+    phases = runs[0]["phases"]
+    return {
+        phase: {
+            "median_ms": statistics.median(r["phases"][phase] for r in runs) * 1000,
+            "max_ms": max(r["phases"][phase] for r in runs) * 1000,
+        }
+        for phase in phases
+    }
+
+
+def slowest_imports(top):
+    """Modules imported directly by `app` with their cumulative import time."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    rows = []
+    for line in output.splitlines():
+        _, cumulative, name = line.split("|")
+        # " app" is the package itself; its direct imports are indented once more
+        if name.startswith("   ") and not name.startswith("    "):
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="boots per scenario")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent boots")
+    parser.add_argument("--route", default="/mechanics/")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports shown")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    results = {}
+
+    fresh = []
+    for i in range(args.runs):
+        uri = f"sqlite:///{os.path.join(directory, f'fresh{i}.db')}"
+        fresh.append(result(*boot(uri, args.route)))
+    results["fresh"] = summarize(fresh)
+
+    existing_uri = f"sqlite:///{os.path.join(directory, 'fresh0.db')}"
+    existing = [result(*boot(existing_uri, args.route)) for _ in range(args.runs)]
+    assert not any(run["created"] for run in existing)
+    results["existing"] = summarize(existing)
+
+    shared_uri = f"sqlite:///{os.path.join(directory, 'shared.db')}"
+    started = [boot(shared_uri, args.route) for _ in range(args.workers)]
+    concurrent = [result(*process) for process in started]
+    creators = sum(run["created"] for run in concurrent)
+    results["concurrent"] = {**summarize(concurrent), "creators": creators}
+
+    for scenario in ("fresh", "existing", "concurrent"):
+        boots = args.workers if scenario == "concurrent" else args.runs
+        print(f"{scenario} ({boots} boots)")
+        for phase, stats in results[scenario].items():
+            if phase != "creators":
+                print(
+                    f"  {phase:<27} median {stats['median_ms']:>8.1f} ms"
+                    f"   max {stats['max_ms']:>8.1f} ms"
+                )
+    print(f"\nconcurrent boots that created the schema: {creators} (expected 1)")
+
+    if args.top:
+        results["slowest_imports"] = slowest_imports(args.top)
+        print("\nslowest imports of `app` (cumulative):")
+        for us, name in results["slowest_imports"]:
+            print(f"  {us / 1000:>8.1f} ms  {name}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
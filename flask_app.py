@@ -1,17 +1,33 @@
+import time
+
+started = time.perf_counter()
+
 import os
 import sys
 from app import create_app
-from app.models import db
+from app.utils.startup import bootstrap_schema, record_phase
 
 try:
+    import_seconds = time.perf_counter() - started
     app = create_app("ProductionConfig")
+    record_phase(app, "import", import_seconds)
     print(
         f"✅ App created with config: {app.config.get('SQLALCHEMY_DATABASE_URI', 'No DB URI')}"
     )
 
-    with app.app_context():
-        db.create_all()
-        print("✅ Database tables created")
+    # Every worker runs this; only the first to take the lock creates tables
+    schema_created = bootstrap_schema(app)
+    print(
+        "✅ Database schema created/upgraded"
+        if schema_created
+        else "✅ Database schema ready"
+    )
+
+    phases = app.extensions["startup"]
+    print(
+        f"⏱️  Startup: import {phases['import']:.2f}s, create_app "
+        f"{phases['create_app']:.2f}s, schema {phases['schema_bootstrap']:.2f}s"
+    )
 
 except Exception as e:
     print(f"❌ Error during app setup: {e}")
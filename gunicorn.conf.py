@@ -0,0 +1,76 @@
+"""Gunicorn settings for ``gunicorn flask_app:app`` (gunicorn reads this file
+from the working directory), tuned through the environment:
+
+    GUNICORN_WORKER_CLASS         sync or gthread (default gthread)
+    WEB_CONCURRENCY               worker processes (default: 2 x cores + 1 for
+                                  sync, cores + 1 for gthread)
+    GUNICORN_THREADS              threads per gthread worker (default 4)
+    GUNICORN_PRELOAD              import the app once in the master (default true)
+    GUNICORN_MAX_REQUESTS         recycle a worker after this many requests
+                                  (default 1000; 0 never recycles)
+    GUNICORN_MAX_REQUESTS_JITTER  up to this many more, per worker (default 10%)
+    GUNICORN_WARMUP_PATHS         comma-separated GETs each worker serves to
+                                  itself before taking traffic
+
+See app/utils/workers.py for what the hooks do.
+"""
+
+import os
+from config import env_flag
+
+cores = os.cpu_count() or 1
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 4 if worker_class == "gthread" else 1))
+workers = int(
+    os.environ.get(
+        "WEB_CONCURRENCY", cores + 1 if worker_class == "gthread" else 2 * cores + 1
+    )
+)
+
+# One import, schema bootstrap and schema compile in the master; workers fork
+# from it with everything loaded
+preload_app = env_flag("GUNICORN_PRELOAD", True)
+
+# Recycling workers bounds slow memory growth; the jitter keeps them from all
+# restarting at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(
+    os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10)
+)
+
+warmup_paths = [
+    path.strip()
+    for path in os.environ.get(
+        "GUNICORN_WARMUP_PATHS", "/mechanics/,/inventory/,/service_tickets/"
+    ).split(",")
+    if path.strip()
+]
+
+
+# Hooks import the app lazily: this file is read before the app is loaded
+def when_ready(server):
+    if server.app.callable is not None:  # preloaded: workers inherit these
+        from app.utils.serialization import precompile_schemas
+
+        precompile_schemas()
+
+
+def post_fork(server, worker):
+    if server.app.callable is not None:
+        from app.utils.workers import dispose_engines
+
+        dispose_engines(server.app.callable)
+
+
+def post_worker_init(worker):
+    from app.utils.workers import warm_up
+
+    statuses = warm_up(worker.wsgi, warmup_paths)
+    worker.log.info("Worker %s warmed up: %s", worker.pid, statuses)
+
+
+def worker_exit(server, worker):
+    from app.utils.workers import shut_down
+
+    shut_down()
@@ -1,4 +1,3 @@
-from pdb import run
 from app import create_app
 app = create_app("DevelopmentConfig")
 
@@ -0,0 +1,159 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+pytest.importorskip("aiosqlite")
+import asyncio
+import httpx
+from sqlalchemy import event
+from starlette.testclient import TestClient
+import config
+from app import create_app
+from app.asgi import AsyncReadApp, async_database_uri
+from app.extensions import cache
+from app.models import db
+from app.utils.search import rebuild_search_index
+
+
+@pytest.fixture
+def apps(tmp_path, monkeypatch):
+    # Both engines need to see the same database, so no :memory: here
+    monkeypatch.setattr(
+        config.TestingConfig,
+        "SQLALCHEMY_DATABASE_URI",
+        f"sqlite:///{tmp_path / 'shop.db'}",
+    )
+    app = create_app("TestingConfig")
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        asgi = AsyncReadApp(app)
+        statements = []
+        event.listen(
+            asgi.engine.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        with TestClient(asgi) as asgi_client:
+            yield app.test_client(), asgi_client, asgi, statements
+        db.session.remove()
+
+
+def seed(client):
+    customer = client.post(
+        "/customers/",
+        json={"name": "Ann", "email": "ann@test.com", "phone": "555", "password": "pw"},
+    ).json["id"]
+    mechanic = client.post(
+        "/mechanics/",
+        json={"name": "Bob", "email": "bob@test.com", "phone": "555", "salary": 1},
+    ).json["id"]
+    item = client.post("/inventory/", json={"name": "Filter", "price": 9.5}).json["id"]
+    for n in range(3):
+        ticket = client.post(
+            "/service_tickets/",
+            json={
+                "VIN": f"1HGCM82633A00440{n}",
+                "service_date": f"2025-07-1{n}",
+                "service_desc": "Oil change",
+                "customer_id": customer,
+            },
+        ).json["id"]
+        client.put(
+            f"/service_tickets/{ticket}/edit",
+            json={"add_mechanic_ids": [mechanic], "add_item_ids": [item]},
+        )
+    rebuild_search_index()
+    login = client.post("/customers/login", json={"email": "ann@test.com", "password": "pw"})
+    return {"Authorization": f"Bearer {login.json['auth_token']}"}
+
+
+def test_async_engine_uri():
+    assert async_database_uri("sqlite:////tmp/shop.db") == "sqlite+aiosqlite:////tmp/shop.db"
+    assert (
+        async_database_uri("postgresql+pg8000://u:pw@db/shop")
+        == "postgresql+asyncpg://u:pw@db/shop"
+    )
+    assert (
+        async_database_uri("mysql+mysqlconnector://u:pw@db/shop")
+        == "mysql+aiomysql://u:pw@db/shop"
+    )
+
+
+@pytest.mark.parametrize(
+    "url, auth",
+    [
+        ("/service_tickets/", False),
+        ("/service_tickets/?limit=2", False),
+        ("/service_tickets/?fields=id,VIN,mechanics", False),
+        ("/service_tickets/?limit=0", False),
+        ("/service_tickets/my-tickets", True),
+        ("/service_tickets/my-tickets", False),
+        ("/inventory/", False),
+        ("/inventory/?fields=name", False),
+        ("/search/?q=bob", False),
+        ("/search/?q=ann&type=customer", False),
+        ("/search/?q=x&type=bogus", False),
+    ],
+)
+def test_async_reads_match_flask(apps, url, auth):
+    client, asgi_client, _, statements = apps
+    auth_headers = seed(client)
+    headers = auth_headers if auth else {}
+    cache.clear()
+
+    # Async path first so it runs the queries rather than reading the cache
+    async_res = asgi_client.get(url, headers=headers)
+    cache.clear()
+    sync_res = client.get(url, headers=headers)
+
+    assert async_res.status_code == sync_res.status_code
+    assert async_res.content == sync_res.data
+    assert async_res.headers.get("ETag") == sync_res.headers.get("ETag")
+    assert async_res.headers["Content-Type"] == sync_res.headers["Content-Type"]
+    if async_res.status_code == 200:
+        assert statements  # served from the async engine
+
+
+def test_async_reads_support_conditional_requests(apps):
+    client, asgi_client, _, _ = apps
+    seed(client)
+    etag = asgi_client.get("/service_tickets/").headers["ETag"]
+    res = asgi_client.get("/service_tickets/", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
+
+
+def test_other_routes_use_the_sync_engine(apps):
+    client, asgi_client, _, statements = apps
+    seed(client)
+    statements.clear()
+
+    res = asgi_client.post("/inventory/", json={"name": "Wiper", "price": 12.0})
+    assert res.status_code == 201
+    assert asgi_client.get(f"/inventory/{res.json()['id']}").json()["name"] == "Wiper"
+    redirect = asgi_client.get("/service_tickets", follow_redirects=False)
+    assert redirect.status_code == 308  # slash redirect
+    assert statements == []
+
+    # The write invalidated the catalog for the async path too
+    assert "Wiper" in [i["name"] for i in asgi_client.get("/inventory/").json()["items"]]
+
+
+def test_concurrent_async_reads_count_their_own_queries(apps):
+    client, _, asgi, _ = apps
+    seed(client)
+    cache.clear()
+
+    async def fetch_all():
+        transport = httpx.ASGITransport(app=asgi)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            # Distinct limits so every request misses the response cache
+            return await asyncio.gather(
+                *(c.get(f"/service_tickets/?limit={n}") for n in range(1, 11))
+            )
+
+    responses = asyncio.run(fetch_all())
+    assert all(res.status_code == 200 for res in responses)
+    # tickets + mechanics + inventory items each, not the sum of all requests
+    assert {res.headers["X-Query-Count"] for res in responses} == {"3"}
@@ -0,0 +1,142 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app import create_app
+from app.models import db
+from app.utils.query_tracker import track_queries
+
+
+@pytest.fixture
+def client():
+    app = create_app("TestingConfig")
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app.test_client()
+
+
+def count_queries(client, url, **kwargs):
+    with track_queries() as log:
+        res = client.get(url, **kwargs)
+    assert res.status_code == 200
+    return res, log.count
+
+
+def create_part(client, name="Brake Pads"):
+    res = client.post("/inventory/", json={"name": name, "price": 49.99})
+    assert res.status_code == 201
+    return res.json["id"]
+
+
+# CACHE HITS
+def test_repeated_get_is_served_from_cache(client):
+    create_part(client)
+    first, first_count = count_queries(client, "/inventory/?limit=5&cursor=")
+    second, second_count = count_queries(client, "/inventory/?cursor=&limit=5")
+    assert first_count > 0
+    assert second_count == 0  # normalized args hit the same entry
+    assert first.json == second.json
+
+    stats = client.get("/cache/stats").json
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+# INVALIDATION
+def test_write_invalidates_list_and_single_entries(client):
+    part_id = create_part(client)
+    client.get("/inventory/")
+    client.get(f"/inventory/{part_id}")
+
+    client.put(f"/inventory/{part_id}", json={"name": "Rotors", "price": 80.0})
+    assert client.get("/inventory/").json["items"][0]["name"] == "Rotors"
+    assert client.get(f"/inventory/{part_id}").json["name"] == "Rotors"
+
+
+def test_write_leaves_unrelated_entries_cached(client):
+    first_id = create_part(client, "Brake Pads")
+    second_id = create_part(client, "Oil Filter")
+    client.get(f"/inventory/{first_id}")
+
+    client.put(f"/inventory/{second_id}", json={"name": "Air Filter", "price": 9.0})
+    _, query_count = count_queries(client, f"/inventory/{first_id}")
+    assert query_count == 0
+
+
+def test_ticket_edit_invalidates_ticket_and_usage(client):
+    customer = client.post(
+        "/customers/",
+        json={
+            "name": "Cache Customer",
+            "email": "cache@customer.com",
+            "phone": "555-0000",
+            "password": "securepassword",
+        },
+    ).json
+    ticket = client.post(
+        "/service_tickets/",
+        json={
+            "VIN": "1HGCM82633A123456",
+            "service_desc": "Oil change",
+            "service_date": "2025-07-15",
+            "customer_id": customer["id"],
+        },
+    ).json
+    mechanic = client.post(
+        "/mechanics/",
+        json={
+            "name": "Jane Wrench",
+            "email": "jane@fixit.com",
+            "phone": "555-1234",
+            "salary": 60000,
+        },
+    ).json
+    assert client.get(f"/service_tickets/{ticket['id']}").json["mechanics"] == []
+    assert client.get("/mechanics/usage").json["items"][0]["ticket_count"] == 0
+
+    client.put(
+        f"/service_tickets/{ticket['id']}/edit",
+        json={"add_mechanic_ids": [mechanic["id"]]},
+    )
+    assert client.get(f"/service_tickets/{ticket['id']}").json["mechanics"] == [
+        {"id": mechanic["id"], "name": "Jane Wrench"}
+    ]
+    assert client.get("/mechanics/usage").json["items"][0]["ticket_count"] == 1
+
+
+def test_my_tickets_cached_per_customer(client):
+    tokens = []
+    for email in ["a@customer.com", "b@customer.com"]:
+        customer = client.post(
+            "/customers/",
+            json={
+                "name": "Customer",
+                "email": email,
+                "phone": "555-0000",
+                "password": "securepassword",
+            },
+        ).json
+        client.post(
+            "/service_tickets/",
+            json={
+                "VIN": "1HGCM82633A123456",
+                "service_desc": f"Ticket for {email}",
+                "service_date": "2025-07-15",
+                "customer_id": customer["id"],
+            },
+        )
+        login = client.post(
+            "/customers/login", json={"email": email, "password": "securepassword"}
+        )
+        tokens.append(login.json["auth_token"])
+
+    descriptions = [
+        client.get(
+            "/service_tickets/my-tickets", headers={"Authorization": f"Bearer {token}"}
+        ).json["items"][0]["service_desc"]
+        for token in tokens
+    ]
+    assert descriptions == ["Ticket for a@customer.com", "Ticket for b@customer.com"]
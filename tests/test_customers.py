@@ -5,7 +5,10 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from app import create_app
 from app.models import db
+from app.utils import util
 from flask import current_app
+from app.utils.query_tracker import query_budget, track_queries
+import time
 import uuid  # is this necessary?
 
 
@@ -76,13 +79,14 @@ def test_get_all_customers(client):
     client.post("/customers/", json=create_test_customer())
     response = client.get("/customers/")
     assert response.status_code == 200
-    assert isinstance(response.json, list)
-    assert any(c["email"] == "jd@customer.com" for c in response.json)
+    assert isinstance(response.json["items"], list)
+    assert any(c["email"] == "jd@customer.com" for c in response.json["items"])
 
 def test_get_all_customers_empty(client):
     response = client.get("/customers/")
     assert response.status_code == 200
-    assert response.json == []
+    assert response.json["items"] == []
+    assert response.json["next_cursor"] is None
 
 
 # UPDATE CUSTOMER TESTS
@@ -154,3 +158,99 @@ def test_delete_customer_invalid_token(client):
     )
     assert response.status_code == 401
     assert "invalid" in response.json.get("message", "").lower()
+
+
+# TOKEN VERIFICATION CACHE TESTS
+def login_test_customer(client):
+    client.post("/customers/", json=create_test_customer())
+    login_res = client.post(
+        "/customers/login",
+        json={"email": "jd@customer.com", "password": "securepassword"},
+    )
+    return login_res.json["auth_token"]
+
+
+def test_verified_token_is_cached(client, monkeypatch):
+    token = login_test_customer(client)
+    util.token_cache.clear()
+    calls = []
+    real_decode = util.jwt.decode
+    monkeypatch.setattr(
+        util.jwt, "decode", lambda *a, **kw: calls.append(1) or real_decode(*a, **kw)
+    )
+
+    headers = {"Authorization": f"Bearer {token}"}
+    for _ in range(3):
+        assert client.get("/service_tickets/my-tickets", headers=headers).status_code == 200
+    assert len(calls) == 1
+
+
+def test_cached_token_respects_exp(client):
+    token = login_test_customer(client)
+    claims = util.decode_token(token)
+    # Force the cached entry past the token's expiry
+    util.token_cache.set(token, {**claims, "exp": int(time.time()) - 1})
+    assert util.token_cache.get(token) is None
+
+
+def test_token_cache_is_bounded():
+    cache = util.TokenCache(max_entries=2)
+    exp = int(time.time()) + 60
+    for token in ("a", "b", "c"):
+        cache.set(token, {"sub": token, "exp": exp})
+    assert len(cache) == 2
+    assert cache.get("a") is None
+    assert cache.get("c")["sub"] == "c"
+
+
+def test_current_customer_loaded_once_per_request(client):
+    token = login_test_customer(client)
+
+    @util.token_required
+    def view(customer_id):
+        first = util.get_current_customer()
+        assert util.get_current_customer() is first
+        return first.email
+
+    with current_app.test_request_context(
+        headers={"Authorization": f"Bearer {token}"}
+    ):
+        db.session.expunge_all()
+        with query_budget(1):
+            assert view() == "jd@customer.com"
+
+
+# BULK CREATE CUSTOMER TESTS
+def test_bulk_create_customers(client):
+    client.post("/customers/", json=create_test_customer())
+    batch = [
+        {**create_test_customer(), "email": "one@customer.com"},
+        {**create_test_customer(), "email": "two@customer.com"},
+        create_test_customer(),  # email already in the database
+        {**create_test_customer(), "email": "one@customer.com"},  # repeated in batch
+        {"name": "No Email", "password": "123"},
+    ]
+    response = client.post("/customers/bulk", json=batch)
+    assert response.status_code == 207
+    assert response.json["created"] == 2
+    results = response.json["results"]
+    assert [r["status"] for r in results] == [201, 201, 400, 400, 400]
+    assert results[0]["data"]["email"] == "one@customer.com"
+    assert "already exists" in results[2]["error"].lower()
+    assert "email" in results[4]["errors"]
+
+
+def test_bulk_create_customers_requires_list(client):
+    response = client.post("/customers/bulk", json=create_test_customer())
+    assert response.status_code == 400
+
+
+# SPARSE FIELDSETS
+def test_get_all_customers_sparse_fields(client):
+    client.post("/customers/", json=create_test_customer())
+    with track_queries() as log:
+        response = client.get("/customers/?fields=id,name")
+    assert response.status_code == 200
+    assert response.json["items"] == [{"id": 1, "name": "John Doe"}]
+    select = next(iter(log.shapes))
+    assert "password" not in select and "email" not in select
@@ -0,0 +1,103 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app import create_app
+from app.models import db
+from app.utils import health
+from flask import current_app
+from app.utils.query_tracker import query_budget
+import time
+
+
+@pytest.fixture
+def client():
+    app = create_app("TestingConfig")
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app.test_client()
+
+
+def monitor():
+    return current_app.extensions["health_monitor"]
+
+
+def test_livez(client):
+    response = client.get("/livez")
+    assert response.status_code == 200
+    assert response.json["status"] == "alive"
+
+
+def test_readyz_not_ready_before_first_probe(client):
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json["checks"]["database"]["error"] == "not checked yet"
+
+
+def test_readyz_serves_cached_results_without_io(client):
+    monitor().run_checks()
+    with query_budget(0):
+        response = client.get("/readyz")
+    assert response.status_code == 200
+    assert set(response.json["checks"]) == {"database", "cache", "limiter"}
+    assert all(check["ok"] for check in response.json["checks"].values())
+    assert "checked_at" in response.json["checks"]["database"]
+    assert client.get("/health").json == {"status": "healthy", "database": "connected"}
+
+
+def test_readyz_failing_check(client, monkeypatch):
+    def broken():
+        raise RuntimeError("connection refused")
+
+    monkeypatch.setitem(health.CHECKS, "database", broken)
+    monitor().run_checks()
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json["checks"]["database"]["error"] == "connection refused"
+    assert response.json["checks"]["cache"]["ok"]
+    assert client.get("/health").status_code == 500
+
+
+def test_readyz_hung_and_stale_checks(client):
+    monitor().run_checks()
+    monitor().running["database"] = time.monotonic() - 60  # probe stuck in flight
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json["checks"]["database"]["error"] == "check timed out"
+
+    monitor().running.clear()
+    monitor().results["cache"]["_monotonic"] -= 3600
+    response = client.get("/readyz")
+    assert response.json["checks"]["cache"]["error"] == "result is stale"
+
+
+def test_background_probe_thread(client):
+    prober = health.HealthMonitor(current_app._get_current_object(), interval=0.01)
+    prober.ensure_started()
+    try:
+        deadline = time.monotonic() + 5
+        while not prober.snapshot()[0] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert prober.snapshot()[0]
+    finally:
+        prober.stop()
+
+
+def test_first_probe_after_start_has_results(client):
+    prober = health.HealthMonitor(current_app._get_current_object(), interval=60)
+    try:
+        prober.ensure_started()  # waits for the first round
+        ready, checks = prober.snapshot()
+        assert ready, checks
+    finally:
+        prober.stop()
+
+
+def test_health_checks_inline_without_probe_threads(client):
+    # HEALTH_PROBE_INTERVAL=0: nothing refreshes the results in the background
+    assert client.get("/health").json == {"status": "healthy", "database": "connected"}
+    monitor().results["database"]["_monotonic"] -= 3600
+    assert client.get("/health").status_code == 200
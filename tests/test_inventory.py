@@ -51,13 +51,14 @@ def test_get_all_inventory(client):
     client.post("/inventory/", json=create_test_part())
     response = client.get("/inventory/")
     assert response.status_code == 200
-    assert isinstance(response.json, list)
-    assert any(p["name"] == "Brake Pads" for p in response.json)
+    assert isinstance(response.json["items"], list)
+    assert any(p["name"] == "Brake Pads" for p in response.json["items"])
 
 def test_get_all_inventory_empty(client):
     response = client.get("/inventory/")
     assert response.status_code == 200
-    assert response.json == []
+    assert response.json["items"] == []
+    assert response.json["next_cursor"] is None
 
 
 def test_get_inventory_by_id(client):
@@ -121,6 +122,65 @@ def test_delete_inventory_invalid_id(client):
 def test_get_inventory_with_pagination(client):
     for i in range(3):
         client.post("/inventory/", json={"name": f"Part {i}", "price": 10.0 + i})
-    response = client.get("/inventory/?page=1")
+    response = client.get("/inventory/?limit=2")
     assert response.status_code == 200
-    assert isinstance(response.json, list)
+    assert [p["name"] for p in response.json["items"]] == ["Part 0", "Part 1"]
+    assert response.json["next_cursor"]
+
+    response = client.get(f"/inventory/?limit=2&cursor={response.json['next_cursor']}")
+    assert response.status_code == 200
+    assert [p["name"] for p in response.json["items"]] == ["Part 2"]
+    assert response.json["next_cursor"] is None
+
+
+def test_get_inventory_invalid_pagination_args(client):
+    assert client.get("/inventory/?limit=abc").status_code == 400
+    assert client.get("/inventory/?limit=0").status_code == 400
+    assert client.get("/inventory/?cursor=not-a-cursor").status_code == 400
+
+
+# BULK CREATE INVENTORY TESTS
+def test_bulk_create_inventory(client):
+    batch = [{"name": f"Bulk Part {i}", "price": 1.0 + i} for i in range(5)]
+    response = client.post("/inventory/bulk", json=batch)
+    assert response.status_code == 201
+    assert response.json["created"] == 5
+    ids = [r["data"]["id"] for r in response.json["results"]]
+    assert len(set(ids)) == 5
+
+    response = client.post("/inventory/bulk", json=batch[:1])
+    assert response.status_code == 400
+    assert "already exists" in response.json["results"][0]["error"].lower()
+
+
+# ETAG / CONDITIONAL GET
+def test_get_inventory_etag_and_304(client):
+    res = client.post("/inventory/", json=create_test_part())
+    part_id = res.json["id"]
+    response = client.get(f"/inventory/{part_id}")
+    etag = response.headers["ETag"]
+    assert not etag.startswith("W/")
+
+    response = client.get(f"/inventory/{part_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    client.put(f"/inventory/{part_id}", json={"name": "Rotors", "price": 80.0})
+    response = client.get(f"/inventory/{part_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_get_all_inventory_weak_etag(client):
+    client.post("/inventory/", json=create_test_part())
+    response = client.get("/inventory/")
+    etag = response.headers["ETag"]
+    assert etag.startswith("W/")
+
+    response = client.get("/inventory/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    client.post("/inventory/", json={"name": "Oil Filter", "price": 19.99})
+    response = client.get("/inventory/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json["items"]) == 2
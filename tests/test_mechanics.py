@@ -5,6 +5,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from app import create_app
 from app.models import db
+from app.utils.query_tracker import query_budget
 from flask import current_app
 import uuid # is this necessary?
 
@@ -60,14 +61,15 @@ def test_get_all_mechanics(client):
     client.post("/mechanics/", json=create_test_mechanic())
     response = client.get("/mechanics/")
     assert response.status_code == 200
-    assert isinstance(response.json, list)
-    assert any(m["email"] == "jane@fixit.com" for m in response.json)
+    assert isinstance(response.json["items"], list)
+    assert any(m["email"] == "jane@fixit.com" for m in response.json["items"])
 
 
 def test_get_all_mechanics_empty(client):
     response = client.get("/mechanics/")
     assert response.status_code == 200
-    assert response.json == []
+    assert response.json["items"] == []
+    assert response.json["next_cursor"] is None
 
 
 def test_get_mechanic_by_id(client):
@@ -88,7 +90,7 @@ def test_mechanic_search(client):
     client.post("/mechanics/", json=create_test_mechanic())
     response = client.get("/mechanics/search?name=Jane")
     assert response.status_code == 200
-    assert any("Jane" in m["name"] for m in response.json)
+    assert any("Jane" in m["name"] for m in response.json["items"])
 
 
 def test_mechanic_search_no_results(client):
@@ -220,3 +222,129 @@ def test_mechanic_usage_in_service_tickets(client):
     # service_ticket = edit_res.json["service_ticket"]
     # mechanic_ids = [m["id"] for m in service_ticket["mechanics"]]
     # assert mechanic_id in mechanic_ids
+
+
+# MECHANIC USAGE - RANKING, FILTERS AND PAGINATION
+def setup_usage_data(client):
+    cust_res = client.post(
+        "/customers/",
+        json={
+            "name": "Usage Customer",
+            "email": "usage@driver.com",
+            "phone": "555-2222",
+            "password": "pass123",
+        },
+    )
+    customer_id = cust_res.json["id"]
+
+    mechanic_ids = []
+    for name in ["Busy Bee", "Steady Sam", "Idle Ian"]:
+        res = client.post(
+            "/mechanics/",
+            json={
+                "name": name,
+                "email": f"{uuid.uuid4().hex[:6]}@fixit.com",
+                "phone": "555-0000",
+                "salary": 50000,
+            },
+        )
+        mechanic_ids.append(res.json["id"])
+    busy, steady, _ = mechanic_ids
+
+    # Busy Bee works three tickets, Steady Sam one (in August)
+    assignments = [
+        ("2025-07-01", [busy]),
+        ("2025-07-02", [busy]),
+        ("2025-08-01", [busy, steady]),
+    ]
+    for service_date, mechanics in assignments:
+        ticket_res = client.post(
+            "/service_tickets/",
+            json={
+                "VIN": "1HGCM82633A123456",
+                "service_desc": "Inspection",
+                "service_date": service_date,
+                "customer_id": customer_id,
+            },
+        )
+        client.put(
+            f"/service_tickets/{ticket_res.json['id']}/edit",
+            json={"add_mechanic_ids": mechanics},
+        )
+    return mechanic_ids
+
+
+def test_mechanic_usage_ranking(client):
+    busy, steady, idle = setup_usage_data(client)
+    response = client.get("/mechanics/usage")
+    assert response.status_code == 200
+    assert [(m["id"], m["ticket_count"]) for m in response.json["items"]] == [
+        (busy, 3),
+        (steady, 1),
+        (idle, 0),
+    ]
+
+
+def test_mechanic_usage_filters(client):
+    busy, steady, _ = setup_usage_data(client)
+    response = client.get("/mechanics/usage?min_count=1")
+    assert [m["id"] for m in response.json["items"]] == [busy, steady]
+
+    response = client.get("/mechanics/usage?start_date=2025-08-01&min_count=1")
+    assert [(m["id"], m["ticket_count"]) for m in response.json["items"]] == [
+        (busy, 1),
+        (steady, 1),
+    ]
+
+    response = client.get("/mechanics/usage?start_date=July")
+    assert response.status_code == 400
+
+
+def test_mechanic_usage_pagination(client):
+    busy, steady, idle = setup_usage_data(client)
+    response = client.get("/mechanics/usage?limit=2")
+    assert [m["id"] for m in response.json["items"]] == [busy, steady]
+    cursor = response.json["next_cursor"]
+    assert cursor
+
+    response = client.get(f"/mechanics/usage?limit=2&cursor={cursor}")
+    assert [m["id"] for m in response.json["items"]] == [idle]
+    assert response.json["next_cursor"] is None
+
+
+def test_mechanic_usage_query_budget(client):
+    setup_usage_data(client)
+    # Counts are aggregated in the database; nothing is loaded per mechanic
+    with query_budget(1):
+        client.get("/mechanics/usage")
+    with query_budget(1):
+        client.get("/mechanics/usage?start_date=2025-07-01&min_count=1")
+
+
+# BULK CREATE MECHANIC TESTS
+def test_bulk_create_mechanics(client):
+    client.post("/mechanics/", json=create_test_mechanic())
+    batch = [
+        {**create_test_mechanic(), "email": "bulk1@fixit.com"},
+        create_test_mechanic(),
+    ]
+    response = client.post("/mechanics/bulk", json=batch)
+    assert response.status_code == 207
+    results = response.json["results"]
+    assert results[0]["status"] == 201
+    assert results[0]["data"]["email"] == "bulk1@fixit.com"
+    assert results[1]["error"] == "Email already exists"
+
+
+def test_bulk_create_mechanics_uses_one_insert(client):
+    batch = [
+        {**create_test_mechanic(), "email": f"bulk{i}@fixit.com"} for i in range(50)
+    ]
+    # Duplicate check, one multi-row INSERT and one search index INSERT
+    with query_budget(3, max_repeats=1):
+        response = client.post("/mechanics/bulk", json=batch)
+    assert response.status_code == 201
+    data = [result["data"] for result in response.json["results"]]
+    assert [mechanic["email"] for mechanic in data] == [m["email"] for m in batch]
+    assert [mechanic["id"] for mechanic in data] == list(range(1, 51))
+    assert client.get("/mechanics/50").json["email"] == "bulk49@fixit.com"
@@ -0,0 +1,149 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+from app import create_app
+from app.models import db
+from app.utils.metrics import Metrics, render_metrics, write_snapshot
+from flask import current_app
+from threading import Thread
+import json
+import re
+
+
+@pytest.fixture
+def client():
+    app = create_app("TestingConfig")
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app.test_client()
+
+
+def scrape(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    return response.get_data(as_text=True)
+
+
+def sample(text, name, **labels):
+    """Value of the sample ``name`` whose labels include ``labels``."""
+    for line in text.splitlines():
+        match = re.match(r"(\w+)(?:\{(.*)\})? (\S+)$", line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ""))
+        if all(found.get(k) == str(v) for k, v in labels.items()):
+            return float(match.group(3))
+    return None
+
+
+def test_request_counts_and_latency_per_route(client):
+    client.post(
+        "/mechanics/",
+        json={"name": "Jane", "email": "jane@fixit.com", "phone": "5", "salary": 1},
+    )
+    client.get("/mechanics/1")
+    client.get("/mechanics/1")
+    client.get("/mechanics/999")
+    text = scrape(client)
+
+    route = "/mechanics/<int:mechanic_id>"
+    assert sample(text, "http_requests_total", route=route, method="GET", status=200) == 2
+    assert sample(text, "http_requests_total", route=route, method="GET", status=404) == 1
+    assert sample(text, "http_requests_total", route="/mechanics/", method="POST", status=201) == 1
+    assert sample(text, "http_request_duration_seconds_count", route=route, method="GET") == 3
+    assert sample(text, "http_request_duration_seconds_bucket", route=route, method="GET", le="+Inf") == 3
+    assert sample(text, "http_request_duration_seconds_sum", route=route, method="GET") > 0
+    assert "# TYPE http_request_duration_seconds histogram" in text
+
+
+def test_db_queries_per_request(client):
+    client.get("/mechanics/1")  # one SELECT, 404
+    client.get("/livez")  # no database access
+    text = scrape(client)
+
+    route = "/mechanics/<int:mechanic_id>"
+    assert sample(text, "db_queries_total", route=route, method="GET") == 1
+    assert sample(text, "db_query_duration_seconds_total", route=route, method="GET") > 0
+    assert sample(text, "http_request_db_queries_bucket", route=route, method="GET", le="0.0") == 0
+    assert sample(text, "http_request_db_queries_bucket", route=route, method="GET", le="1.0") == 1
+    assert sample(text, "http_request_db_queries_bucket", route="/livez", method="GET", le="0.0") == 1
+    assert sample(text, "db_queries_total", route="/livez", method="GET") is None
+
+
+def test_cache_pool_and_limiter_metrics(client):
+    for _ in range(6):  # limited to 5 per minute; one miss, then hits
+        client.get("/mechanics/")
+    client.get("/no-such-page")
+    text = scrape(client)
+
+    assert sample(text, "response_cache_hits_total") == 4
+    assert sample(text, "response_cache_misses_total") == 1
+    assert sample(text, "ratelimit_rejections_total", route="/mechanics/") == 1
+    assert sample(text, "http_requests_total", route="/mechanics/", status=429) == 1
+    assert sample(text, "http_requests_total", route="<unmatched>", status=404) == 1
+    assert sample(text, "db_pool_checked_out") is None  # StaticPool has no stats
+
+
+def test_threads_record_without_sharing_state():
+    metrics = Metrics()
+    labels = (("route", "/"), ("method", "GET"))
+
+    def work():
+        for _ in range(1000):
+            metrics.inc("http_requests_total", labels)
+            metrics.observe("http_request_duration_seconds", labels, 0.02)
+
+    threads = [Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counters, histograms = metrics.collect()
+    assert counters[("http_requests_total", labels)] == 4000
+    counts = histograms[("http_request_duration_seconds", labels)]
+    assert counts[2] == 4000  # 0.01 < 0.02 <= 0.025
+    assert counts[-1] == pytest.approx(80.0)
+
+
+def test_multiprocess_snapshots_are_summed(client, tmp_path):
+    current_app.config["PROMETHEUS_MULTIPROC_DIR"] = str(tmp_path)
+    current_app.config["METRICS_FLUSH_INTERVAL"] = 0
+    client.get("/livez")
+    write_snapshot(str(tmp_path))
+    own = json.loads((tmp_path / f"{os.getpid()}.json").read_text())
+
+    # A second worker that has since exited: counters kept, gauges dropped
+    for entry in own["counters"]:
+        if entry[0] == "http_requests_total":
+            entry[2] = 5
+    own["gauges"] = [["db_pool_idle", [], 3]]
+    (tmp_path / "999999999.json").write_text(json.dumps(own))
+
+    text = render_metrics()
+    assert sample(text, "http_requests_total", route="/livez", status=200) == 6
+    assert sample(text, "http_request_duration_seconds_count", route="/livez") == 2
+    assert sample(text, "db_pool_idle") is None
+
+
+INTERNAL_PATHS = ["/metrics", "/pool/stats", "/cache/stats"]
+
+
+def test_internal_endpoints_can_be_switched_off(monkeypatch):
+    monkeypatch.setattr(config.TestingConfig, "INTERNAL_ENDPOINTS_ENABLED", False, raising=False)
+    client = create_app("TestingConfig").test_client()
+    assert [client.get(path).status_code for path in INTERNAL_PATHS] == [404] * 3
+
+
+def test_internal_endpoints_require_the_token_when_set(monkeypatch):
+    monkeypatch.setattr(config.TestingConfig, "INTERNAL_ENDPOINTS_TOKEN", "s3cret", raising=False)
+    client = create_app("TestingConfig").test_client()
+    for headers in [{}, {"Authorization": "Bearer wrong"}]:
+        assert [client.get(path, headers=headers).status_code for path in INTERNAL_PATHS] == [401] * 3
+    headers = {"Authorization": "Bearer s3cret"}
+    assert [client.get(path, headers=headers).status_code for path in INTERNAL_PATHS] == [200] * 3
@@ -0,0 +1,63 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app import create_app
+from app.models import db
+from app.utils.pool import TimedQueuePool, get_pool_stats
+from config import get_pool_options
+from sqlalchemy import create_engine, exc, text
+
+
+@pytest.fixture
+def client():
+    app = create_app("TestingConfig")
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app.test_client()
+
+
+def test_pool_options_from_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    options = get_pool_options()
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == 20
+    assert options["pool_pre_ping"] is False
+    assert options["pool_use_lifo"] is True
+
+
+def test_pool_stats_endpoint(client):
+    response = client.get("/pool/stats")
+    assert response.status_code == 200
+    assert response.json["pool"] == "StaticPool"  # in-memory SQLite
+
+
+def test_timed_pool_reports_occupancy_and_waits(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    first, second = engine.connect(), engine.connect()
+    stats = get_pool_stats(engine)
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    first.close()
+    second.close()
+
+    stats = get_pool_stats(engine)
+    assert stats["checked_out"] == 0
+    assert stats["idle"] == 1
+    assert stats["checkout"]["checkouts"] == 3
+    assert stats["checkout"]["timeouts"] == 1
+    assert stats["checkout"]["wait_seconds_max"] >= 0.05
+    engine.dispose()
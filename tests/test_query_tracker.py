@@ -0,0 +1,118 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app import create_app
+from app.models import db, Mechanic
+from app.utils.query_tracker import fingerprint, query_budget, track_queries
+from flask import current_app
+from sqlalchemy import select, text
+import logging
+
+
+@pytest.fixture
+def client():
+    app = create_app("TestingConfig")
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app.test_client()
+
+
+def create_mechanics(count):
+    db.session.add_all(
+        Mechanic(name=f"M{i}", email=f"m{i}@fixit.com", phone="5", salary=1)
+        for i in range(count)
+    )
+    db.session.commit()
+
+
+def add_per_row_route():
+    # Deliberate N+1: one SELECT per mechanic
+    def per_row():
+        ids = db.session.execute(select(Mechanic.id)).scalars().all()
+        for mechanic_id in ids:
+            db.session.execute(select(Mechanic).where(Mechanic.id == mechanic_id))
+        return {"count": len(ids)}
+
+    current_app.add_url_rule("/per-row", "per_row", per_row)
+
+
+def test_fingerprint_normalizes_literals_and_params():
+    assert fingerprint("SELECT * FROM t WHERE id = 7 AND name = 'O''Brien'") == (
+        "SELECT * FROM t WHERE id = ? AND name = ?"
+    )
+    assert fingerprint("SELECT a FROM t WHERE id IN (?, ?,\n ?)") == (
+        "SELECT a FROM t WHERE id IN (...)"
+    )
+    assert fingerprint("SELECT a FROM t WHERE id = %(id_1)s LIMIT %s") == (
+        fingerprint("SELECT a FROM t WHERE id = :id_1 LIMIT $2")
+    )
+    assert fingerprint("SELECT anon_1.id FROM anon_1") == "SELECT anon_1.id FROM anon_1"
+
+
+def test_query_count_header(client):
+    create_mechanics(2)
+    assert client.get("/mechanics/").headers["X-Query-Count"] == "1"
+    assert client.get("/livez").headers["X-Query-Count"] == "0"
+
+    current_app.config["QUERY_COUNT_HEADER"] = False
+    assert "X-Query-Count" not in client.get("/livez").headers
+
+
+def test_n_plus_one_is_logged_and_counted(client, caplog):
+    create_mechanics(6)
+    add_per_row_route()
+    with caplog.at_level(logging.WARNING):
+        response = client.get("/per-row")
+    assert response.headers["X-Query-Count"] == "7"
+    assert "Possible N+1 in GET /per-row: 6 x SELECT" in caplog.text
+
+    metrics = client.get("/metrics").get_data(as_text=True)
+    assert 'db_n_plus_one_requests_total{route="/per-row",method="GET"} 1' in metrics
+
+
+def test_query_budget(client):
+    create_mechanics(3)
+    add_per_row_route()
+    with query_budget(1) as log:
+        client.get("/mechanics/")
+    assert log.count == 1
+
+    with pytest.raises(AssertionError, match="4 queries exceed the budget of 2"):
+        with query_budget(2):
+            client.get("/per-row")
+    with pytest.raises(AssertionError, match="repeated more than 1 times"):
+        with query_budget(10, max_repeats=1):
+            client.get("/per-row")
+
+
+def test_tracking_is_per_thread(client):
+    from threading import Thread
+
+    app = current_app._get_current_object()
+    results, errors = {}, []
+
+    def other_thread():
+        try:
+            with app.app_context():
+                db.session.execute(text("SELECT 1"))  # not in the main log
+                with track_queries() as own:
+                    db.session.execute(text("SELECT 1"))
+                    db.session.execute(text("SELECT 2"))
+                results["count"] = own.count
+                db.session.remove()
+        except Exception as exc:
+            errors.append(exc)
+
+    create_mechanics(1)
+    with track_queries() as log:
+        thread = Thread(target=other_thread)
+        thread.start()
+        thread.join()
+        db.session.execute(select(Mechanic))
+    assert errors == []
+    assert log.count == 1
+    assert results == {"count": 2}
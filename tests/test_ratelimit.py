@@ -0,0 +1,146 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+fakeredis = pytest.importorskip("fakeredis")
+import multiprocessing
+import redis
+from threading import Thread
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+import config
+from app import create_app
+from app.models import db
+from app.utils.ratelimit import BatchedRedisStorage, batched_storage_uri, limit_amount
+from app.utils.util import encode_token
+
+
+@pytest.fixture
+def redis_url():
+    # A local Redis stand-in that separate processes can connect to
+    server = fakeredis.TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"redis://127.0.0.1:{server.server_address[1]}/0"
+    server.shutdown()
+    server.server_close()
+
+
+def shared_count(url, key):
+    return int(redis.Redis.from_url(url).get(f"LIMITS:{key}") or 0)
+
+
+def test_batched_storage_uri_and_limit_from_key():
+    uri = batched_storage_uri("redis://cache:6379/0", batch_size=10, sync_interval=None)
+    assert uri == "batched+redis://cache:6379/0?batch_size=10"
+    assert isinstance(storage_from_string(uri), BatchedRedisStorage)
+    assert storage_from_string(uri).batch_size == 10
+    assert limit_amount(parse("5 per day").key_for("LIMITER", "1.2.3.4")) == 5
+    assert limit_amount("no-amount-here") is None
+
+
+def test_hits_are_synced_in_batches(redis_url):
+    storage = storage_from_string(f"batched+{redis_url}?batch_size=10&sync_interval=60")
+    limiter = FixedWindowRateLimiter(storage)
+    limit = parse("1000 per minute")
+
+    assert all(limiter.hit(limit, "client") for _ in range(100))
+    # The first hit learns the window; then one INCRBY per 10 hits
+    assert storage.stats == {"hits": 100, "syncs": 10}
+    assert shared_count(redis_url, limit.key_for("client")) == 91
+
+    storage.flush()
+    assert shared_count(redis_url, limit.key_for("client")) == 100
+    assert limiter.get_window_stats(limit, "client").remaining == 900
+
+
+def test_incr_accepts_both_limits_calling_conventions(redis_url):
+    storage = storage_from_string(f"batched+{redis_url}")
+    key = parse("5 per minute").key_for("client")
+    # limits 4.x: incr(key, expiry, elastic_expiry=False, amount=cost)
+    assert storage.incr(key, 60, elastic_expiry=False, amount=1) == 1
+    # limits 5.x: incr(key, expiry, amount=cost)
+    assert storage.incr(key, 60, amount=2) == 3
+
+
+def test_small_limits_stay_exact(redis_url):
+    storage = storage_from_string(f"batched+{redis_url}")
+    limiter = FixedWindowRateLimiter(storage)
+    limit = parse("5 per minute")
+
+    assert [limiter.hit(limit, "client") for _ in range(6)] == [True] * 5 + [False]
+    # A batch of 1 (5% of 5 rounds down); the 6th is rejected without a sync
+    assert storage.stats["syncs"] == 5
+
+
+def test_syncs_every_hit_near_the_limit(redis_url):
+    storage = storage_from_string(f"batched+{redis_url}?batch_size=10&sync_interval=60")
+    limiter = FixedWindowRateLimiter(storage)
+    limit = parse("200 per minute")
+    key = limit.key_for("client")
+
+    # Another worker has already used most of the window
+    redis.Redis.from_url(redis_url).set(f"LIMITS:{key}", 192, ex=60)
+    results = [limiter.hit(limit, "client") for _ in range(20)]
+    assert results.count(True) == 8
+    # Hits sync one by one up to the limit, then are rejected locally
+    assert shared_count(redis_url, key) == 200
+    assert storage.stats["syncs"] == 8
+
+
+def hammer(url, limit, hits, start, results):
+    storage = storage_from_string(f"batched+{url}?batch_size=10&sync_interval=60")
+    limiter = FixedWindowRateLimiter(storage)
+    item = parse(limit)
+    start.wait()
+    allowed = sum(limiter.hit(item, "shared-client") for _ in range(hits))
+    results.put((allowed, storage.stats["syncs"]))
+
+
+def test_overshoot_is_bounded_across_processes(redis_url):
+    workers, hits, limit = 4, 300, 800
+    ctx = multiprocessing.get_context("fork")
+    start = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(
+            target=hammer, args=(redis_url, f"{limit} per minute", hits, start, results)
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join(timeout=10)
+
+    allowed = sum(allowed for allowed, _ in outcomes)
+    syncs = sum(syncs for _, syncs in outcomes)
+    assert limit <= allowed <= limit + workers * (10 - 1)
+    assert syncs < workers * hits / 4  # far fewer round trips than hits
+
+
+def test_app_limits_per_customer_on_batched_storage(redis_url, monkeypatch):
+    monkeypatch.setattr(
+        config.TestingConfig, "RATELIMIT_STORAGE_URI", f"batched+{redis_url}"
+    )
+    app = create_app("TestingConfig")
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        client = app.test_client()
+        ann = {"Authorization": f"Bearer {encode_token(1)}"}
+        bob = {"Authorization": f"Bearer {encode_token(2)}"}
+
+        # GET /mechanics/ allows 5 per minute per client
+        statuses = [client.get("/mechanics/", headers=ann).status_code for _ in range(6)]
+        assert statuses == [200] * 5 + [429]
+        # Same address, different customer (and anonymous): separate budgets
+        assert client.get("/mechanics/", headers=bob).status_code == 200
+        assert client.get("/mechanics/").status_code == 200
+        # A bad token falls back to the address
+        bad = {"Authorization": "Bearer not-a-token"}
+        assert client.get("/mechanics/", headers=bad).status_code == 200
+
+    keys = sorted(key.decode() for key in redis.Redis.from_url(redis_url).keys())
+    assert [key.split("/")[1] for key in keys] == ["127.0.0.1", "customer:1", "customer:2"]
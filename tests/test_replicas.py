@@ -0,0 +1,174 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+from app import create_app
+from app.extensions import cache
+from app.utils.caching import invalidate
+from app.models import db, Base, InventoryItem
+from app.utils.util import encode_token
+from sqlalchemy import event, insert
+
+
+def make_app(monkeypatch, tmp_path, replicas, **settings):
+    # Two SQLite files stand in for the primary and its replicas
+    primary = f"sqlite:///{tmp_path / 'primary.db'}"
+    uris = [f"sqlite:///{tmp_path / name}" for name in replicas]
+    monkeypatch.setattr(config.TestingConfig, "SQLALCHEMY_DATABASE_URI", primary)
+    monkeypatch.setattr(
+        config.TestingConfig, "SQLALCHEMY_REPLICA_URIS", uris, raising=False
+    )
+    for key, value in settings.items():
+        monkeypatch.setattr(config.TestingConfig, key, value, raising=False)
+    return create_app("TestingConfig")
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    app = make_app(monkeypatch, tmp_path, ["replica.db"])
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        for engine in app.extensions["db_replicas"].engines:
+            Base.metadata.create_all(engine)
+            # A row only the replica has shows which database served a read
+            with engine.begin() as connection:
+                connection.execute(
+                    insert(InventoryItem),
+                    [{"name": f"only on {engine.url.database}", "price": 1}],
+                )
+        yield app
+        db.session.remove()
+
+
+def item_names(client, **kwargs):
+    invalidate("inventory")  # measure routing, not the response cache
+    # The test's app context keeps one session across requests: without a new
+    # one, a row already in its identity map hides the same id on another database
+    db.session.remove()
+    res = client.get("/inventory/", **kwargs)
+    assert res.status_code == 200
+    return [item["name"] for item in res.json["items"]]
+
+
+def replica_row(app, index=0):
+    return f"only on {app.extensions['db_replicas'].engines[index].url.database}"
+
+
+def test_get_requests_read_from_the_replica(app):
+    client = app.test_client()
+    assert item_names(client) == [replica_row(app)]
+
+
+def test_writes_go_to_the_primary(app):
+    client = app.test_client()
+    statements = []
+    replica = app.extensions["db_replicas"].engines[0]
+    event.listen(
+        replica, "before_cursor_execute", lambda *args: statements.append(args[2])
+    )
+
+    res = client.post("/inventory/", json={"name": "Filter", "price": 9.5})
+    assert res.status_code == 201
+    assert statements == []
+    assert db.session.get(InventoryItem, res.json["id"]).name == "Filter"
+
+
+def test_read_your_writes_after_a_write(app):
+    writer = app.test_client()
+    other = app.test_client()
+    other_client = {"environ_base": {"REMOTE_ADDR": "10.0.0.2"}}
+    res = writer.post("/inventory/", json={"name": "Filter", "price": 9.5})
+    assert res.status_code == 201
+
+    # The writer sees its change (primary); other clients keep using the replica
+    assert item_names(writer) == ["Filter"]
+    assert item_names(other, **other_client) == [replica_row(app)]
+
+    # The mark lives in the cache and expires after REPLICA_STICKY_SECONDS
+    cache.delete("replica:sticky:127.0.0.1")
+    assert item_names(writer) == [replica_row(app)]
+
+
+def test_read_your_writes_follows_the_customer_token(app):
+    client = app.test_client()
+    res = client.post(
+        "/customers/",
+        json={"name": "Ann", "email": "ann@test.com", "phone": "555", "password": "pw"},
+    )
+    headers = {"Authorization": f"Bearer {encode_token(res.json['id'])}"}
+    cache.clear()
+    client.post("/inventory/", json={"name": "Filter", "price": 9.5}, headers=headers)
+
+    # Same customer from another address still reads its own write
+    elsewhere = {"REMOTE_ADDR": "10.0.0.9"}
+    assert item_names(client, headers=headers, environ_base=elsewhere) == ["Filter"]
+
+
+def test_round_robin_across_replicas(monkeypatch, tmp_path):
+    app = make_app(monkeypatch, tmp_path, ["a.db", "b.db"])
+    with app.app_context():
+        db.create_all()
+        for engine in app.extensions["db_replicas"].engines:
+            Base.metadata.create_all(engine)
+            with engine.begin() as connection:
+                connection.execute(
+                    insert(InventoryItem), [{"name": engine.url.database, "price": 1}]
+                )
+        client = app.test_client()
+        served = [item_names(client)[0] for _ in range(4)]
+        db.session.remove()
+    assert served[0] != served[1]
+    assert served[:2] == served[2:]
+
+
+def test_failover_to_next_replica_and_primary(monkeypatch, tmp_path):
+    # The first replica cannot be opened (its directory does not exist)
+    app = make_app(
+        monkeypatch,
+        tmp_path,
+        ["missing/replica.db", "replica.db"],
+        REPLICA_RETRY_AFTER=3600,
+    )
+    with app.app_context():
+        db.create_all()
+        router = app.extensions["db_replicas"]
+        Base.metadata.create_all(router.engines[1])
+        # A marker row in each database shows which one served a read
+        markers = [(db.engine, "only on the primary"), (router.engines[1], replica_row(app, 1))]
+        for engine, name in markers:
+            with engine.begin() as connection:
+                connection.execute(insert(InventoryItem), [{"name": name, "price": 1}])
+        client = app.test_client()
+
+        assert [s["state"] for s in router.status()] == ["unchecked", "unchecked"]
+        # The first read probes the dead replica, marks it down and moves on
+        assert all(item_names(client) == [replica_row(app, 1)] for _ in range(4))
+        assert [s["state"] for s in router.status()] == ["down", "up"]
+
+        # With no replica left, reads fall back to the primary
+        router.mark_down(1)
+        assert item_names(client) == ["only on the primary"]
+
+        stats = client.get("/pool/stats").json
+        assert [replica["state"] for replica in stats["replicas"]] == ["down", "down"]
+        db.session.remove()
+
+
+def test_recovered_replica_is_probed_back_into_rotation(monkeypatch, tmp_path):
+    app = make_app(monkeypatch, tmp_path, ["late/replica.db"], REPLICA_RETRY_AFTER=0)
+    with app.app_context():
+        db.create_all()
+        router = app.extensions["db_replicas"]
+        client = app.test_client()
+        assert item_names(client) == []  # probe fails: primary
+        assert router.status()[0]["state"] == "down"
+
+        os.mkdir(tmp_path / "late")
+        Base.metadata.create_all(router.engines[0])
+        with router.engines[0].begin() as connection:
+            connection.execute(insert(InventoryItem), [{"name": "replica", "price": 1}])
+        assert item_names(client) == ["replica"]
+        assert router.status()[0]["state"] == "up"
+        db.session.remove()
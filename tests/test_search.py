@@ -0,0 +1,156 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app import create_app
+from app.models import db
+from app.utils.search import SEARCH_TABLE
+from flask import current_app
+from sqlalchemy import text
+
+
+@pytest.fixture
+def client():
+    app = create_app("TestingConfig")
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app.test_client()
+
+
+def create_mechanic(client, name, email):
+    res = client.post(
+        "/mechanics/",
+        json={"name": name, "email": email, "phone": "555-1234", "salary": 60000},
+    )
+    assert res.status_code == 201
+    return res.json["id"]
+
+
+def create_customer(client, name, email, phone="555-867-5309"):
+    res = client.post(
+        "/customers/",
+        json={"name": name, "email": email, "phone": phone, "password": "pw"},
+    )
+    assert res.status_code == 201
+    return res.json["id"]
+
+
+def create_ticket(client, customer_id, vin):
+    res = client.post(
+        "/service_tickets/",
+        json={
+            "VIN": vin,
+            "service_desc": "Oil change",
+            "service_date": "2025-07-15",
+            "customer_id": customer_id,
+        },
+    )
+    assert res.status_code == 201
+    return res.json["id"]
+
+
+def search(client, query):
+    res = client.get(f"/search/?{query}")
+    assert res.status_code == 200
+    return [(item["type"], item["id"]) for item in res.json["items"]]
+
+
+def test_search_across_kinds(client):
+    mechanic_id = create_mechanic(client, "Jane Wrench", "jane@fixit.com")
+    customer_id = create_customer(client, "Carl Driver", "carl@customer.com")
+    ticket_id = create_ticket(client, customer_id, "1HGCM82633A123456")
+
+    assert search(client, "q=wre") == [("mechanic", mechanic_id)]
+    assert search(client, "q=carl@cust") == [("customer", customer_id)]
+    assert search(client, "q=867") == [("customer", customer_id)]
+    assert search(client, "q=1hgcm") == [("ticket", ticket_id)]
+
+    res = client.get("/search/?q=1HGCM")
+    assert res.json["items"][0]["data"]["VIN"] == "1HGCM82633A123456"
+    assert "password" not in str(client.get("/search/?q=carl").json)
+
+
+def test_search_type_filter(client):
+    create_mechanic(client, "Sam Smith", "sam@fixit.com")
+    customer_id = create_customer(client, "Sam Jones", "sjones@customer.com")
+
+    assert search(client, "q=sam&type=customer") == [("customer", customer_id)]
+    assert len(search(client, "q=sam&type=customer,mechanic")) == 2
+
+
+def test_search_ranks_and_paginates(client):
+    create_mechanic(client, "Pat Brakes", "pat1@fixit.com")
+    best = create_mechanic(client, "Pat Pat", "pat2@fixit.com")
+    create_mechanic(client, "Pat Tires", "pat3@fixit.com")
+
+    first = client.get("/search/?q=pat&limit=2").json
+    assert first["items"][0]["id"] == best  # more occurrences rank higher
+    assert first["next_cursor"]
+    second = client.get(f"/search/?q=pat&limit=2&cursor={first['next_cursor']}").json
+    assert second["next_cursor"] is None
+    seen = [item["id"] for item in first["items"] + second["items"]]
+    assert len(seen) == len(set(seen)) == 3
+
+
+def test_search_index_follows_writes(client):
+    mechanic_id = create_mechanic(client, "Jane Wrench", "jane@fixit.com")
+    assert search(client, "q=wrench") == [("mechanic", mechanic_id)]
+
+    client.put(
+        f"/mechanics/{mechanic_id}",
+        json={
+            "name": "Jane Spanner",
+            "email": "jane@fixit.com",
+            "phone": "555-1234",
+            "salary": 60000,
+        },
+    )
+    assert search(client, "q=wrench") == []
+    assert search(client, "q=spanner") == [("mechanic", mechanic_id)]
+
+    client.delete(f"/mechanics/{mechanic_id}")
+    assert search(client, "q=spanner") == []
+
+
+def test_customer_delete_removes_ticket_documents(client):
+    customer_id = create_customer(client, "Carl Driver", "carl@customer.com")
+    create_ticket(client, customer_id, "1HGCM82633A123456")
+    token = client.post(
+        "/customers/login", json={"email": "carl@customer.com", "password": "pw"}
+    ).json["auth_token"]
+
+    client.delete("/customers/", headers={"Authorization": f"Bearer {token}"})
+    assert search(client, "q=1hgcm") == []
+    count = db.session.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE}")).scalar()
+    assert count == 0
+
+
+def test_bulk_create_is_indexed(client):
+    client.post(
+        "/mechanics/bulk",
+        json=[
+            {"name": f"Bulk {i}", "email": f"b{i}@fixit.com", "phone": "5", "salary": 1}
+            for i in range(3)
+        ],
+    )
+    assert len(search(client, "q=bulk&type=mechanic")) == 3
+
+
+def test_search_requires_query(client):
+    assert client.get("/search/").status_code == 400
+    assert client.get("/search/?q=--").status_code == 400
+    assert client.get("/search/?q=jane&type=vehicle").status_code == 400
+
+
+def test_reindex_command(client):
+    mechanic_id = create_mechanic(client, "Jane Wrench", "jane@fixit.com")
+    db.session.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    db.session.commit()
+    assert search(client, "q=jane&limit=5") == []
+
+    result = current_app.test_cli_runner().invoke(args=["search", "reindex"])
+    assert "Indexed 1 documents" in result.output
+    assert search(client, "q=jane&limit=5") == [("mechanic", mechanic_id)]
@@ -0,0 +1,115 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app import create_app
+from app.models import db, Customer, InventoryItem, Mechanic, ServiceTicket, service_mechanics
+from app.utils.seed import sync_sequence, vin_check_digit
+from datetime import date
+from flask import current_app
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+
+
+@pytest.fixture
+def client():
+    app = create_app("TestingConfig")
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app.test_client()
+
+
+SMALL = [
+    "seed", "--customers", "40", "--mechanics", "6", "--items", "12",
+    "--tickets", "300", "--batch-size", "64", "--end-date", "2025-06-30",
+    "--days", "365",
+]  # fmt: skip
+
+
+def run_seed(*args):
+    result = current_app.test_cli_runner().invoke(args=list(args))
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+def count(model):
+    return db.session.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_seed_generates_valid_rows(client):
+    output = run_seed(*SMALL)
+    assert "service_tickets: 300 rows" in output
+    assert (count(Customer), count(Mechanic), count(ServiceTicket)) == (40, 6, 300)
+
+    emails = db.session.execute(select(Customer.email)).scalars().all()
+    assert len(set(emails)) == 40
+    names = db.session.execute(select(InventoryItem.name)).scalars().all()
+    assert len(set(names)) == 12  # the API rejects duplicate item names
+
+    tickets = db.session.execute(select(ServiceTicket)).scalars().all()
+    for ticket in tickets:
+        assert len(ticket.VIN) == 17 and not set(ticket.VIN) & set("IOQ")
+        assert ticket.VIN[8] == vin_check_digit(ticket.VIN)
+        assert date(2024, 6, 30) <= ticket.service_date <= date(2025, 6, 30)
+        assert 1 <= len(ticket.mechanics) <= 3
+    # Links point at real rows and a few mechanics do most of the work
+    per_mechanic = db.session.execute(
+        select(func.count()).select_from(service_mechanics).group_by("mechanic_id")
+    ).scalars().all()
+    assert len(per_mechanic) <= 6
+    assert max(per_mechanic) > 3 * min(per_mechanic)
+
+    # Seeded rows are indexed for search and served by the API
+    vin = tickets[0].VIN
+    res = client.get(f"/search/?q={vin}")
+    assert res.json["items"][0]["id"] == tickets[0].id
+
+
+def test_seed_appends(client):
+    run_seed(*SMALL)
+    run_seed("seed", "--customers", "5", "--mechanics", "0", "--items", "0", "--tickets", "10")
+    assert count(Customer) == 45
+    assert count(ServiceTicket) == 310
+    assert db.session.execute(select(func.max(ServiceTicket.id))).scalar() == 310
+
+
+def test_seeded_ids_move_the_postgresql_sequences(client):
+    statement = sync_sequence(Customer.__table__).compile(dialect=postgresql.dialect())
+    assert str(statement) == (
+        "SELECT setval(pg_get_serial_sequence(%(pg_get_serial_sequence_1)s, "
+        "%(pg_get_serial_sequence_2)s), max(customers.id)) AS setval_1 \nFROM customers"
+    )
+    assert statement.params == {
+        "pg_get_serial_sequence_1": "customers", "pg_get_serial_sequence_2": "id"
+    }
+    # New rows after a seed get fresh ids
+    run_seed(*SMALL)
+    res = client.post("/inventory/", json={"name": "Cabin filter", "price": 19.5})
+    assert res.status_code == 201
+    assert res.json["id"] == 13
+
+
+def test_seed_is_independent_of_workers(client):
+    run_seed(*SMALL, "--workers", "2")
+    with_workers = db.session.execute(
+        select(ServiceTicket.VIN, ServiceTicket.service_date, ServiceTicket.customer_id)
+    ).all()
+
+    db.drop_all()
+    db.create_all()
+    run_seed(*SMALL)
+    single = db.session.execute(
+        select(ServiceTicket.VIN, ServiceTicket.service_date, ServiceTicket.customer_id)
+    ).all()
+    assert with_workers == single
+
+
+def test_seed_tickets_need_customers(client):
+    result = current_app.test_cli_runner().invoke(
+        args=["seed", "--customers", "0", "--tickets", "5"]
+    )
+    assert result.exit_code != 0
+    assert "tickets need customers and mechanics" in result.output
@@ -0,0 +1,133 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app import create_app
+from app.extensions import cache
+from app.models import db, Customer, InventoryItem, Mechanic, ServiceTicket
+from app.blueprints.customers.schemas import customers_schema
+from app.blueprints.inventory.schemas import inventory_items_schema
+from app.blueprints.mechanics.schemas import mechanics_schema
+from app.blueprints.service_tickets.schemas import service_tickets_schema
+from app.utils.serialization import FastJSONProvider, compile_dump, dump
+from datetime import date
+from flask import current_app
+from marshmallow import Schema, fields, post_dump
+
+
+@pytest.fixture
+def client():
+    app = create_app("TestingConfig")
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app.test_client()
+
+
+def seed_rows():
+    customer = Customer(
+        name="Zoë Müller", email="zoe@customer.com", phone="555", password="pw"
+    )
+    mechanics = [
+        Mechanic(name="Jane", email="jane@fixit.com", phone="555", salary=60000),
+        Mechanic(name="Ray", email="ray@fixit.com", phone="555", salary=1e16),
+    ]
+    items = [
+        InventoryItem(name="Brake Pads", price=49.99),
+        InventoryItem(name="Tiny", price=0.00001),
+    ]
+    tickets = [
+        ServiceTicket(
+            VIN="1HGCM82633A123456",
+            service_date=date(2025, 7, 15),
+            service_desc="Brakes",
+            customer=customer,
+            mechanics=mechanics,
+            inventory_items=items,
+        ),
+        ServiceTicket(
+            VIN="1HGCM82633A000000",
+            service_date=date(2025, 8, 1),
+            service_desc="No parts yet",
+            customer=customer,
+        ),
+    ]
+    db.session.add_all(tickets)
+    db.session.commit()
+    unsaved = InventoryItem(name=None, price=None)  # None values dump as null
+    return {
+        customers_schema: [customer],
+        mechanics_schema: mechanics,
+        inventory_items_schema: items + [unsaved],
+        service_tickets_schema: tickets,
+    }
+
+
+def test_compiled_dump_matches_marshmallow(client):
+    for schema, rows in seed_rows().items():
+        assert compile_dump(schema) is not None
+        assert dump(schema, rows) == schema.dump(rows)
+        assert list(dump(schema, rows)[0]) == list(schema.dump(rows)[0])
+
+
+def test_uncompilable_schema_falls_back():
+    class HookedSchema(Schema):
+        name = fields.String()
+
+        @post_dump
+        def shout(self, data, **kwargs):
+            return {"name": data["name"].upper()}
+
+    assert compile_dump(HookedSchema()) is None
+
+
+def test_other_field_types_use_the_field(client):
+    class MixedSchema(Schema):
+        total = fields.Decimal(as_string=True)
+        label = fields.Method("make_label")
+        missing_attr = fields.String()
+
+        def make_label(self, obj):
+            return f"#{obj.id}"
+
+    class Row:
+        id = 7
+        total = "10.50"
+
+    schema = MixedSchema()
+    assert dump(schema, Row()) == schema.dump(Row()) == {"total": "10.50", "label": "#7"}
+
+
+def test_list_responses_unchanged(client):
+    seed_rows()
+    urls = ["/customers/", "/mechanics/", "/inventory/", "/service_tickets/"]
+
+    current_app.config["FAST_SERIALIZER"] = False
+    expected = [client.get(url).get_data() for url in urls]
+
+    # Render again with the compiled dumps, not from the response cache
+    cache.clear()
+    misses = client.get("/cache/stats").json["misses"]
+    current_app.config["FAST_SERIALIZER"] = True
+    assert [client.get(url).get_data() for url in urls] == expected
+    assert client.get("/cache/stats").json["misses"] == misses + len(urls)
+
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_orjson_provider_output_unchanged(client, compact):
+    pytest.importorskip("orjson")
+    seed_rows()
+    payloads = [
+        {"items": dump(service_tickets_schema, db.session.query(ServiceTicket).all())},
+        {"items": dump(customers_schema, db.session.query(Customer).all())},  # non-ASCII
+        {"items": dump(mechanics_schema, db.session.query(Mechanic).all())},  # 1e+16
+        {"b": [1, 2.5, None, True], "a": {"nested": "value", "empty": []}},
+        {"date": date(2025, 7, 15), "text": "ascii only"},
+    ]
+    stdlib = current_app.json
+    fast = FastJSONProvider(current_app._get_current_object())
+    stdlib.compact = fast.compact = compact
+    for payload in payloads:
+        assert fast.response(payload).get_data() == stdlib.response(payload).get_data()
@@ -7,6 +7,11 @@ from app import create_app
 from app.models import db
 from flask import current_app
 import uuid  # is this necessary?
+import csv
+import io
+import json
+from app.blueprints.service_tickets import routes as service_ticket_routes
+from app.utils.query_tracker import query_budget, track_queries
 
 @pytest.fixture
 def client():
@@ -100,7 +105,8 @@ def test_create_ticket_invalid_customer(client):
 def test_get_all_tickets_empty(client):
     res = client.get("/service_tickets/")
     assert res.status_code == 200
-    assert res.json == []
+    assert res.json["items"] == []
+    assert res.json["next_cursor"] is None
 
 
 def test_get_all_tickets(client):
@@ -108,7 +114,31 @@ def test_get_all_tickets(client):
     client.post("/service_tickets/", json=create_ticket(customer_id))
     res = client.get("/service_tickets/")
     assert res.status_code == 200
-    assert isinstance(res.json, list)
+    assert isinstance(res.json["items"], list)
+
+
+def test_get_all_tickets_keyset_pagination(client):
+    customer_id, _ = create_customer(client)
+    for service_date in ["2025-07-03", "2025-07-01", "2025-07-02", "2025-07-01"]:
+        data = create_ticket(customer_id)
+        data["service_date"] = service_date
+        client.post("/service_tickets/", json=data)
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/service_tickets/?limit=3"
+        if cursor:
+            url += f"&cursor={cursor}"
+        res = client.get(url)
+        assert res.status_code == 200
+        seen.extend((t["service_date"], t["id"]) for t in res.json["items"])
+        cursor = res.json["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == sorted(seen)
+    assert len(seen) == 4
 
 
 def test_get_ticket_by_id(client):
@@ -137,7 +167,7 @@ def test_get_my_tickets_with_token(client):
         "/service_tickets/my-tickets", headers={"Authorization": f"Bearer {token}"}
     )
     assert res.status_code == 200
-    assert isinstance(res.json, list)
+    assert isinstance(res.json["items"], list)
 
 
 def test_get_my_tickets_no_open_tickets(client):
@@ -235,3 +265,301 @@ def test_delete_ticket(client):
 def test_delete_ticket_not_found(client):
     res = client.delete("/service_tickets/9999")
     assert res.status_code == 404
+
+
+# QUERY COUNT - NESTED RELATIONSHIPS ARE EAGER LOADED
+def count_queries(client, url, **kwargs):
+    with track_queries() as log:
+        res = client.get(url, **kwargs)
+    assert res.status_code == 200
+    return log.count
+
+
+def create_linked_tickets(client, customer_id, count):
+    for _ in range(count):
+        res = client.post("/service_tickets/", json=create_ticket(customer_id))
+        client.put(
+            f"/service_tickets/{res.json['id']}/edit",
+            json={
+                "add_mechanic_ids": [create_mechanic(client)],
+                "add_item_ids": [create_inventory_item_unique(client)],
+            },
+        )
+
+
+def create_inventory_item_unique(client):
+    response = client.post(
+        "/inventory/",
+        json={"name": f"Part {uuid.uuid4().hex[:6]}", "price": 9.99},
+    )
+    assert response.status_code == 201
+    return response.json["id"]
+
+
+def test_get_all_tickets_query_count_is_constant(client):
+    customer_id, _ = create_customer(client)
+    create_linked_tickets(client, customer_id, 2)
+    small = count_queries(client, "/service_tickets/")
+
+    create_linked_tickets(client, customer_id, 8)
+    large = count_queries(client, "/service_tickets/")
+
+    assert small == large
+
+
+def test_get_all_tickets_query_budget(client):
+    customer_id, _ = create_customer(client)
+    create_linked_tickets(client, customer_id, 5)
+    # Tickets, then one selectin load each for mechanics and inventory items
+    with query_budget(3, max_repeats=1):
+        client.get("/service_tickets/")
+    with query_budget(1):
+        client.get("/service_tickets/?fields=id,VIN")
+
+
+def test_get_my_tickets_query_count_is_constant(client):
+    customer_id, email = create_customer(client)
+    login = client.post(
+        "/customers/login", json={"email": email, "password": "securepassword"}
+    )
+    headers = {"Authorization": f"Bearer {login.json['auth_token']}"}
+    create_linked_tickets(client, customer_id, 2)
+    small = count_queries(client, "/service_tickets/my-tickets", headers=headers)
+
+    create_linked_tickets(client, customer_id, 8)
+    large = count_queries(client, "/service_tickets/my-tickets", headers=headers)
+
+    assert small == large
+
+
+# UPDATE SERVICE TICKET - SET-BASED EDITS
+def test_update_ticket_add_remove_notes(client):
+    customer_id, _ = create_customer(client)
+    res = client.post("/service_tickets/", json=create_ticket(customer_id))
+    ticket_id = res.json["id"]
+    mechanic_id = create_mechanic(client)
+    item_id = create_inventory_item(client)
+
+    client.put(
+        f"/service_tickets/{ticket_id}/edit", json={"add_mechanic_ids": [mechanic_id]}
+    )
+    update_res = client.put(
+        f"/service_tickets/{ticket_id}/edit",
+        json={
+            "add_mechanic_ids": [mechanic_id],
+            "remove_mechanic_ids": [mechanic_id],
+            "remove_item_ids": [item_id],
+        },
+    )
+    assert update_res.status_code == 200
+    assert update_res.json["notes"] == [
+        "Mechanic 'Jane Wrench' already assigned to this ticket",
+        "Inventory item 'Oil Filter' not assigned to this ticket",
+    ]
+    assert update_res.json["service_ticket"]["mechanics"] == []
+
+
+def test_update_ticket_query_count_is_constant(client):
+    customer_id, _ = create_customer(client)
+    res = client.post("/service_tickets/", json=create_ticket(customer_id))
+    ticket_id = res.json["id"]
+
+    def count_edit_queries(payload):
+        with track_queries() as log:
+            res = client.put(f"/service_tickets/{ticket_id}/edit", json=payload)
+        assert res.status_code == 200
+        return log.count
+
+    small = count_edit_queries(
+        {"add_item_ids": [create_inventory_item_unique(client) for _ in range(2)]}
+    )
+    large = count_edit_queries(
+        {"add_item_ids": [create_inventory_item_unique(client) for _ in range(20)]}
+    )
+    assert small == large
+
+
+def test_bulk_edit_tickets(client):
+    customer_id, _ = create_customer(client)
+    ticket_ids = [
+        client.post("/service_tickets/", json=create_ticket(customer_id)).json["id"]
+        for _ in range(3)
+    ]
+    mechanic_id = create_mechanic(client)
+    item_id = create_inventory_item(client)
+    client.put(
+        f"/service_tickets/{ticket_ids[0]}/edit",
+        json={"add_mechanic_ids": [mechanic_id]},
+    )
+
+    res = client.put(
+        "/service_tickets/bulk-edit",
+        json={
+            "ticket_ids": ticket_ids + [9999],
+            "add_mechanic_ids": [mechanic_id],
+            "add_item_ids": [item_id],
+        },
+    )
+    assert res.status_code == 200
+    assert [t["id"] for t in res.json["service_tickets"]] == ticket_ids
+    for ticket in res.json["service_tickets"]:
+        assert [m["id"] for m in ticket["mechanics"]] == [mechanic_id]
+        assert [i["id"] for i in ticket["inventory_items"]] == [item_id]
+
+    notes = res.json["notes"]
+    assert notes[str(ticket_ids[0])] == [
+        "Mechanic 'Jane Wrench' already assigned to this ticket"
+    ]
+    assert notes[str(ticket_ids[1])] == []
+    assert "not found" in notes["9999"][0]
+
+
+def test_bulk_edit_tickets_requires_ticket_ids(client):
+    res = client.put("/service_tickets/bulk-edit", json={"add_mechanic_ids": [1]})
+    assert res.status_code == 400
+    assert "ticket_ids" in res.json
+
+
+# BULK CREATE SERVICE TICKETS
+def test_bulk_create_tickets(client):
+    customer_id, _ = create_customer(client)
+    bad_data = create_ticket(customer_id)
+    bad_data.pop("VIN")
+    batch = [create_ticket(customer_id), create_ticket(9999), bad_data]
+    res = client.post("/service_tickets/bulk", json=batch)
+    assert res.status_code == 207
+    results = res.json["results"]
+    assert [r["status"] for r in results] == [201, 404, 400]
+    assert results[0]["data"]["customer_id"] == customer_id
+    assert client.get(f"/service_tickets/{results[0]['data']['id']}").status_code == 200
+
+
+# EXPORT SERVICE TICKETS
+def test_export_tickets_ndjson(client):
+    customer_id, _ = create_customer(client)
+    other_customer_id, _ = create_customer(client)
+    create_linked_tickets(client, customer_id, 3)
+    client.post("/service_tickets/", json=create_ticket(other_customer_id))
+
+    res = client.get("/service_tickets/export")
+    assert res.status_code == 200
+    assert res.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert len(lines) == 4
+    assert len(lines[0]["mechanics"]) == 1
+    assert len(lines[0]["inventory_items"]) == 1
+
+    res = client.get(f"/service_tickets/export?customer_id={other_customer_id}")
+    lines = res.get_data(as_text=True).splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["customer_id"] == other_customer_id
+
+
+def test_export_tickets_csv_batches(client, monkeypatch):
+    monkeypatch.setattr(service_ticket_routes, "EXPORT_BATCH_SIZE", 2)
+    customer_id, _ = create_customer(client)
+    for service_date in ["2025-07-01", "2025-07-02", "2025-07-03", "2025-08-01"]:
+        data = create_ticket(customer_id)
+        data["service_date"] = service_date
+        client.post("/service_tickets/", json=data)
+
+    res = client.get(
+        "/service_tickets/export?format=csv&start_date=2025-07-01&end_date=2025-07-31"
+    )
+    assert res.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(res.get_data(as_text=True))))
+    assert [row["service_date"] for row in rows] == [
+        "2025-07-01",
+        "2025-07-02",
+        "2025-07-03",
+    ]
+
+
+def test_export_tickets_invalid_args(client):
+    assert client.get("/service_tickets/export?format=xml").status_code == 400
+    assert client.get("/service_tickets/export?start_date=July").status_code == 400
+
+
+# ETAG / CONDITIONAL GET
+def test_ticket_etag_changes_when_links_change(client):
+    customer_id, _ = create_customer(client)
+    res = client.post("/service_tickets/", json=create_ticket(customer_id))
+    ticket_id = res.json["id"]
+    etag = client.get(f"/service_tickets/{ticket_id}").headers["ETag"]
+    res = client.get(f"/service_tickets/{ticket_id}", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+
+    mechanic_id = create_mechanic(client)
+    client.put(
+        f"/service_tickets/{ticket_id}/edit", json={"add_mechanic_ids": [mechanic_id]}
+    )
+    res = client.get(f"/service_tickets/{ticket_id}", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert [m["id"] for m in res.json["mechanics"]] == [mechanic_id]
+
+    # Renaming an assigned mechanic changes the nested data, so the ETag too
+    etag = res.headers["ETag"]
+    client.put(
+        f"/mechanics/{mechanic_id}",
+        json={
+            "name": "Renamed",
+            "email": "renamed@test.com",
+            "phone": "555-987-6543",
+            "salary": 60000,
+        },
+    )
+    res = client.get(f"/service_tickets/{ticket_id}", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.json["mechanics"][0]["name"] == "Renamed"
+
+
+# SPARSE FIELDSETS
+def capture_selects(client, url):
+    with track_queries() as log:
+        res = client.get(url)
+    statements = [
+        shape
+        for shape, times in log.shapes.items()
+        if shape.startswith("SELECT")
+        for _ in range(times)
+    ]
+    return res, statements
+
+
+def test_get_all_tickets_sparse_fields(client):
+    customer_id, _ = create_customer(client)
+    create_linked_tickets(client, customer_id, 3)
+
+    res, statements = capture_selects(client, "/service_tickets/?fields=id,VIN")
+    assert res.status_code == 200
+    assert all(set(item) == {"id", "VIN"} for item in res.json["items"])
+    # One SELECT, without unrequested columns or the nested relationships
+    assert len(statements) == 1
+    assert "service_desc" not in statements[0]
+    assert "mechanics" not in statements[0]
+
+
+def test_get_all_tickets_sparse_nested_fields(client):
+    customer_id, _ = create_customer(client)
+    create_linked_tickets(client, customer_id, 3)
+
+    res, statements = capture_selects(client, "/service_tickets/?fields=id,mechanics")
+    assert res.status_code == 200
+    assert set(res.json["items"][0]) == {"id", "mechanics"}
+    assert set(res.json["items"][0]["mechanics"][0]) == {"id", "name"}
+    assert len(statements) == 2  # tickets + mechanics, no inventory query
+    assert not any("inventory_items" in statement for statement in statements)
+    assert not any("salary" in statement for statement in statements)
+
+
+def test_get_all_tickets_sparse_fields_etag_and_errors(client):
+    customer_id, _ = create_customer(client)
+    create_linked_tickets(client, customer_id, 1)
+
+    full = client.get("/service_tickets/")
+    sparse = client.get("/service_tickets/?fields=id")
+    assert full.headers["ETag"] != sparse.headers["ETag"]
+
+    res = client.get("/service_tickets/?fields=id,password")
+    assert res.status_code == 400
+    assert "password" in res.json["error"]
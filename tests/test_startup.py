@@ -0,0 +1,206 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import fcntl
+import multiprocessing
+import subprocess
+import time
+from threading import Thread
+import config
+from app import create_app
+from app.models import db
+from app.utils.search import SEARCH_TABLE
+from app.utils.startup import (
+    bootstrap_schema,
+    missing_columns,
+    missing_indexes,
+    missing_primary_keys,
+    missing_tables,
+)
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture
+def file_db(monkeypatch, tmp_path):
+    # Separate processes need a database file and a lock file they all see
+    monkeypatch.setattr(
+        config.TestingConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'app.db'}"
+    )
+    monkeypatch.setattr(
+        config.TestingConfig, "SCHEMA_LOCK_FILE", str(tmp_path / "schema.lock"), raising=False
+    )
+    return tmp_path
+
+
+def table_names(app):
+    with app.app_context():
+        return set(inspect(db.engine).get_table_names())
+
+
+def test_bootstrap_creates_the_schema_once(file_db):
+    app = create_app("TestingConfig")
+    assert bootstrap_schema(app) is True
+    assert set(db.metadata.tables) | {SEARCH_TABLE} <= table_names(app)
+    # Later boots find everything in place and skip create_all
+    assert bootstrap_schema(create_app("TestingConfig")) is False
+    assert "schema_bootstrap" in app.extensions["startup"]
+
+
+def test_missing_search_index_is_created(file_db):
+    app = create_app("TestingConfig")
+    bootstrap_schema(app)
+    client = app.test_client()
+    mechanic = {"name": "Jane Wrench", "email": "jane@fixit.com", "phone": "5", "salary": 1}
+    assert client.post("/mechanics/", json=mechanic).status_code == 201
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE {SEARCH_TABLE}"))
+        assert missing_tables(db.engine) == {SEARCH_TABLE}
+    assert bootstrap_schema(app) is True
+    assert SEARCH_TABLE in table_names(app)
+    # Rows that predate the index are found
+    res = client.get("/mechanics/search?name=jane")
+    assert res.status_code == 200
+    assert [m["name"] for m in res.json["items"]] == ["Jane Wrench"]
+
+
+def test_bootstrap_adds_version_columns_to_existing_tables(file_db):
+    # A database created before the version columns existed
+    app = create_app("TestingConfig")
+    bootstrap_schema(app)
+    versioned = ["customers", "inventory_items", "mechanics", "service_tickets"]
+    with app.app_context():
+        with db.engine.begin() as connection:
+            for table in versioned:
+                connection.execute(text(f"ALTER TABLE {table} DROP COLUMN version"))
+            connection.execute(
+                text("INSERT INTO inventory_items (name, price) VALUES ('Filter', 9.5)")
+            )
+        assert sorted(c.table.name for c in missing_columns(db.engine)) == versioned
+
+    assert bootstrap_schema(app) is True
+    with app.app_context():
+        assert missing_columns(db.engine) == []
+    res = app.test_client().get("/inventory/")
+    assert res.status_code == 200
+    assert [item["name"] for item in res.json["items"]] == ["Filter"]
+    assert bootstrap_schema(app) is False  # nothing left to upgrade
+
+
+def test_bootstrap_adds_indexes_and_link_keys_to_existing_tables(file_db):
+    # Indexes and link-table keys added after the database was created
+    app = create_app("TestingConfig")
+    bootstrap_schema(app)
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_service_tickets_customer_date"))
+            connection.execute(text('DROP INDEX "ix_service_tickets_VIN"'))
+            connection.execute(text("DROP TABLE service_mechanics"))
+            connection.execute(
+                text("CREATE TABLE service_mechanics (service_id INTEGER, mechanic_id INTEGER)")
+            )
+            connection.execute(
+                text("INSERT INTO service_mechanics VALUES (1, 2), (1, 2), (1, 3)")
+            )
+        assert sorted(index.name for index in missing_indexes(db.engine)) == [
+            "ix_service_mechanics_mechanic_service",
+            "ix_service_tickets_VIN",
+            "ix_service_tickets_customer_date",
+        ]
+        assert [table.name for table in missing_primary_keys(db.engine)] == [
+            "service_mechanics"
+        ]
+
+    assert bootstrap_schema(app) is True
+    with app.app_context():
+        assert missing_indexes(db.engine) == []
+        assert missing_primary_keys(db.engine) == []
+        links = db.session.execute(text("SELECT * FROM service_mechanics")).all()
+        assert sorted(links) == [(1, 2), (1, 3)]  # the duplicate link is gone
+        with pytest.raises(IntegrityError):
+            db.session.execute(text("INSERT INTO service_mechanics VALUES (1, 3)"))
+        db.session.rollback()
+    assert bootstrap_schema(app) is False
+
+
+def test_bootstrap_waits_for_the_lock(file_db):
+    app = create_app("TestingConfig")
+    results = []
+    with open(file_db / "schema.lock", "a") as held:
+        fcntl.flock(held, fcntl.LOCK_EX)  # another process is bootstrapping
+        worker = Thread(target=lambda: results.append(bootstrap_schema(app)))
+        worker.start()
+        time.sleep(0.3)
+        assert worker.is_alive() and results == []
+    worker.join(timeout=10)
+    assert results == [True]
+
+
+def boot(start, results):
+    app = create_app("TestingConfig")
+    start.wait()
+    results.put(bootstrap_schema(app))
+
+
+def test_concurrent_workers_bootstrap_exactly_once(file_db):
+    ctx = multiprocessing.get_context("fork")
+    workers = 4
+    start = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=boot, args=(start, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    created = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join(timeout=10)
+
+    assert sorted(created) == [False] * (workers - 1) + [True]
+    assert all(process.exitcode == 0 for process in processes)
+    assert not missing_tables_of(create_app("TestingConfig"))
+
+
+def missing_tables_of(app):
+    with app.app_context():
+        return missing_tables(db.engine)
+
+
+def test_startup_phases_are_reported(file_db):
+    app = create_app("TestingConfig")
+    bootstrap_schema(app)
+    client = app.test_client()
+    assert set(app.extensions["startup"]) == {"create_app", "schema_bootstrap"}
+
+    assert client.get("/mechanics/").status_code == 200
+    first = app.extensions["startup"]["first_request"]
+    client.get("/mechanics/")
+    assert app.extensions["startup"]["first_request"] == first  # first one only
+
+    body = client.get("/metrics").get_data(as_text=True)
+    assert f'app_startup_seconds{{phase="first_request"}} {first}' in body
+    assert 'app_startup_seconds{phase="create_app"}' in body
+
+
+def test_swagger_ui_can_be_switched_off(monkeypatch):
+    assert create_app("TestingConfig").test_client().get("/api/docs/").status_code == 200
+    monkeypatch.setattr(config.TestingConfig, "SWAGGER_UI_ENABLED", False, raising=False)
+    assert create_app("TestingConfig").test_client().get("/api/docs/").status_code == 404
+
+
+def test_optional_modules_load_lazily(file_db):
+    # A fresh interpreter: the test session has imported everything already
+    script = (
+        "import sys, config\n"
+        "config.TestingConfig.SWAGGER_UI_ENABLED = False\n"
+        "from app import create_app\n"
+        "app = create_app('TestingConfig')\n"
+        "print(sorted(m for m in ('app.utils.seed', 'flask_swagger_ui') if m in sys.modules))\n"
+        "print('seed' in app.cli.list_commands(None))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.split("\n")[:2] == ["[]", "True"]
@@ -0,0 +1,117 @@
+import pytest
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import fakeredis
+from app import create_app
+from app.extensions import cache
+from app.models import db
+from app.utils.two_tier_cache import TwoTierCache
+from flask_caching.backends.rediscache import RedisCache
+
+
+def make_worker_cache(server, **kwargs):
+    # Each instance stands in for one gunicorn worker sharing the same Redis
+    l2 = RedisCache(host=fakeredis.FakeRedis(server=server), key_prefix="test_")
+    return TwoTierCache(l2, **kwargs)
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def client(server):
+    app = create_app("TestingConfig")
+    app.config["TESTING"] = True
+    cache.init_app(
+        app,
+        config={
+            "CACHE_TYPE": "app.utils.two_tier_cache.TwoTierCache",
+            "CACHE_REDIS_HOST": fakeredis.FakeRedis(server=server),
+        },
+    )
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app.test_client()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+# L1 / L2 READS
+def test_l1_serves_repeat_reads(server):
+    worker = make_worker_cache(server)
+    worker.set("view:abc", b"payload")
+    worker._l1.clear()
+
+    assert worker.get("view:abc") == b"payload"
+    assert worker.get("view:abc") == b"payload"
+    assert worker.stats == {"l1_hits": 1, "l2_hits": 1, "misses": 0}
+
+
+def test_l1_is_bounded_lru(server):
+    worker = make_worker_cache(server, l1_max_entries=2)
+    for key in ["view:a", "view:b", "view:c"]:
+        worker.set(key, key)
+    assert list(worker._l1) == ["view:b", "view:c"]
+    assert worker.get("view:a") == "view:a"  # still in L2
+
+
+def test_tag_versions_always_read_from_l2(server):
+    worker_a = make_worker_cache(server)
+    worker_b = make_worker_cache(server)
+    worker_a.set("tag:inventory", "v1", timeout=0)
+    assert worker_a.get("tag:inventory") == "v1"
+
+    worker_b.set("tag:inventory", "v2", timeout=0)
+    assert worker_a.get_many("tag:inventory") == ["v2"]
+    assert "tag:inventory" not in worker_a._l1
+
+
+def test_only_response_entries_are_kept_in_l1(server):
+    worker_a = make_worker_cache(server)
+    worker_b = make_worker_cache(server)
+    # A replica sticky mark expires in L2 after its own timeout, not L1's
+    worker_a.set("replica:sticky:1.2.3.4", 1, timeout=1)
+    assert worker_b.get("replica:sticky:1.2.3.4") == 1
+    assert list(worker_a._l1) == list(worker_b._l1) == []
+    worker_b.set("view:abc", b"payload")
+    assert list(worker_b._l1) == ["view:abc"]
+
+
+def test_delete_evicts_other_workers_l1(server):
+    worker_a = make_worker_cache(server)
+    worker_b = make_worker_cache(server)
+    worker_a.set("view:abc", b"payload")
+    assert worker_b.get("view:abc") == b"payload"
+    assert "view:abc" in worker_b._l1
+
+    worker_a.delete("view:abc")
+    assert wait_for(lambda: "view:abc" not in worker_b._l1)
+    assert worker_b.get("view:abc") is None
+
+
+# END TO END THROUGH THE APP
+def test_write_is_visible_after_two_tier_hit(client):
+    res = client.post("/inventory/", json={"name": "Brake Pads", "price": 49.99})
+    part_id = res.json["id"]
+    assert client.get(f"/inventory/{part_id}").json["name"] == "Brake Pads"
+    assert client.get(f"/inventory/{part_id}").json["name"] == "Brake Pads"
+
+    client.put(f"/inventory/{part_id}", json={"name": "Rotors", "price": 80.0})
+    assert client.get(f"/inventory/{part_id}").json["name"] == "Rotors"
+
+    stats = client.get("/cache/stats").json
+    assert stats["hits"] == 1
+    assert stats["backend"]["l1_hits"] >= 1
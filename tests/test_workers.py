@@ -0,0 +1,147 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import http.client
+import runpy
+import socket
+import subprocess
+import time
+import config
+from app import create_app
+from app.extensions import limiter
+from app.models import db
+from app.blueprints.mechanics.schemas import mechanics_schema
+from app.blueprints.search.schemas import result_schemas
+from app.utils.serialization import _compiled, precompile_schemas
+from app.utils.workers import dispose_engines, shut_down, warm_up
+from sqlalchemy import text
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+GUNICORN_ENV = (
+    "GUNICORN_WORKER_CLASS", "GUNICORN_THREADS", "WEB_CONCURRENCY", "GUNICORN_PRELOAD",
+    "GUNICORN_MAX_REQUESTS", "GUNICORN_MAX_REQUESTS_JITTER", "GUNICORN_WARMUP_PATHS",
+)  # fmt: skip
+
+
+@pytest.fixture
+def app():
+    app = create_app("TestingConfig")
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app
+
+
+def gunicorn_settings(monkeypatch, **env):
+    for name in GUNICORN_ENV:
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(os.path.join(ROOT, "gunicorn.conf.py"))
+
+
+def test_gunicorn_profiles_from_environment(monkeypatch):
+    cores = os.cpu_count() or 1
+    settings = gunicorn_settings(monkeypatch)
+    assert settings["worker_class"] == "gthread"
+    assert (settings["workers"], settings["threads"]) == (cores + 1, 4)
+    assert settings["preload_app"] is True
+    assert (settings["max_requests"], settings["max_requests_jitter"]) == (1000, 100)
+    assert settings["warmup_paths"] == ["/mechanics/", "/inventory/", "/service_tickets/"]
+
+    settings = gunicorn_settings(
+        monkeypatch,
+        GUNICORN_WORKER_CLASS="sync",
+        GUNICORN_PRELOAD="false",
+        GUNICORN_MAX_REQUESTS="0",
+        GUNICORN_WARMUP_PATHS="",
+    )
+    assert (settings["workers"], settings["threads"]) == (2 * cores + 1, 1)
+    assert settings["preload_app"] is False
+    assert (settings["max_requests"], settings["max_requests_jitter"]) == (0, 0)
+    assert settings["warmup_paths"] == []
+
+
+def test_precompile_schemas_covers_module_level_schemas(app):
+    assert precompile_schemas() > 0
+    assert mechanics_schema in _compiled
+    assert all(schema in _compiled for schema in result_schemas.values())
+
+
+def test_dispose_engines_leaves_inherited_connections_open(monkeypatch, tmp_path):
+    # A file database: in-memory SQLite lives in its one (static) connection
+    monkeypatch.setattr(
+        config.TestingConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'app.db'}"
+    )
+    app = create_app("TestingConfig")
+    with app.app_context():
+        db.session.execute(text("SELECT 1"))
+        inherited = db.session.connection().connection.dbapi_connection
+        db.session.remove()
+        assert dispose_engines(app) == 1
+        # A fresh pool for this process; the parent's connection still works
+        assert db.engine.pool.checkedin() == 0
+        assert inherited.execute("SELECT 1").fetchone() == (1,)
+
+
+def test_warm_up_fills_caches_without_using_rate_limits(app):
+    # GET /mechanics/ allows 5 per minute; warm-up requests are not counted
+    statuses = warm_up(app, ["/mechanics/"] * 6 + ["/inventory/"])
+    assert statuses == {"/mechanics/": 200, "/inventory/": 200}
+    assert limiter.enabled is True
+    # Warm-up is its own phase; the first client request is still to come
+    assert "warm_up" in app.extensions["startup"]
+    assert "first_request" not in app.extensions["startup"]
+
+    client = app.test_client()
+    hits = client.get("/cache/stats").json["hits"]
+    assert "first_request" in app.extensions["startup"]
+    assert client.get("/inventory/").status_code == 200
+    assert client.get("/cache/stats").json["hits"] == hits + 1
+    shut_down()  # memory storage: nothing to flush
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_preloaded_gunicorn_bootstraps_once_and_warms_every_worker(tmp_path):
+    pytest.importorskip("gunicorn")
+    port = free_port()
+    env = {
+        **os.environ,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}",
+        "WEB_CONCURRENCY": "2",
+        "GUNICORN_WARMUP_PATHS": "/mechanics/",
+        "INTERNAL_ENDPOINTS_ENABLED": "true",
+    }
+    server = subprocess.Popen(
+        ["gunicorn", f"--bind=127.0.0.1:{port}", "--log-level=info", "flask_app:app"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                connection.request("GET", "/metrics")
+                metrics = connection.getresponse().read().decode()
+                break
+            except OSError:
+                assert time.monotonic() < deadline, "gunicorn did not start"
+                time.sleep(0.2)
+        assert 'app_startup_seconds{phase="warm_up"}' in metrics
+        time.sleep(1)  # let the second worker finish booting
+    finally:
+        server.terminate()
+        output = server.communicate(timeout=30)[0]
+
+    assert output.count("Database schema created/upgraded") == 1  # in the master
+    assert output.count("warmed up: {'/mechanics/': 200}") == 2